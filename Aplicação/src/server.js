@@ -55,6 +55,70 @@ app.get('/api/sync', async (req, res) => {
   }
 });
 
+// Feed de alterações gravado pelo crawler (DB_CHANGE_LOG=true): o cliente guarda a
+// última version recebida e pede só o que veio depois. A leitura para em
+// MIN_ACTIVE_ROWVERSION(), então transações ainda abertas não deixam buracos no feed
+app.get('/api/changes', async (req, res) => {
+  try {
+    const sinceVersion = parseInt(req.query.since_version || '0', 10);
+    const limit = Math.min(parseInt(req.query.limit || '1000', 10), 10000);
+    
+    await sql.connect(dbConfig);
+    
+    const result = await new sql.Request()
+      .input('since', sql.BigInt, sinceVersion)
+      .input('limit', sql.Int, limit)
+      .query(`
+        SELECT TOP (@limit) CAST(row_version AS BIGINT) AS version, seq, entity, operation,
+               client_id, payload, changed_at
+        FROM log_alteracoes
+        WHERE row_version > CAST(@since AS BINARY(8))
+          AND row_version < MIN_ACTIVE_ROWVERSION()
+        ORDER BY row_version
+      `);
+    
+    const changes = result.recordset.map(change => ({ ...change, payload: JSON.parse(change.payload) }));
+    
+    res.json({
+      changes,
+      last_version: changes.length ? changes[changes.length - 1].version : sinceVersion,
+      has_more: changes.length === limit
+    });
+    
+  } catch (error) {
+    console.error('Erro ao buscar alterações:', error);
+    res.status(500).json({ error: error.message });
+  }
+});
+
+// Retornos esperados pré-calculados pelo crawler (tabela retornos_clientes, que já traz
+// nome e contato do cliente); o filtro por data usa o índice de expected_return_date
+app.get('/api/returns', async (req, res) => {
+  try {
+    const from = parseInt(req.query.from_days || '-7', 10);
+    const to = parseInt(req.query.to_days || '14', 10);
+    
+    await sql.connect(dbConfig);
+    
+    const result = await new sql.Request()
+      .input('from', sql.Int, from)
+      .input('to', sql.Int, to)
+      .query(`
+        SELECT client_id, name, email, phone, last_service_date, expected_return_date
+        FROM retornos_clientes
+        WHERE expected_return_date BETWEEN DATEADD(DAY, @from, CAST(GETDATE() AS DATE))
+                                       AND DATEADD(DAY, @to, CAST(GETDATE() AS DATE))
+        ORDER BY expected_return_date ASC
+      `);
+    
+    res.json({ returns: result.recordset });
+    
+  } catch (error) {
+    console.error('Erro ao buscar retornos:', error);
+    res.status(500).json({ error: error.message });
+  }
+});
+
 app.listen(port, '0.0.0.0', () => {
   console.log(`Servidor API rodando na porta ${port}`);
 });
\ No newline at end of file
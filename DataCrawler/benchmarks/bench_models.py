@@ -0,0 +1,134 @@
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Callable, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.data_models import Service, ServiceBatch
+from utils.date_parser import parse_service_date
+
+# Compara a representação em memória dos serviços: dataclass comum (como era antes),
+# dataclass com slots e o lote colunar ServiceBatch.
+# Uso (a partir de DataCrawler/): python benchmarks/bench_models.py --rows 200000
+
+SERVICE_TYPES = ['Manutenção', 'Instalação', 'Revisão', 'Limpeza', 'Troca de peça']
+SERVICE_STATUSES = ['Concluído', 'Agendado', 'Cancelado']
+PARAM_COLUMNS = ('client_id', 'service_date', 'service_date_value', 'service_type',
+                 'description', 'status', 'extraction_date')
+
+@dataclass
+class PlainService:
+    client_id: str
+    service_date: str
+    service_type: str
+    description: str
+    status: str
+    extraction_date: Optional[datetime] = None
+    service_date_value: Optional[date] = None
+
+@dataclass
+class ModelResult:
+    name: str
+    rows: int
+    memory_mb: float
+    build_seconds: float
+    params_seconds: float
+
+    @property
+    def bytes_per_row(self) -> float:
+        return self.memory_mb * 1024 * 1024 / self.rows if self.rows else 0.0
+
+def scraped_rows(rows: int, services_per_client: int) -> Iterator[Tuple[str, str, str, str, str]]:
+    # Cada campo é uma string nova, como o texto devolvido pelo navegador a cada página
+    for index in range(rows):
+        client = index // services_per_client
+        yield (
+            f"C{client:06d}",
+            f"{(index % 28) + 1:02d}/{(index % 12) + 1:02d}/2024",
+            f"{SERVICE_TYPES[index % len(SERVICE_TYPES)]}",
+            f"Serviço {index % services_per_client} do cliente C{client:06d}",
+            f"{SERVICE_STATUSES[index % len(SERVICE_STATUSES)]}"
+        )
+
+def build_objects(factory) -> Callable[[int, int, datetime], list]:
+    def build(rows: int, services_per_client: int, extraction_date: datetime) -> list:
+        return [factory(client_id, service_date, service_type, description, status, extraction_date)
+                for client_id, service_date, service_type, description, status
+                in scraped_rows(rows, services_per_client)]
+    return build
+
+def build_batch(rows: int, services_per_client: int, extraction_date: datetime) -> ServiceBatch:
+    batch = ServiceBatch()
+    for client_id, service_date, service_type, description, status in scraped_rows(rows, services_per_client):
+        batch.append(client_id, service_date, service_type, description, status, extraction_date)
+    return batch
+
+def object_params(services: list) -> list:
+    # Conversão feita pelo db_handler antes do lote colunar: uma tupla montada por objeto
+    now = datetime.now()
+    return [(service.client_id, service.service_date,
+             service.service_date_value or parse_service_date(service.service_date),
+             service.service_type, service.description, service.status, service.extraction_date or now)
+            for service in services]
+
+def batch_params(batch: ServiceBatch) -> list:
+    return batch.to_params(PARAM_COLUMNS)
+
+def measure(name: str, build, to_params, rows: int, services_per_client: int) -> ModelResult:
+    extraction_date = datetime.now()
+    parse_service_date.cache_clear()
+    gc.collect()
+
+    # Vazão medida sem o tracemalloc, que deixa cada alocação bem mais lenta
+    started = time.perf_counter()
+    container = build(rows, services_per_client, extraction_date)
+    build_seconds = time.perf_counter() - started
+    del container
+    gc.collect()
+
+    tracemalloc.start()
+    container = build(rows, services_per_client, extraction_date)
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    params = to_params(container)
+    params_seconds = time.perf_counter() - started
+    assert len(params) == rows
+
+    return ModelResult(name=name, rows=rows, memory_mb=memory / (1024 * 1024),
+                       build_seconds=build_seconds, params_seconds=params_seconds)
+
+def print_report(results: List[ModelResult]):
+    header = f"{'modelo':<12} {'linhas':>9} {'MB':>8} {'bytes/linha':>12} {'montagem/s':>12} {'parâmetros/s':>13}"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        print(f"{result.name:<12} {result.rows:>9} {result.memory_mb:>8.1f} {result.bytes_per_row:>12.0f} "
+              f"{result.rows / result.build_seconds:>12.0f} {result.rows / result.params_seconds:>13.0f}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Memória e vazão dos modelos de serviço")
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--services', type=int, default=10, help="serviços por cliente")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    scenarios = [
+        ('dataclass', build_objects(PlainService), object_params),
+        ('slots', build_objects(Service), object_params),
+        ('batch', build_batch, batch_params)
+    ]
+    print_report([measure(name, build, to_params, args.rows, args.services)
+                  for name, build, to_params in scenarios])
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
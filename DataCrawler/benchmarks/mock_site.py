@@ -0,0 +1,201 @@
+import random
+import re
+import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import parse_qs, urlparse
+
+# Site local que imita o sistema alvo com a marcação dos seletores padrão de
+# WebConfig.SELECTORS (.client-row, .client-id, .service-row, ...)
+
+SERVICE_TYPES = ['Manutenção', 'Instalação', 'Revisão', 'Limpeza', 'Troca de peça']
+SERVICE_STATUSES = ['Concluído', 'Agendado', 'Cancelado']
+
+LOGIN_PAGE = """<html><body>
+<form method="post" action="/login">
+  <input id="username" name="username" type="text">
+  <input id="password" name="password" type="password">
+  <button type="submit">Entrar</button>
+</form>
+</body></html>"""
+
+@dataclass
+class MockSiteStats:
+    requests: int = 0
+    errors_injected: int = 0
+    pages: dict = field(default_factory=dict)
+
+class MockSite:
+    def __init__(self, clients: int = 100, services_per_client: int = 10, page_size: int = 50,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 seed: int = 42, host: str = '127.0.0.1', port: int = 0):
+        self.clients = clients
+        self.services_per_client = services_per_client
+        self.page_size = max(1, page_size)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.seed = seed
+        self.stats = MockSiteStats()
+
+        self._random = random.Random(seed)
+        self._stats_lock = threading.Lock()
+        self._sessions = set()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-site", daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def client_id(self, index: int) -> str:
+        return f"C{index:06d}"
+
+    def client_ids(self) -> List[str]:
+        return [self.client_id(index) for index in range(self.clients)]
+
+    def _delay_and_maybe_fail(self, page: str) -> bool:
+        with self._stats_lock:
+            self.stats.requests += 1
+            self.stats.pages[page] = self.stats.pages.get(page, 0) + 1
+            delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+            fail = self._random.random() < self.error_rate
+            if fail:
+                self.stats.errors_injected += 1
+
+        if delay > 0:
+            time.sleep(delay / 1000)
+        return fail
+
+    def _clients_page(self, page: int) -> str:
+        start = (page - 1) * self.page_size
+        end = min(start + self.page_size, self.clients)
+        rows = []
+        for index in range(start, end):
+            client_id = self.client_id(index)
+            rows.append(
+                f'<tr class="client-row"><td class="client-id">{client_id}</td>'
+                f'<td class="client-name">Cliente {index}</td>'
+                f'<td class="client-email">cliente{index}@exemplo.com</td>'
+                f'<td class="client-phone">(11) 9{index:04d}-{index % 10000:04d}</td>'
+                f'<td class="client-service-count">{self.services_per_client}</td></tr>'
+            )
+
+        pagination = ""
+        if end < self.clients:
+            pagination = (f'<ul class="pagination"><li class="next">'
+                          f'<a href="/clientes?page={page + 1}">Próxima</a></li></ul>')
+
+        return (f'<html><body><input type="search">'
+                f'<table class="client-table"><tbody>{"".join(rows)}</tbody></table>'
+                f'{pagination}</body></html>')
+
+    def _services_page(self, client_id: str) -> str:
+        # Determinístico por cliente para que reexecuções gerem os mesmos dados
+        generator = random.Random(f"{self.seed}-{client_id}")
+        rows = []
+        for index in range(self.services_per_client):
+            rows.append(
+                f'<tr class="service-row">'
+                f'<td class="service-date">{generator.randint(1, 28):02d}/{generator.randint(1, 12):02d}/2024</td>'
+                f'<td class="service-type">{escape(generator.choice(SERVICE_TYPES))} {index}</td>'
+                f'<td class="service-description">Serviço {index} do cliente {client_id}</td>'
+                f'<td class="service-status">{generator.choice(SERVICE_STATUSES)}</td></tr>'
+            )
+        empty = '' if rows else '<p class="services-empty">Nenhum serviço</p>'
+        return (f'<html><body><table class="services-table"><tbody>{"".join(rows)}</tbody></table>'
+                f'{empty}</body></html>')
+
+    def _handler_class(self):
+        site = self
+        services_path = re.compile(r'^/clientes/([^/]+)/servicos/?$')
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+
+                if url.path == '/login':
+                    self._send(200, LOGIN_PAGE)
+                    return
+                if not self._authenticated():
+                    self._redirect('/login')
+                    return
+
+                if url.path in ('/dashboard', '/home'):
+                    self._send(200, '<html><body><h1>Dashboard</h1></body></html>')
+                elif url.path.rstrip('/') == '/clientes':
+                    if site._delay_and_maybe_fail('clientes'):
+                        self._send(500, '<html><body>Erro interno</body></html>')
+                        return
+                    page = int(parse_qs(url.query).get('page', ['1'])[0])
+                    self._send(200, site._clients_page(page))
+                elif services_path.match(url.path):
+                    if site._delay_and_maybe_fail('servicos'):
+                        self._send(500, '<html><body>Erro interno</body></html>')
+                        return
+                    self._send(200, site._services_page(services_path.match(url.path).group(1)))
+                else:
+                    self._send(404, '<html><body>Não encontrado</body></html>')
+
+            def do_POST(self):
+                if urlparse(self.path).path != '/login':
+                    self._send(404, '<html><body>Não encontrado</body></html>')
+                    return
+
+                length = int(self.headers.get('Content-Length', 0))
+                self.rfile.read(length)
+                token = secrets.token_hex(16)
+                site._sessions.add(token)
+
+                self.send_response(302)
+                self.send_header('Set-Cookie', f'session={token}; Path=/')
+                self.send_header('Location', '/dashboard')
+                self.end_headers()
+
+            def _authenticated(self) -> bool:
+                cookies = self.headers.get('Cookie', '')
+                for cookie in cookies.split(';'):
+                    name, _, value = cookie.strip().partition('=')
+                    if name == 'session' and value in site._sessions:
+                        return True
+                return False
+
+            def _redirect(self, location: str):
+                self.send_response(302)
+                self.send_header('Location', location)
+                self.end_headers()
+
+            def _send(self, code: int, body: str):
+                data = body.encode('utf-8')
+                self.send_response(code)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
\ No newline at end of file
@@ -0,0 +1,247 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+import urllib.parse
+import urllib.request
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from http.cookiejar import CookieJar
+from typing import Callable, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_site import MockSite
+
+# Benchmarks de ponta a ponta contra o site local; não são testes e não rodam no CI.
+# Uso (a partir de DataCrawler/): python benchmarks/run_benchmarks.py --clients 200 --services 10
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    pages: int = 0
+    rows: int = 0
+    # Páginas que falharam (não entram como páginas vazias) e páginas confirmadas sem linhas
+    errors: int = 0
+    empty_pages: int = 0
+    seconds: float = 0.0
+    peak_memory_mb: float = 0.0
+    browser_memory_mb: Optional[float] = None
+    latencies: List[float] = field(default_factory=list, repr=False)
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds if self.seconds else 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+    def report(self) -> dict:
+        data = asdict(self)
+        data.pop('latencies')
+        data.update({
+            'pages_per_second': round(self.pages_per_second, 2),
+            'rows_per_second': round(self.rows_per_second, 2),
+            'p50_ms': round(self.percentile(0.50) * 1000, 1) if self.latencies else None,
+            'p95_ms': round(self.percentile(0.95) * 1000, 1) if self.latencies else None
+        })
+        return data
+
+def measure(name: str, scenario: Callable[[BenchmarkResult], None]) -> BenchmarkResult:
+    result = BenchmarkResult(name=name)
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        scenario(result)
+    finally:
+        result.seconds = time.perf_counter() - started
+        result.peak_memory_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    return result
+
+def configure_environment(base_url: str):
+    # Precisa acontecer antes de importar config.settings, que lê o ambiente na importação
+    defaults = {
+        'WEB_BASE_URL': base_url,
+        'WEB_USERNAME': 'benchmark',
+        'WEB_PASSWORD': 'benchmark',
+        'WEB_TIMEOUT': '5',
+        'HEADLESS_MODE': 'true',
+        'SESSION_CACHE_ENABLED': 'false',
+        'RATE_LIMIT_INITIAL_RPS': '1000',
+        'RATE_LIMIT_MAX_RPS': '1000',
+        'RATE_LIMIT_BURST': '50',
+        'HTTP_RATE_LIMIT_MAX_RPS': '1000'
+    }
+    for name, value in defaults.items():
+        os.environ.setdefault(name, value)
+
+def login_cookies(base_url: str) -> List[dict]:
+    jar = CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    data = urllib.parse.urlencode({'username': 'benchmark', 'password': 'benchmark'}).encode('utf-8')
+    opener.open(f"{base_url}/login", data=data)
+    return [{'name': cookie.name, 'value': cookie.value} for cookie in jar]
+
+def bench_browser(site: MockSite, result: BenchmarkResult):
+    from crawlers.selenium_crawler import SeleniumCrawler, ServiceFetchError
+    from service.daemon import browser_memory_mb
+
+    crawler = SeleniumCrawler()
+    try:
+        if not crawler.ensure_session():
+            raise RuntimeError("Login no site local falhou")
+
+        started = time.perf_counter()
+        clients = list(crawler.iter_clients([""], prefetch=False))
+        client_pages = -(-site.clients // site.page_size)
+        result.latencies.extend([(time.perf_counter() - started) / client_pages] * client_pages)
+        result.pages += client_pages
+        result.rows += len(clients)
+
+        for client in clients:
+            started = time.perf_counter()
+            try:
+                services = crawler.get_client_services(client.client_id)
+            except ServiceFetchError:
+                result.errors += 1
+                continue
+            finally:
+                result.latencies.append(time.perf_counter() - started)
+                result.pages += 1
+            result.rows += len(services)
+            if not services:
+                result.empty_pages += 1
+
+        result.browser_memory_mb = round(browser_memory_mb(crawler), 1)
+    finally:
+        crawler.close()
+
+def bench_http(site: MockSite, result: BenchmarkResult):
+    from crawlers.http_fetcher import HttpFastPath
+
+    fast_path = HttpFastPath(login_cookies(site.base_url))
+
+    # Listagem pelo mesmo caminho do crawl (paginação incluída)
+    started = time.perf_counter()
+    clients = fast_path.fetch_clients()
+    client_pages = -(-site.clients // site.page_size)
+    result.latencies.extend([(time.perf_counter() - started) / client_pages] * client_pages)
+    result.pages += client_pages
+    if clients is None:
+        # Alguma página da listagem falhou (o crawl iria para o navegador); segue com os
+        # IDs do site para medir as páginas de serviços mesmo assim
+        result.errors += 1
+        client_ids = site.client_ids()
+    else:
+        result.rows += len(clients)
+        client_ids = [client.client_id for client in clients]
+
+    # Sem latência por página no caminho assíncrono: mede por lote de requisições paralelas,
+    # com a mesma sessão reaproveitada entre os lotes como no crawl
+    started = time.perf_counter()
+    for chunk, results in fast_path.iter_services(client_ids, fast_path.max_connections):
+        elapsed = time.perf_counter() - started
+        result.latencies.extend([elapsed] * len(chunk))
+        result.pages += len(chunk)
+        for services in results.values():
+            if services is None:
+                # Falha ou página sem linhas no HTML: nos dois casos o crawl recorre ao navegador
+                result.errors += 1
+            else:
+                result.rows += len(services)
+        started = time.perf_counter()
+
+def bench_db_write(site: MockSite, result: BenchmarkResult):
+    from benchmarks.storage import SQLiteStorage
+    from models.data_models import Service
+    from pipeline.streaming_writer import StreamingWriter
+
+    storage = SQLiteStorage()
+    extraction_date = datetime.now()
+    try:
+        with StreamingWriter(storage) as writer:
+            for client_id in site.client_ids():
+                services = [
+                    Service(client_id=client_id, service_date=f"{(index % 28) + 1:02d}/01/2024",
+                            service_type=f"Manutenção {index}", description=f"Serviço {index}",
+                            status="Concluído", extraction_date=extraction_date)
+                    for index in range(site.services_per_client)
+                ]
+                writer.put(client_id, services)
+
+        result.rows = writer.stats.rows_written
+        result.pages = writer.stats.batches_written
+        result.latencies = list(storage.write_seconds)
+    finally:
+        storage.close()
+
+SCENARIOS = {
+    'browser': bench_browser,
+    'http': bench_http,
+    'db_write': bench_db_write
+}
+
+def print_report(results: List[BenchmarkResult]):
+    header = f"{'cenário':<10} {'páginas':>8} {'erros':>6} {'vazias':>6} {'linhas':>8} {'s':>8} {'pág/s':>8} " \
+             f"{'linhas/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'pico MB':>8} {'chrome MB':>10}"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        data = result.report()
+        print(f"{result.name:<10} {result.pages:>8} {result.errors:>6} {result.empty_pages:>6} "
+              f"{result.rows:>8} {result.seconds:>8.2f} "
+              f"{data['pages_per_second']:>8.2f} {data['rows_per_second']:>10.1f} "
+              f"{data['p50_ms'] if data['p50_ms'] is not None else '-':>8} "
+              f"{data['p95_ms'] if data['p95_ms'] is not None else '-':>8} "
+              f"{result.peak_memory_mb:>8.1f} "
+              f"{result.browser_memory_mb if result.browser_memory_mb is not None else '-':>10}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmarks do crawler contra um site local")
+    parser.add_argument('--clients', type=int, default=100)
+    parser.add_argument('--services', type=int, default=10, help="serviços por cliente")
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--scenarios', default='browser,http,db_write',
+                        help=f"lista separada por vírgula entre: {', '.join(SCENARIOS)}")
+    parser.add_argument('--json', help="grava o relatório em JSON neste arquivo")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    site = MockSite(clients=args.clients, services_per_client=args.services, page_size=args.page_size,
+                    latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+    configure_environment(site.base_url)
+
+    results = []
+    with site:
+        for name in [name.strip() for name in args.scenarios.split(',') if name.strip()]:
+            results.append(measure(name, lambda result: SCENARIOS[name](site, result)))
+
+    print_report(results)
+    print(f"\nSite local: {site.stats.requests} requisições, {site.stats.errors_injected} erros injetados")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as report_file:
+            json.dump({
+                'generated_at': datetime.now().isoformat(),
+                'parameters': vars(args),
+                'results': [result.report() for result in results],
+                'site_requests': site.stats.requests,
+                'site_errors': site.stats.errors_injected
+            }, report_file, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
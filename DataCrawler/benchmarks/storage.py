@@ -0,0 +1,67 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional, Union
+
+from models.data_models import Client, Service, ServiceBatch
+
+SERVICE_COLUMNS = ('client_id', 'service_date', 'service_type', 'description', 'status', 'extraction_date')
+
+# Adaptador explícito: o adaptador padrão de datetime do sqlite3 está obsoleto
+sqlite3.register_adapter(datetime, datetime.isoformat)
+
+class SQLiteStorage:
+    # Substitui o SQLServerHandler nos benchmarks: mesma interface usada pelo
+    # pipeline (save_clients/save_services), gravando em SQLite em memória
+    def __init__(self, path: str = ':memory:'):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self.write_seconds: List[float] = []
+        self._connection.executescript("""
+            CREATE TABLE clientes (
+                client_id TEXT NOT NULL, name TEXT NOT NULL, email TEXT, phone TEXT,
+                extraction_date TEXT NOT NULL
+            );
+            CREATE TABLE servicos (
+                client_id TEXT NOT NULL, service_date TEXT NOT NULL, service_type TEXT NOT NULL,
+                description TEXT, status TEXT, extraction_date TEXT NOT NULL
+            );
+        """)
+
+    def save_clients(self, clients: List[Client]) -> bool:
+        now = datetime.now().isoformat()
+        rows = [(client.client_id, client.name, client.email, client.phone,
+                 client.extraction_date.isoformat() if client.extraction_date else now)
+                for client in clients]
+        return self._write("INSERT INTO clientes VALUES (?, ?, ?, ?, ?)", rows)
+
+    def save_services(self, services: Union[List[Service], ServiceBatch]) -> bool:
+        if not isinstance(services, ServiceBatch):
+            services = ServiceBatch.from_services(services)
+        rows = services.to_params(SERVICE_COLUMNS)
+        return self._write("INSERT INTO servicos VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def _write(self, sql: str, rows: list) -> bool:
+        started = time.perf_counter()
+        with self._lock:
+            self._connection.executemany(sql, rows)
+            self._connection.commit()
+        self.write_seconds.append(time.perf_counter() - started)
+        return True
+
+    def refresh_return_dates(self, client_ids: Optional[List[str]] = None,
+                             interval_days: Optional[int] = None) -> bool:
+        return True
+
+    def get_client_count(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(DISTINCT client_id) FROM clientes").fetchone()[0]
+
+    def get_service_count(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM servicos").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
\ No newline at end of file
@@ -1,4 +1,5 @@
 import os
+import socket
 from dotenv import load_dotenv
 from typing import Dict, Any
 
@@ -10,6 +11,8 @@ class WebConfig:
     PASSWORD = os.getenv('WEB_PASSWORD')
     LOGIN_URL = os.getenv('WEB_LOGIN_URL', '/login')
     TIMEOUT = int(os.getenv('WEB_TIMEOUT', '30'))
+    CLIENTS_API_PATTERN = os.getenv('CLIENTS_API_PATTERN', r'/api/(v\d+/)?clientes/?(\?|$)')
+    SERVICES_API_PATTERN = os.getenv('SERVICES_API_PATTERN', r'/api/(v\d+/)?clientes/[^/]+/servicos')
     
     SELECTORS = {
         'username_field': os.getenv('USERNAME_SELECTOR', '#username'),
@@ -21,8 +24,11 @@ class WebConfig:
         'client_name': os.getenv('CLIENT_NAME_SELECTOR', '.client-name'),
         'client_email': os.getenv('CLIENT_EMAIL_SELECTOR', '.client-email'),
         'client_phone': os.getenv('CLIENT_PHONE_SELECTOR', '.client-phone'),
+        'client_service_count': os.getenv('CLIENT_SERVICE_COUNT_SELECTOR', '.client-service-count'),
+        'client_next_page': os.getenv('CLIENT_NEXT_PAGE_SELECTOR', '.pagination .next a, a[rel="next"]'),
         'services_table': os.getenv('SERVICES_TABLE_SELECTOR', '.services-table'),
         'service_rows': os.getenv('SERVICE_ROWS_SELECTOR', '.service-row'),
+        'services_empty': os.getenv('SERVICES_EMPTY_SELECTOR', '.services-empty, .empty-state'),
         'service_date': os.getenv('SERVICE_DATE_SELECTOR', '.service-date'),
         'service_type': os.getenv('SERVICE_TYPE_SELECTOR', '.service-type'),
         'service_description': os.getenv('SERVICE_DESCRIPTION_SELECTOR', '.service-description'),
@@ -35,6 +41,15 @@ class DatabaseConfig:
     USERNAME = os.getenv('DB_USERNAME', 'sa')
     PASSWORD = os.getenv('DB_PASSWORD')
     TRUSTED_CONNECTION = os.getenv('DB_TRUSTED_CONNECTION', 'no').lower() == 'yes'
+    BULK_WRITE = os.getenv('DB_BULK_WRITE', 'false').lower() == 'true'
+    BULK_BATCH_SIZE = int(os.getenv('DB_BULK_BATCH_SIZE', '1000'))
+    POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+    POOL_HEALTH_CHECK_SECONDS = float(os.getenv('DB_POOL_HEALTH_CHECK_SECONDS', '30'))
+    POOL_CONNECT_RETRIES = int(os.getenv('DB_POOL_CONNECT_RETRIES', '3'))
+    # 'snapshot' grava uma cópia por execução; 'scd2' grava só versões novas ou alteradas
+    STORAGE_MODEL = os.getenv('DB_STORAGE_MODEL', 'snapshot').lower()
+    # Registra em log_alteracoes só as inclusões, alterações e exclusões reais de cada execução
+    CHANGE_LOG = os.getenv('DB_CHANGE_LOG', 'false').lower() == 'true'
     
     @property
     def connection_string(self) -> str:
@@ -48,8 +63,83 @@ class CrawlerConfig:
     MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
     HEADLESS_MODE = os.getenv('HEADLESS_MODE', 'true').lower() == 'true'
     DOWNLOAD_PATH = os.getenv('DOWNLOAD_PATH', './downloads')
+    MAX_WORKERS = int(os.getenv('MAX_WORKERS', '1'))
+    CLIENT_SEARCH_TERMS = [term.strip() for term in os.getenv('CLIENT_SEARCH_TERMS', '').split(',') if term.strip()]
+    CLIENT_MAX_PAGES = int(os.getenv('CLIENT_MAX_PAGES', '1000'))
+    PIPELINE_BATCH_SIZE = int(os.getenv('PIPELINE_BATCH_SIZE', '500'))
+    PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '100'))
+    PIPELINE_FLUSH_SECONDS = float(os.getenv('PIPELINE_FLUSH_SECONDS', '30'))
+    INCREMENTAL_MODE = os.getenv('INCREMENTAL_MODE', 'false').lower() == 'true'
+    INCREMENTAL_MAX_AGE_DAYS = int(os.getenv('INCREMENTAL_MAX_AGE_DAYS', '7'))
+    JOURNAL_PATH = os.getenv('JOURNAL_PATH', './crawler_journal.db')
+    
+    # Crawl distribuído: fila de clientes com prazo de reserva compartilhada entre nós
+    NODE_ID = os.getenv('CRAWLER_NODE_ID') or f"{socket.gethostname()}-{os.getpid()}"
+    WORK_QUEUE_BACKEND = os.getenv('WORK_QUEUE_BACKEND', 'sqlserver').lower()
+    WORK_QUEUE_SQLITE_PATH = os.getenv('WORK_QUEUE_SQLITE_PATH', './work_queue.db')
+    WORK_QUEUE_NAME = os.getenv('WORK_QUEUE_NAME', 'servicos')
+    WORK_QUEUE_BATCH_SIZE = int(os.getenv('WORK_QUEUE_BATCH_SIZE', '20'))
+    WORK_QUEUE_LEASE_SECONDS = int(os.getenv('WORK_QUEUE_LEASE_SECONDS', '600'))
+    WORK_QUEUE_MAX_ATTEMPTS = int(os.getenv('WORK_QUEUE_MAX_ATTEMPTS', '3'))
+    WORK_QUEUE_POLL_SECONDS = float(os.getenv('WORK_QUEUE_POLL_SECONDS', '15'))
+    
+    # Relatório JSON e arquivo Prometheus gravados ao fim de cada execução
+    METRICS_REPORT_DIR = os.getenv('METRICS_REPORT_DIR', './reports')
+    PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'false').lower() == 'true'
+    PROFILER_INTERVAL_MS = float(os.getenv('PROFILER_INTERVAL_MS', '10'))
+    
+    # Exportação para análise fora do SQL Server: lista separada por vírgula entre parquet e xlsx
+    EXPORT_FORMATS = [name.strip().lower() for name in os.getenv('EXPORT_FORMATS', '').split(',') if name.strip()]
+    EXPORT_DIR = os.getenv('EXPORT_DIR', './exports')
+    EXPORT_PARQUET_COMPRESSION = os.getenv('EXPORT_PARQUET_COMPRESSION', 'zstd')
+    
+    RATE_LIMIT_INITIAL_RPS = float(os.getenv('RATE_LIMIT_INITIAL_RPS', str(1 / max(DELAY_BETWEEN_REQUESTS, 0.01))))
+    RATE_LIMIT_MIN_RPS = float(os.getenv('RATE_LIMIT_MIN_RPS', '0.1'))
+    RATE_LIMIT_MAX_RPS = float(os.getenv('RATE_LIMIT_MAX_RPS', '5.0'))
+    RATE_LIMIT_TARGET_LATENCY = float(os.getenv('RATE_LIMIT_TARGET_LATENCY', '2.0'))
+    RATE_LIMIT_BURST = float(os.getenv('RATE_LIMIT_BURST', '1'))
+    READY_GRACE_SECONDS = float(os.getenv('READY_GRACE_SECONDS', '1.0'))
+    
+    HTTP_FAST_PATH = os.getenv('HTTP_FAST_PATH', 'false').lower() == 'true'
+    HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', '8'))
+    HTTP_CHUNK_SIZE = int(os.getenv('HTTP_CHUNK_SIZE', '50'))
+    # Limitador próprio do caminho HTTP: com o limitador compartilhado (RATE_LIMIT_MAX_RPS)
+    # as conexões paralelas ficariam esperando o mesmo balde e não ganhariam vazão
+    HTTP_RATE_LIMIT_MAX_RPS = float(os.getenv('HTTP_RATE_LIMIT_MAX_RPS', '20'))
+    
+    LEAN_MODE = os.getenv('LEAN_MODE', 'false').lower() == 'true'
+    LEAN_BLOCKED_RESOURCE_TYPES = os.getenv('LEAN_BLOCKED_RESOURCE_TYPES', 'Image,Font,Media')
+    LEAN_BLOCKED_URL_PATTERNS = os.getenv(
+        'LEAN_BLOCKED_URL_PATTERNS',
+        '*google-analytics.com*,*googletagmanager.com*,*doubleclick.net*,*facebook.net*,*hotjar.com*'
+    )
+    LEAN_MEASURE_BASELINE = os.getenv('LEAN_MEASURE_BASELINE', 'true').lower() == 'true'
+    NETWORK_CAPTURE_MODE = os.getenv('NETWORK_CAPTURE_MODE', 'false').lower() == 'true'
+    # Tempo máximo esperando a resposta da API terminar depois que a página ficou pronta
+    NETWORK_CAPTURE_WAIT_SECONDS = float(os.getenv('NETWORK_CAPTURE_WAIT_SECONDS', '5'))
+    
+    SESSION_CACHE_ENABLED = os.getenv('SESSION_CACHE_ENABLED', 'false').lower() == 'true'
+    SESSION_CACHE_PATH = os.getenv('SESSION_CACHE_PATH', './.session_cache')
+    SESSION_CACHE_KEY = os.getenv('SESSION_CACHE_KEY')
+    SESSION_CACHE_TTL_MINUTES = int(os.getenv('SESSION_CACHE_TTL_MINUTES', '60'))
+    SESSION_CHECK_URL = os.getenv('SESSION_CHECK_URL', '/clientes')
+    
+    DAEMON_INTERVAL_MINUTES = float(os.getenv('DAEMON_INTERVAL_MINUTES', '60'))
+    DAEMON_STATUS_HOST = os.getenv('DAEMON_STATUS_HOST', '127.0.0.1')
+    DAEMON_STATUS_PORT = int(os.getenv('DAEMON_STATUS_PORT', '8765'))
+    BROWSER_RECYCLE_PAGES = int(os.getenv('BROWSER_RECYCLE_PAGES', '500'))
+    BROWSER_MAX_MEMORY_MB = int(os.getenv('BROWSER_MAX_MEMORY_MB', '1500'))
+    # A cada quantos clientes o crawl consulta os limites acima durante a execução
+    BROWSER_CHECK_INTERVAL = int(os.getenv('BROWSER_CHECK_INTERVAL', '25'))
     
     DATA_RETENTION_DAYS = int(os.getenv('DATA_RETENTION_DAYS', '365'))
+    # Abaixo de ~5000 linhas por DELETE o SQL Server não escala para lock de tabela
+    RETENTION_BATCH_SIZE = int(os.getenv('RETENTION_BATCH_SIZE', '4000'))
+    RETENTION_PAUSE_SECONDS = float(os.getenv('RETENTION_PAUSE_SECONDS', '0.2'))
+    RETENTION_BACKGROUND = os.getenv('RETENTION_BACKGROUND', 'false').lower() == 'true'
+    
+    # Dias entre o último serviço e o retorno esperado do cliente
+    RETURN_INTERVAL_DAYS = int(os.getenv('RETURN_INTERVAL_DAYS', '30'))
 
 web_config = WebConfig()
 db_config = DatabaseConfig()
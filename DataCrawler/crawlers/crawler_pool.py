@@ -0,0 +1,176 @@
+import logging
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config.settings import crawler_config
+from crawlers.selenium_crawler import SeleniumCrawler
+from models.data_models import Service
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PoolResult:
+    client_ids: List[str] = field(default_factory=list)
+    services: Dict[str, List[Service]] = field(default_factory=dict)
+    processed: int = 0
+    failed_clients: List[str] = field(default_factory=list)
+
+    @property
+    def all_services(self) -> List[Service]:
+        merged = []
+        for client_id in self.client_ids:
+            merged.extend(self.services.get(client_id, []))
+        return merged
+
+class _WorkSource:
+    # Entrega IDs de uma lista ou de um gerador (consumido sob demanda) e
+    # dá prioridade aos clientes recolocados para nova tentativa
+    def __init__(self, client_ids: Iterable[str], result: PoolResult):
+        self._iterator = iter(client_ids)
+        self._retries = queue.Queue()
+        self._lock = threading.Lock()
+        self._exhausted = False
+        self._result = result
+
+    def next(self) -> Optional[Tuple[str, int]]:
+        try:
+            return self._retries.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._exhausted:
+                return None
+            try:
+                client_id = next(self._iterator)
+            except StopIteration:
+                self._exhausted = True
+                return None
+            except Exception as e:
+                logger.error(f"Erro ao obter próximo cliente: {e}")
+                self._exhausted = True
+                return None
+
+            self._result.client_ids.append(client_id)
+            return client_id, 0
+
+    def retry(self, client_id: str, attempt: int):
+        self._retries.put((client_id, attempt))
+
+    def drain(self) -> List[str]:
+        remaining = []
+        while True:
+            item = self.next()
+            if item is None:
+                return remaining
+            remaining.append(item[0])
+
+class CrawlerPool:
+    def __init__(self, max_workers: Optional[int] = None,
+                 crawler_factory: Callable[[], SeleniumCrawler] = SeleniumCrawler):
+        self.max_workers = max(1, max_workers or crawler_config.MAX_WORKERS)
+        self.crawler_factory = crawler_factory
+        self._lock = threading.Lock()
+
+    def crawl_services(self, client_ids: Iterable[str],
+                       on_services: Optional[Callable[[str, List[Service]], None]] = None,
+                       maintenance: Optional[Callable[[SeleniumCrawler], None]] = None) -> PoolResult:
+        # client_ids pode ser um gerador: os workers começam assim que o primeiro ID chega
+        result = PoolResult()
+        work = _WorkSource(client_ids, result)
+
+        worker_count = self.max_workers
+        if hasattr(client_ids, '__len__'):
+            worker_count = min(worker_count, len(client_ids))
+        workers = [
+            threading.Thread(
+                target=self._worker,
+                args=(worker_id, work, result, on_services, maintenance),
+                name=f"crawler-worker-{worker_id}",
+                daemon=True
+            )
+            for worker_id in range(1, worker_count + 1)
+        ]
+
+        logger.info(f"Iniciando {worker_count} workers")
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        # Clientes que sobraram porque todos os workers falharam
+        result.failed_clients.extend(work.drain())
+
+        logger.info(f"Pool finalizado: {result.processed} clientes processados, "
+                    f"{len(result.failed_clients)} com falha")
+        return result
+
+    def _start_crawler(self, worker_id: int) -> Optional[SeleniumCrawler]:
+        crawler = None
+        try:
+            crawler = self.crawler_factory()
+            if crawler.ensure_session():
+                return crawler
+            logger.error(f"Worker {worker_id}: falha no login")
+        except Exception as e:
+            logger.error(f"Worker {worker_id}: erro ao iniciar navegador: {e}")
+
+        if crawler:
+            crawler.close()
+        return None
+
+    def _worker(self, worker_id: int, work: _WorkSource, result: PoolResult,
+                on_services: Optional[Callable[[str, List[Service]], None]],
+                maintenance: Optional[Callable[[SeleniumCrawler], None]] = None):
+        crawler = self._start_crawler(worker_id)
+        if not crawler:
+            logger.error(f"Worker {worker_id} encerrado sem processar clientes")
+            return
+
+        handled = 0
+
+        try:
+            while True:
+                item = work.next()
+                if item is None:
+                    break
+                client_id, attempt = item
+
+                try:
+                    services = crawler.get_client_services(client_id)
+                except Exception as e:
+                    logger.error(f"Worker {worker_id}: erro no cliente {client_id} "
+                                 f"(tentativa {attempt + 1}): {e}")
+                    if attempt + 1 < crawler_config.MAX_RETRIES:
+                        work.retry(client_id, attempt + 1)
+                    else:
+                        with self._lock:
+                            result.failed_clients.append(client_id)
+
+                    # O navegador pode ter ficado inutilizável; reinicia a sessão do worker
+                    crawler.close()
+                    crawler = self._start_crawler(worker_id)
+                    if not crawler:
+                        logger.error(f"Worker {worker_id} encerrado após falha ao reiniciar")
+                        break
+                    continue
+
+                # Com callback os resultados são repassados e não acumulados no pool.
+                # O callback roda fora do lock: writer.put pode bloquear com a fila cheia
+                # e não deve segurar os outros workers
+                with self._lock:
+                    result.processed += 1
+                    if not on_services:
+                        result.services[client_id] = services
+                if on_services:
+                    on_services(client_id, services)
+
+                # Dá ao chamador a chance de reciclar o navegador no meio da execução
+                handled += 1
+                if maintenance and handled % max(1, crawler_config.BROWSER_CHECK_INTERVAL) == 0:
+                    maintenance(crawler)
+        finally:
+            if crawler:
+                crawler.close()
\ No newline at end of file
@@ -0,0 +1,169 @@
+import json
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from config.settings import crawler_config
+
+logger = logging.getLogger(__name__)
+
+# Tipos de recurso do DevTools -> padrões de URL usados para bloqueá-los
+RESOURCE_TYPE_PATTERNS = {
+    'Image': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.bmp'],
+    'Font': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'],
+    'Stylesheet': ['*.css'],
+    'Media': ['*.mp4', '*.webm', '*.mp3', '*.ogg', '*.wav']
+}
+
+LEAN_CHROME_ARGUMENTS = [
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-background-timer-throttling',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--disable-translate',
+    '--disable-features=Translate,MediaRouter,OptimizationHints',
+    '--metrics-recording-only',
+    '--mute-audio',
+    '--no-first-run'
+]
+
+NAVIGATION_TIME_SCRIPT = """
+const entry = performance.getEntriesByType('navigation')[0];
+return entry ? entry.domContentLoadedEventEnd : null;
+"""
+
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+def blocked_url_patterns() -> List[str]:
+    patterns = []
+    for resource_type in _split(crawler_config.LEAN_BLOCKED_RESOURCE_TYPES):
+        patterns.extend(RESOURCE_TYPE_PATTERNS.get(resource_type, []))
+    patterns.extend(_split(crawler_config.LEAN_BLOCKED_URL_PATTERNS))
+    return patterns
+
+def apply_lean_options(chrome_options):
+    # Imagens são bloqueadas só pelo Network.setBlockedURLs (NetworkMonitor): desligá-las
+    # também no Chrome impediria as requisições, o bloqueio nunca seria contado e a
+    # medição sem bloqueio (measure_baseline) sairia sem imagens
+    chrome_options.page_load_strategy = 'eager'
+    for argument in LEAN_CHROME_ARGUMENTS:
+        chrome_options.add_argument(argument)
+    chrome_options.add_experimental_option('prefs', {
+        'profile.default_content_setting_values.notifications': 2
+    })
+
+def enable_performance_log(chrome_options):
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+def drain_performance_log(driver) -> List[Dict]:
+    events = []
+    for entry in driver.get_log('performance'):
+        try:
+            events.append(json.loads(entry['message'])['message'])
+        except (KeyError, ValueError):
+            continue
+    return events
+
+@dataclass
+class PageNetworkStats:
+    url: str
+    requests: int = 0
+    blocked: int = 0
+    bytes_received: int = 0
+    load_ms: Optional[float] = None
+
+class NetworkMonitor:
+    def __init__(self, driver):
+        self.driver = driver
+        self.blocking = False
+
+        self.pages = 0
+        self.total_bytes = 0
+        self.total_blocked = 0
+        self.total_load_ms = 0.0
+
+        # Preenchidos por measure_baseline()
+        self.bytes_per_blocked: Optional[float] = None
+        self.time_saved_ms: Optional[float] = None
+
+    def enable_blocking(self, patterns: Optional[List[str]] = None):
+        self.driver.execute_cdp_cmd('Network.enable', {})
+        self.driver.execute_cdp_cmd('Network.setBlockedURLs', {
+            'urls': patterns if patterns is not None else blocked_url_patterns()
+        })
+        self.blocking = True
+
+    def disable_blocking(self):
+        self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+        self.blocking = False
+
+    def drain_events(self) -> List[Dict]:
+        return drain_performance_log(self.driver)
+
+    def page_stats(self, url: str, events: Optional[List[Dict]] = None) -> PageNetworkStats:
+        stats = PageNetworkStats(url=url)
+        for event in events if events is not None else self.drain_events():
+            method = event.get('method')
+            params = event.get('params', {})
+            if method == 'Network.requestWillBeSent':
+                stats.requests += 1
+            elif method == 'Network.loadingFinished':
+                stats.bytes_received += int(params.get('encodedDataLength', 0))
+            elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+                stats.blocked += 1
+
+        try:
+            stats.load_ms = self.driver.execute_script(NAVIGATION_TIME_SCRIPT)
+        except Exception:
+            stats.load_ms = None
+        return stats
+
+    def record_page(self, url: str, events: Optional[List[Dict]] = None) -> PageNetworkStats:
+        stats = self.page_stats(url, events)
+        self.pages += 1
+        self.total_bytes += stats.bytes_received
+        self.total_blocked += stats.blocked
+        self.total_load_ms += stats.load_ms or 0.0
+
+        saved = ""
+        if self.bytes_per_blocked is not None:
+            saved = (f", ~{int(stats.blocked * self.bytes_per_blocked)} bytes e "
+                     f"~{self.time_saved_ms or 0:.0f} ms economizados")
+        logger.info(f"Página {url}: {stats.bytes_received} bytes, {stats.blocked} recursos bloqueados, "
+                    f"{stats.load_ms or 0:.0f} ms{saved}")
+        return stats
+
+    def measure_baseline(self, url: str):
+        # Carrega a mesma página sem e com bloqueio para estimar a economia por página
+        patterns = blocked_url_patterns()
+        self.disable_blocking()
+        self.driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+        self.drain_events()
+        self.driver.get(url)
+        full = self.page_stats(url)
+
+        self.enable_blocking(patterns)
+        self.driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+        self.drain_events()
+        self.driver.get(url)
+        lean = self.page_stats(url)
+
+        self.bytes_per_blocked = max(0, full.bytes_received - lean.bytes_received) / max(lean.blocked, 1)
+        self.time_saved_ms = max(0.0, (full.load_ms or 0.0) - (lean.load_ms or 0.0))
+        logger.info(f"Modo enxuto em {url}: {full.bytes_received} -> {lean.bytes_received} bytes, "
+                    f"{full.load_ms or 0:.0f} -> {lean.load_ms or 0:.0f} ms")
+
+    def log_summary(self):
+        if not self.pages:
+            return
+
+        summary = (f"Resumo de rede: {self.pages} páginas, {self.total_bytes} bytes recebidos, "
+                   f"{self.total_blocked} recursos bloqueados, "
+                   f"{self.total_load_ms / self.pages:.0f} ms médios por página")
+        if self.bytes_per_blocked is not None:
+            summary += (f"; economia estimada de {int(self.total_blocked * self.bytes_per_blocked)} bytes "
+                        f"e {(self.time_saved_ms or 0) * self.pages / 1000:.1f} s")
+        logger.info(summary)
\ No newline at end of file
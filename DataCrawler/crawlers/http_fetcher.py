@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import aiohttp
+import lxml.etree
+import lxml.html
+
+from config.settings import web_config, crawler_config
+from crawlers.table_extractor import (CLIENT_FIELD_SELECTORS, SERVICE_FIELD_SELECTORS,
+                                      build_client, build_service, resolve_selectors)
+from models.data_models import Client, Service
+from utils.metrics import metrics
+from utils.rate_limiter import AdaptiveRateLimiter
+
+logger = logging.getLogger(__name__)
+
+def parse_document(html: str):
+    # Corpo vazio ou inválido com status 200: None faz o chamador usar o navegador
+    try:
+        return lxml.html.fromstring(html)
+    except (lxml.etree.ParserError, ValueError) as e:
+        logger.warning(f"HTML não pôde ser interpretado: {e}")
+        return None
+
+def parse_rows_html(html: str, rows_selector: str, fields: Dict[str, str]) -> Optional[List[Dict[str, Optional[str]]]]:
+    root = parse_document(html)
+    return parse_rows(root, rows_selector, fields) if root is not None else None
+
+def parse_rows(root, rows_selector: str, fields: Dict[str, str]) -> List[Dict[str, Optional[str]]]:
+    rows = []
+    for element in root.cssselect(rows_selector):
+        row = {}
+        for name, selector in fields.items():
+            cells = element.cssselect(selector)
+            row[name] = cells[0].text_content().strip() if cells else None
+        rows.append(row)
+    return rows
+
+def next_page_url(root, page_url: str) -> Optional[str]:
+    # Mesmas regras do NEXT_PAGE_SCRIPT do navegador; '' indica paginação por JavaScript
+    links = root.cssselect(web_config.SELECTORS['client_next_page'])
+    if not links:
+        return None
+    link = links[0]
+    parent = link.getparent()
+    if ('disabled' in (link.get('class') or '').split() or link.get('aria-disabled') == 'true'
+            or (parent is not None and 'disabled' in (parent.get('class') or '').split())):
+        return None
+    href = link.get('href') or ''
+    if not href or href.startswith('#') or href.startswith('javascript'):
+        return ''
+    return urljoin(page_url, href)
+
+class HttpFastPath:
+    # Busca as páginas de dados com HTTP puro reaproveitando a sessão do navegador.
+    # Retorna None quando a página não traz as linhas no HTML (precisa de JavaScript
+    # ou a sessão expirou) para que o chamador use o navegador.
+    def __init__(self, cookies: List[dict], user_agent: Optional[str] = None,
+                 max_connections: Optional[int] = None,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None):
+        self.update_cookies(cookies)
+        self.user_agent = user_agent
+        self.max_connections = max(1, max_connections or crawler_config.HTTP_MAX_CONNECTIONS)
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(
+            initial_rate=crawler_config.HTTP_RATE_LIMIT_MAX_RPS / 2,
+            max_rate=crawler_config.HTTP_RATE_LIMIT_MAX_RPS,
+            burst=self.max_connections
+        )
+
+    def update_cookies(self, cookies: List[dict]):
+        self.cookie_header = "; ".join(f"{cookie['name']}={cookie['value']}" for cookie in cookies)
+
+    @classmethod
+    def from_driver(cls, driver, **kwargs) -> 'HttpFastPath':
+        user_agent = driver.execute_script("return navigator.userAgent")
+        return cls(driver.get_cookies(), user_agent, **kwargs)
+
+    def fetch_clients(self) -> Optional[List[Client]]:
+        return asyncio.run(self._run(self._fetch_clients))
+
+    def fetch_services(self, client_ids: List[str]) -> Dict[str, Optional[List[Service]]]:
+        return asyncio.run(self._run(lambda session: self._fetch_chunk(session, client_ids)))
+
+    def iter_services(self, client_ids: List[str],
+                      chunk_size: int) -> Iterator[Tuple[List[str], Dict[str, Optional[List[Service]]]]]:
+        # Um loop e uma sessão (com o pool de conexões) para todos os lotes. Entre um lote
+        # e outro o loop fica parado e o chamador usa o navegador para os fallbacks.
+        chunk_size = max(1, chunk_size)
+        loop = asyncio.new_event_loop()
+        try:
+            session = loop.run_until_complete(self._open_session())
+            try:
+                for start in range(0, len(client_ids), chunk_size):
+                    chunk = client_ids[start:start + chunk_size]
+                    yield chunk, loop.run_until_complete(self._fetch_chunk(session, chunk))
+            finally:
+                loop.run_until_complete(session.close())
+        finally:
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
+
+    async def _open_session(self) -> aiohttp.ClientSession:
+        # Cookie vai em cada requisição (_get) para valer após update_cookies
+        headers = {'User-Agent': self.user_agent} if self.user_agent else None
+        connector = aiohttp.TCPConnector(limit=self.max_connections)
+        timeout = aiohttp.ClientTimeout(total=web_config.TIMEOUT)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers)
+
+    async def _run(self, operation):
+        async with await self._open_session() as session:
+            return await operation(session)
+
+    async def _fetch_chunk(self, session: aiohttp.ClientSession,
+                           client_ids: List[str]) -> Dict[str, Optional[List[Service]]]:
+        semaphore = asyncio.Semaphore(self.max_connections)
+
+        async def fetch_one(client_id):
+            async with semaphore:
+                return client_id, await self._fetch_services(session, client_id)
+
+        results = await asyncio.gather(*(fetch_one(client_id) for client_id in client_ids))
+        return dict(results)
+
+    async def _get(self, session: aiohttp.ClientSession, url: str) -> Optional[str]:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.rate_limiter.acquire)
+
+        started = time.monotonic()
+        try:
+            async with session.get(url, headers={'Cookie': self.cookie_header}) as response:
+                html = await response.text()
+                expired = web_config.LOGIN_URL in response.url.path
+                ok = response.status == 200 and not expired
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.rate_limiter.record(time.monotonic() - started, success=False)
+            metrics.inc('navigation_errors_total', source='http')
+            logger.warning(f"Erro HTTP em {url}: {e}")
+            return None
+
+        self.rate_limiter.record(time.monotonic() - started, success=ok)
+        metrics.observe('navigation_seconds', time.monotonic() - started, source='http')
+        metrics.inc('pages_total', source='http', outcome='ready' if ok else 'error')
+        if expired:
+            logger.warning(f"Sessão HTTP redirecionada para o login em {url}")
+        elif not ok:
+            logger.warning(f"HTTP {response.status} em {url}")
+        return html if ok else None
+
+    async def _fetch_clients(self, session: aiohttp.ClientSession) -> Optional[List[Client]]:
+        # Percorre todas as páginas da listagem. Qualquer página que não possa ser lida
+        # devolve None: uma lista parcial seria tratada como a lista completa de clientes.
+        if crawler_config.CLIENT_SEARCH_TERMS:
+            # A busca por termo é um filtro em JavaScript; só o navegador aplica
+            return None
+
+        url = f"{web_config.BASE_URL}/clientes"
+        fields = resolve_selectors(CLIENT_FIELD_SELECTORS)
+        extraction_date = datetime.now()
+        clients = []
+        seen = set()
+        visited = set()
+
+        for page in range(1, crawler_config.CLIENT_MAX_PAGES + 1):
+            html = await self._get(session, url)
+            if html is None:
+                return None
+
+            root = parse_document(html)
+            if root is None:
+                return None
+            with metrics.timer('extraction', table='clientes', source='http'):
+                rows = parse_rows(root, web_config.SELECTORS['client_rows'], fields)
+            metrics.inc('rows_extracted_total', len(rows), table='clientes', source='http')
+            if not rows:
+                return None
+
+            page_clients = [client for client in (build_client(row, extraction_date) for row in rows) if client]
+            signature = tuple(client.client_id for client in page_clients[:5])
+            if signature in visited:
+                break
+            visited.add(signature)
+
+            for client in page_clients:
+                if client.client_id not in seen:
+                    seen.add(client.client_id)
+                    clients.append(client)
+            logger.info(f"Página {page} da listagem via HTTP: {len(page_clients)} clientes")
+
+            url = next_page_url(root, url)
+            if url is None:
+                break
+            if not url:
+                logger.info("Paginação da listagem feita por JavaScript; usando o navegador")
+                return None
+        else:
+            logger.warning(f"Listagem via HTTP atingiu CLIENT_MAX_PAGES ({crawler_config.CLIENT_MAX_PAGES})")
+            return None
+
+        return clients
+
+    async def _fetch_services(self, session: aiohttp.ClientSession, client_id: str) -> Optional[List[Service]]:
+        html = await self._get(session, f"{web_config.BASE_URL}/clientes/{client_id}/servicos")
+        if html is None:
+            return None
+
+        # Sem linhas no HTML não dá para distinguir "sem serviços" de "tabela montada
+        # por JavaScript", então o navegador confirma
+        with metrics.timer('extraction', table='servicos', source='http'):
+            rows = parse_rows_html(html, web_config.SELECTORS['service_rows'],
+                                   resolve_selectors(SERVICE_FIELD_SELECTORS))
+        if not rows:
+            return None
+        metrics.inc('rows_extracted_total', len(rows), table='servicos', source='http')
+
+        extraction_date = datetime.now()
+        services = [build_service(row, client_id, extraction_date) for row in rows]
+        return [service for service in services if service]
\ No newline at end of file
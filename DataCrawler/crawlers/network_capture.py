@@ -0,0 +1,146 @@
+import base64
+import json
+import logging
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from config.settings import crawler_config, web_config
+from crawlers.devtools import drain_performance_log
+from crawlers.table_extractor import build_client, build_service
+from models.data_models import Client, Service
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Campo do modelo -> nomes aceitos nas respostas JSON da API do sistema
+CLIENT_JSON_FIELDS = {
+    'client_id': ['client_id', 'clientId', 'id', 'codigo', 'code'],
+    'name': ['name', 'nome', 'razao_social'],
+    'email': ['email', 'e_mail', 'mail'],
+    'phone': ['phone', 'telefone', 'celular', 'fone'],
+    'service_count': ['service_count', 'serviceCount', 'total_servicos', 'servicos_count']
+}
+
+SERVICE_JSON_FIELDS = {
+    'service_date': ['service_date', 'serviceDate', 'data_servico', 'data', 'date'],
+    'service_type': ['service_type', 'serviceType', 'tipo_servico', 'tipo', 'type'],
+    'description': ['description', 'descricao', 'observacao'],
+    'status': ['status', 'situacao', 'state']
+}
+
+# Páginas seguidas sem a resposta da API até a captura deixar de esperar por ela
+CAPTURE_MAX_MISSES = 3
+
+# Chaves em que a lista de registros costuma vir quando a resposta é um objeto
+RECORD_CONTAINERS = ['data', 'items', 'results', 'rows', 'records', 'clientes', 'servicos', 'clients', 'services']
+
+def extract_records(payload: Any) -> Optional[List[Dict[str, Any]]]:
+    if isinstance(payload, list):
+        return [record for record in payload if isinstance(record, dict)]
+
+    if isinstance(payload, dict):
+        for key in RECORD_CONTAINERS:
+            if key in payload:
+                records = extract_records(payload[key])
+                if records is not None:
+                    return records
+    return None
+
+def map_record(record: Dict[str, Any], fields: Dict[str, List[str]]) -> Dict[str, Optional[str]]:
+    row = {}
+    for field, aliases in fields.items():
+        value = None
+        for alias in aliases:
+            if record.get(alias) is not None:
+                value = str(record[alias]).strip()
+                break
+        row[field] = value
+    return row
+
+class ApiResponseCapture:
+    # Lê do log de performance do Chrome as respostas JSON que alimentam as tabelas
+    def __init__(self, driver):
+        self.driver = driver
+        self.clients_pattern = re.compile(web_config.CLIENTS_API_PATTERN)
+        self.services_pattern = re.compile(web_config.SERVICES_API_PATTERN)
+        # Páginas seguidas sem a resposta esperada, por padrão
+        self.misses: Dict[str, int] = {}
+
+    def collect(self, pattern, timeout: Optional[float] = None) -> List[Dict]:
+        # A tabela pode ficar pronta antes de o corpo da resposta terminar de chegar:
+        # lê o log até uma resposta de `pattern` concluir (ou falhar) ou o prazo vencer
+        timeout = crawler_config.NETWORK_CAPTURE_WAIT_SECONDS if timeout is None else timeout
+        # Se o site não usa essa API (páginas montadas no servidor), para de esperar por ela
+        if self.misses.get(pattern.pattern, 0) >= CAPTURE_MAX_MISSES:
+            timeout = 0
+        deadline = time.monotonic() + timeout
+        events = []
+        matched = set()
+
+        while True:
+            for event in drain_performance_log(self.driver):
+                events.append(event)
+                method = event.get('method')
+                params = event.get('params', {})
+                if method == 'Network.responseReceived':
+                    if pattern.search(params.get('response', {}).get('url', '')):
+                        matched.add(params.get('requestId'))
+                elif method in ('Network.loadingFinished', 'Network.loadingFailed'):
+                    if params.get('requestId') in matched:
+                        self.misses[pattern.pattern] = 0
+                        return events
+
+            if time.monotonic() >= deadline:
+                if timeout:
+                    logger.debug(f"Resposta da API ({pattern.pattern}) não concluída em {timeout}s")
+                self.misses[pattern.pattern] = self.misses.get(pattern.pattern, 0) + 1
+                return events
+            time.sleep(0.05)
+
+    def find_json(self, events: List[Dict], pattern) -> Optional[Any]:
+        request_ids = []
+        for event in events:
+            if event.get('method') != 'Network.responseReceived':
+                continue
+
+            response = event.get('params', {}).get('response', {})
+            if 'json' not in response.get('mimeType', '') or not pattern.search(response.get('url', '')):
+                continue
+            request_ids.append(event['params']['requestId'])
+
+        # A resposta mais recente é a que preencheu a tabela
+        for request_id in reversed(request_ids):
+            try:
+                body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+                content = body.get('body', '')
+                if body.get('base64Encoded'):
+                    content = base64.b64decode(content).decode('utf-8')
+                return json.loads(content)
+            except Exception as e:
+                logger.debug(f"Resposta {request_id} indisponível: {e}")
+        return None
+
+    def capture_clients(self, events: List[Dict]) -> Optional[List[Client]]:
+        with metrics.timer('extraction', table='clientes', source='api'):
+            records = extract_records(self.find_json(events, self.clients_pattern))
+        if records is None:
+            return None
+        metrics.inc('rows_extracted_total', len(records), table='clientes', source='api')
+
+        extraction_date = datetime.now()
+        clients = [build_client(map_record(record, CLIENT_JSON_FIELDS), extraction_date) for record in records]
+        return [client for client in clients if client]
+
+    def capture_services(self, events: List[Dict], client_id: str) -> Optional[List[Service]]:
+        with metrics.timer('extraction', table='servicos', source='api'):
+            records = extract_records(self.find_json(events, self.services_pattern))
+        if records is None:
+            return None
+        metrics.inc('rows_extracted_total', len(records), table='servicos', source='api')
+
+        extraction_date = datetime.now()
+        services = [build_service(map_record(record, SERVICE_JSON_FIELDS), client_id, extraction_date)
+                    for record in records]
+        return [service for service in services if service]
\ No newline at end of file
@@ -3,22 +3,62 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException
 import logging
+import queue
+import threading
 import time
-from typing import List, Optional
-from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+from urllib.parse import urlparse
 
 from config.settings import web_config, crawler_config
+from crawlers.devtools import NetworkMonitor, apply_lean_options, drain_performance_log, enable_performance_log
+from crawlers.network_capture import ApiResponseCapture
+from crawlers.session_cache import get_session_cache, login_lock
+from crawlers.table_extractor import TableExtractor
 from models.data_models import Client, Service
+from utils.metrics import metrics
+from utils.rate_limiter import AdaptiveRateLimiter, rate_limiter as shared_rate_limiter
 
 logger = logging.getLogger(__name__)
 
+# Retorna o link de próxima página habilitado (ou null) da listagem
+NEXT_PAGE_SCRIPT = """
+const link = document.querySelector(arguments[0]);
+if (!link || link.classList.contains('disabled') || link.getAttribute('aria-disabled') === 'true') {
+    return null;
+}
+const parent = link.parentElement;
+if (parent && parent.classList.contains('disabled')) {
+    return null;
+}
+const href = link.getAttribute('href');
+return {href: href && !href.startsWith('#') && !href.startsWith('javascript') ? link.href : null};
+"""
+
+class ServiceFetchError(Exception):
+    # Falha ao carregar a página de serviços (navegador, sessão ou tempo esgotado).
+    # Diferente de uma lista vazia: o cliente não deve ser tratado como processado.
+    pass
+
 class SeleniumCrawler:
-    def __init__(self):
+    def __init__(self, rate_limiter: Optional[AdaptiveRateLimiter] = None):
+        self.rate_limiter = rate_limiter or shared_rate_limiter
         self.driver = None
         self.wait = None
+        self.extractor = None
+        self.network_monitor = None
+        self.api_capture = None
+        self.capture_network = crawler_config.LEAN_MODE or crawler_config.NETWORK_CAPTURE_MODE
+        self.last_network_events = []
+        self.session_cache = get_session_cache() if crawler_config.SESSION_CACHE_ENABLED else None
+        self.session_renewals = 0
+        self.pages_loaded = 0
         self.logged_in = False
+        # Resultado da última iter_clients: False se algum termo ficou pela metade
+        # (erro de paginação, limite de páginas) ou se a iteração foi interrompida
+        self.listing_complete = False
+        self._incomplete_terms: List[str] = []
         self.setup_driver()
     
     def setup_driver(self):
@@ -36,20 +76,180 @@ class SeleniumCrawler:
             chrome_options.add_experimental_option('excludeSwitches', ['enable-automation'])
             chrome_options.add_experimental_option('useAutomationExtension', False)
             
+            if crawler_config.LEAN_MODE:
+                apply_lean_options(chrome_options)
+            
+            if self.capture_network:
+                enable_performance_log(chrome_options)
+            
             self.driver = webdriver.Chrome(options=chrome_options)
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             
+            if crawler_config.LEAN_MODE:
+                self.network_monitor = NetworkMonitor(self.driver)
+                self.network_monitor.enable_blocking()
+            
+            if crawler_config.NETWORK_CAPTURE_MODE:
+                self.api_capture = ApiResponseCapture(self.driver)
+            
             self.wait = WebDriverWait(self.driver, web_config.TIMEOUT)
+            self.extractor = TableExtractor(self.driver)
             logger.info("Driver do Chrome configurado com sucesso")
             
         except Exception as e:
             logger.error(f"Erro ao configurar driver: {e}")
             raise
     
+    def restart(self) -> bool:
+        # Descarta o navegador atual (possivelmente travado) e recupera a sessão em um novo
+        try:
+            if self.driver:
+                self.driver.quit()
+        except Exception as e:
+            logger.warning(f"Erro ao fechar navegador para reinício: {e}")
+        
+        self.driver = None
+        self.logged_in = False
+        self.pages_loaded = 0
+        self.session_renewals += 1
+        self.setup_driver()
+        return self.ensure_session()
+    
+    def _navigate(self, url: str, ready_selectors: List[str], capture_pattern=None) -> Optional[str]:
+        # Aguarda a página ficar pronta em vez de dormir um tempo fixo e
+        # informa a latência ao limitador de taxa
+        self.rate_limiter.acquire()
+        if self.capture_network:
+            drain_performance_log(self.driver)
+        
+        started = time.monotonic()
+        try:
+            with metrics.timer('navigation', source='browser'):
+                self.driver.get(url)
+                if self.logged_in and self._on_login_page():
+                    self._renew_session()
+                    self.driver.get(url)
+            with metrics.timer('page_wait'):
+                ready = self._wait_for_any(ready_selectors)
+        except Exception:
+            self.rate_limiter.record(time.monotonic() - started, success=False)
+            raise
+        
+        self.rate_limiter.record(time.monotonic() - started)
+        self.pages_loaded += 1
+        metrics.inc('pages_total', source='browser', outcome='ready' if ready else 'empty')
+        if self.capture_network:
+            self._collect_network_events(capture_pattern)
+        if self.network_monitor:
+            self.network_monitor.record_page(url, self.last_network_events)
+        return ready
+    
+    def _collect_network_events(self, capture_pattern=None):
+        if self.api_capture and capture_pattern is not None:
+            self.last_network_events = self.api_capture.collect(capture_pattern)
+        else:
+            self.last_network_events = drain_performance_log(self.driver)
+    
+    def _wait_for_any(self, selectors: List[str]) -> Optional[str]:
+        # Retorna o seletor que apareceu; None quando a página terminou de
+        # carregar e nenhum apareceu dentro do período de tolerância
+        complete_since = None
+        
+        def condition(driver):
+            nonlocal complete_since
+            for selector in selectors:
+                if driver.find_elements(By.CSS_SELECTOR, selector):
+                    return selector
+            
+            if driver.execute_script("return document.readyState") != 'complete':
+                return False
+            
+            now = time.monotonic()
+            if complete_since is None:
+                complete_since = now
+            return 'empty' if now - complete_since >= crawler_config.READY_GRACE_SECONDS else False
+        
+        found = self.wait.until(condition)
+        return None if found == 'empty' else found
+    
+    def _on_login_page(self) -> bool:
+        return urlparse(self.driver.current_url).path.rstrip('/') == web_config.LOGIN_URL.rstrip('/')
+    
+    def _renew_session(self):
+        logger.warning("Sessão expirada durante a execução; autenticando novamente")
+        self.logged_in = False
+        self.session_renewals += 1
+        
+        # Outro navegador pode já ter renovado a sessão em cache
+        if not self.ensure_session():
+            raise RuntimeError("Não foi possível renovar a sessão expirada")
+    
+    def ensure_session(self) -> bool:
+        if not self.session_cache:
+            return self.login()
+        
+        with login_lock:
+            if self.restore_session():
+                return True
+            
+            if not self.login():
+                return False
+            
+            self.session_cache.save(self.driver.get_cookies())
+            logger.info("Sessão gravada no cache")
+            return True
+    
+    def restore_session(self) -> bool:
+        cookies = self.session_cache.load() if self.session_cache else None
+        if not cookies:
+            return False
+        
+        # Network.setCookies dispensa abrir uma página do domínio antes de criar os cookies
+        self.driver.execute_cdp_cmd('Network.setCookies', {'cookies': [
+            self._cdp_cookie(cookie) for cookie in cookies
+        ]})
+        
+        # Uma única requisição valida a sessão: se cair no login, ela expirou
+        self.driver.get(web_config.BASE_URL + crawler_config.SESSION_CHECK_URL)
+        if self._on_login_page():
+            logger.info("Sessão em cache recusada pelo servidor")
+            self.session_cache.clear()
+            return False
+        
+        self.logged_in = True
+        logger.info("Sessão restaurada do cache")
+        return True
+    
+    @staticmethod
+    def _cdp_cookie(cookie: dict) -> dict:
+        cdp_cookie = {
+            'name': cookie['name'],
+            'value': cookie['value'],
+            'path': cookie.get('path', '/'),
+            'secure': cookie.get('secure', False),
+            'httpOnly': cookie.get('httpOnly', False)
+        }
+        if cookie.get('domain'):
+            cdp_cookie['domain'] = cookie['domain']
+        else:
+            cdp_cookie['url'] = web_config.BASE_URL
+        if cookie.get('expiry'):
+            cdp_cookie['expires'] = cookie['expiry']
+        if cookie.get('sameSite'):
+            cdp_cookie['sameSite'] = cookie['sameSite']
+        return cdp_cookie
+    
     def login(self) -> bool:
+        with metrics.timer('login'):
+            logged_in = self._login()
+        if not logged_in:
+            metrics.inc('login_errors_total')
+        return logged_in
+    
+    def _login(self) -> bool:
         try:
             logger.info(f"Realizando login em {web_config.BASE_URL}")
-            self.driver.get(web_config.BASE_URL + web_config.LOGIN_URL)
+            self._navigate(web_config.BASE_URL + web_config.LOGIN_URL, [web_config.SELECTORS['username_field']])
             
             # Aguardar e preencher campos de login
             username_field = self.wait.until(
@@ -66,7 +266,12 @@ class SeleniumCrawler:
             login_button = self.driver.find_element(By.CSS_SELECTOR, web_config.SELECTORS['login_button'])
             login_button.click()
             
-            time.sleep(3)
+            try:
+                self.wait.until(
+                    lambda driver: "dashboard" in driver.current_url or "home" in driver.current_url
+                )
+            except TimeoutException:
+                pass
             
             if "dashboard" in self.driver.current_url or "home" in self.driver.current_url:
                 self.logged_in = True
@@ -84,129 +289,220 @@ class SeleniumCrawler:
             return False
     
     def search_clients(self, search_term: str = "") -> List[Client]:
-        clients = []
-        
+        clients = list(self.iter_clients([search_term], prefetch=False))
+        logger.info(f"Encontrados {len(clients)} clientes")
+        return clients
+    
+    def iter_clients(self, search_terms: Optional[Iterable[str]] = None, prefetch: bool = True) -> Iterator[Client]:
+        # Percorre a listagem página a página entregando os clientes assim que são lidos.
+        # Com prefetch o navegador já carrega a próxima página enquanto o chamador
+        # processa a atual, então o chamador não deve usar este crawler durante a iteração.
+        self.listing_complete = False
         if not self.logged_in:
             logger.error("Não está logado no sistema")
-            return clients
+            return
+        
+        self._incomplete_terms = []
+        terms = list(search_terms) if search_terms is not None else [""]
+        pages = self._client_pages(terms or [""])
+        if prefetch:
+            pages = self._prefetch(pages)
         
+        seen = set()
+        for page_clients in pages:
+            for client in page_clients:
+                if client.client_id in seen:
+                    continue
+                seen.add(client.client_id)
+                yield client
+        
+        self.listing_complete = not self._incomplete_terms
+        if self._incomplete_terms:
+            logger.warning(f"Listagem de clientes incompleta ({len(seen)} lidos); termos afetados: "
+                           f"{', '.join(repr(term) for term in self._incomplete_terms)}")
+    
+    def _prefetch(self, pages: Iterator[List[Client]]) -> Iterator[List[Client]]:
+        # Uma página de folga: o produtor fica no máximo uma página à frente
+        buffer = queue.Queue(maxsize=1)
+        stop = threading.Event()
+        
+        def producer():
+            try:
+                for page_clients in pages:
+                    while not stop.is_set():
+                        try:
+                            buffer.put(page_clients, timeout=0.5)
+                            break
+                        except queue.Full:
+                            continue
+                    if stop.is_set():
+                        return
+            finally:
+                while True:
+                    try:
+                        buffer.put(None, timeout=0.5)
+                        break
+                    except queue.Full:
+                        if stop.is_set():
+                            break
+        
+        thread = threading.Thread(target=producer, name="client-prefetch", daemon=True)
+        thread.start()
         try:
-            clients_url = f"{web_config.BASE_URL}/clientes"
-            self.driver.get(clients_url)
-            
-            if search_term:
-                search_field = self.wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='search']"))
-                )
-                search_field.clear()
-                search_field.send_keys(search_term)
-                time.sleep(1)
-            
-            self.wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, web_config.SELECTORS['client_table']))
-            )
-            
-            client_rows = self.driver.find_elements(By.CSS_SELECTOR, web_config.SELECTORS['client_rows'])
+            while True:
+                page_clients = buffer.get()
+                if page_clients is None:
+                    break
+                yield page_clients
+        finally:
+            stop.set()
+            thread.join()
+    
+    def _client_pages(self, search_terms: List[str]) -> Iterator[List[Client]]:
+        for search_term in search_terms:
+            try:
+                yield from self._client_pages_for_term(search_term)
+            except Exception as e:
+                # Os clientes já lidos continuam valendo, mas a listagem fica marcada como parcial
+                logger.error(f"Erro ao buscar clientes (termo '{search_term}'): {e}")
+                self._incomplete_terms.append(search_term)
+    
+    def _client_pages_for_term(self, search_term: str) -> Iterator[List[Client]]:
+        clients_url = f"{web_config.BASE_URL}/clientes"
+        self._navigate(clients_url, [web_config.SELECTORS['client_table']], self._clients_pattern())
+        
+        if search_term:
+            self._apply_search(search_term)
+        
+        visited = set()
+        for page in range(1, crawler_config.CLIENT_MAX_PAGES + 1):
+            page_clients = self._extract_client_page(use_capture=not search_term)
             
-            for row in client_rows:
-                client = self._parse_client_row(row)
-                if client:
-                    clients.append(client)
+            # Proteção contra paginação que volta para uma página já lida
+            signature = tuple(client.client_id for client in page_clients[:5])
+            if signature in visited:
+                break
+            visited.add(signature)
             
-            logger.info(f"Encontrados {len(clients)} clientes")
-            return clients
+            logger.info(f"Página {page} da listagem: {len(page_clients)} clientes")
+            yield page_clients
             
-        except Exception as e:
-            logger.error(f"Erro ao buscar clientes: {e}")
-            return clients
+            if not page_clients or not self._go_to_next_page():
+                break
+        else:
+            logger.warning(f"Limite de {crawler_config.CLIENT_MAX_PAGES} páginas atingido na listagem "
+                           f"(termo '{search_term}'); clientes das páginas seguintes não foram lidos")
+            self._incomplete_terms.append(search_term)
+    
+    def _apply_search(self, search_term: str):
+        search_field = self.wait.until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='search']"))
+        )
+        previous_rows = self.driver.find_elements(By.CSS_SELECTOR, web_config.SELECTORS['client_rows'])
+        search_field.clear()
+        search_field.send_keys(search_term)
+        
+        # A tabela é refeita pelo filtro; espera a primeira linha antiga sair do DOM
+        self._wait_stale(previous_rows)
     
-    def _parse_client_row(self, row) -> Optional[Client]:
+    def _wait_stale(self, previous_rows):
+        if not previous_rows:
+            return
         try:
-            client_id = row.find_element(By.CSS_SELECTOR, web_config.SELECTORS['client_id']).text.strip()
-            name = row.find_element(By.CSS_SELECTOR, web_config.SELECTORS['client_name']).text.strip()
-            
-            try:
-                email = row.find_element(By.CSS_SELECTOR, web_config.SELECTORS['client_email']).text.strip()
-            except NoSuchElementException:
-                email = None
-            
-            try:
-                phone = row.find_element(By.CSS_SELECTOR, web_config.SELECTORS['client_phone']).text.strip()
-            except NoSuchElementException:
-                phone = None
-            
-            return Client(
-                client_id=client_id,
-                name=name,
-                email=email,
-                phone=phone,
-                extraction_date=datetime.now()
+            WebDriverWait(self.driver, crawler_config.READY_GRACE_SECONDS).until(
+                EC.staleness_of(previous_rows[0])
             )
-            
-        except Exception as e:
-            logger.warning(f"Erro ao parsear linha do cliente: {e}")
-            return None
+        except TimeoutException:
+            pass
     
-    def get_client_services(self, client_id: str) -> List[Service]:
-        services = []
+    def _extract_client_page(self, use_capture: bool) -> List[Client]:
+        if self.api_capture and use_capture:
+            captured = self.api_capture.capture_clients(self.last_network_events)
+            if captured is not None:
+                return captured
+        
+        self.wait.until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, web_config.SELECTORS['client_table']))
+        )
+        return self.extractor.extract_clients()
+    
+    def _go_to_next_page(self) -> bool:
+        next_link = self.driver.execute_script(NEXT_PAGE_SCRIPT, web_config.SELECTORS['client_next_page'])
+        if not next_link:
+            return False
+        
+        href = next_link.get('href') or ''
+        if href.startswith('http'):
+            self._navigate(href, [web_config.SELECTORS['client_table']], self._clients_pattern())
+            return True
         
+        # Paginação feita por JavaScript: clica e espera a tabela ser refeita
+        previous_rows = self.driver.find_elements(By.CSS_SELECTOR, web_config.SELECTORS['client_rows'])
+        if self.capture_network:
+            drain_performance_log(self.driver)
+        self.driver.find_element(By.CSS_SELECTOR, web_config.SELECTORS['client_next_page']).click()
+        self._wait_stale(previous_rows)
+        if self.capture_network:
+            self._collect_network_events(self._clients_pattern())
+        return True
+    
+    def _clients_pattern(self):
+        return self.api_capture.clients_pattern if self.api_capture else None
+    
+    def get_client_services(self, client_id: str) -> List[Service]:
+        # Lista vazia só quando a página confirmou que não há serviços;
+        # qualquer falha ao carregá-la levanta ServiceFetchError
         if not self.logged_in:
-            logger.error("Não está logado no sistema")
-            return services
+            raise ServiceFetchError("Não está logado no sistema")
         
         try:
             services_url = f"{web_config.BASE_URL}/clientes/{client_id}/servicos"
-            self.driver.get(services_url)
+            # A tabela vazia não conta como pronta: as linhas podem ser preenchidas
+            # por JavaScript depois. Espera as linhas ou o marcador de lista vazia.
+            rows_selector = web_config.SELECTORS['service_rows']
+            found = self._navigate(services_url, [rows_selector, web_config.SELECTORS['services_empty']],
+                                   self.api_capture.services_pattern if self.api_capture else None)
             
-            time.sleep(2)
+            captured = None
+            if self.api_capture:
+                captured = self.api_capture.capture_services(self.last_network_events, client_id)
             
-            try:
-                service_rows = self.driver.find_elements(By.CSS_SELECTOR, web_config.SELECTORS['service_rows'])
-            except NoSuchElementException:
+            if captured is not None:
+                services = captured
+            elif found == rows_selector:
+                services = self.extractor.extract_services(client_id)
+            elif found:
+                services = []
+            else:
+                # Nem linhas nem marcador de vazio: não dá para afirmar que o cliente não tem serviços
+                raise ServiceFetchError(f"Página de serviços do cliente {client_id} não ficou pronta")
+            if not services:
                 logger.info(f"Nenhum serviço encontrado para o cliente {client_id}")
                 return services
             
-            for row in service_rows:
-                service = self._parse_service_row(row, client_id)
-                if service:
-                    services.append(service)
-            
             logger.info(f"Encontrados {len(services)} serviços para cliente {client_id}")
             return services
             
+        except ServiceFetchError:
+            raise
         except Exception as e:
             logger.error(f"Erro ao buscar serviços do cliente {client_id}: {e}")
-            return services
+            raise ServiceFetchError(f"Erro ao buscar serviços do cliente {client_id}: {e}") from e
     
-    def _parse_service_row(self, row, client_id: str) -> Optional[Service]:
+    def measure_lean_baseline(self):
+        if not self.network_monitor or not crawler_config.LEAN_MEASURE_BASELINE:
+            return
+        if self.network_monitor.bytes_per_blocked is not None:
+            return
+        
         try:
-            service_date = row.find_element(By.CSS_SELECTOR, web_config.SELECTORS['service_date']).text.strip()
-            service_type = row.find_element(By.CSS_SELECTOR, web_config.SELECTORS['service_type']).text.strip()
-            
-            try:
-                description = row.find_element(By.CSS_SELECTOR, web_config.SELECTORS['service_description']).text.strip()
-            except NoSuchElementException:
-                description = ""
-            
-            try:
-                status = row.find_element(By.CSS_SELECTOR, web_config.SELECTORS['service_status']).text.strip()
-            except NoSuchElementException:
-                status = "Desconhecido"
-            
-            return Service(
-                client_id=client_id,
-                service_date=service_date,
-                service_type=service_type,
-                description=description,
-                status=status,
-                extraction_date=datetime.now()
-            )
-            
+            self.network_monitor.measure_baseline(f"{web_config.BASE_URL}/clientes")
         except Exception as e:
-            logger.warning(f"Erro ao parsear linha do serviço: {e}")
-            return None
+            logger.warning(f"Não foi possível medir a economia do modo enxuto: {e}")
     
     def close(self):
+        if self.network_monitor:
+            self.network_monitor.log_summary()
         if self.driver:
             self.driver.quit()
             logger.info("Driver fechado")
\ No newline at end of file
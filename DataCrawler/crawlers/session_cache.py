@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from config.settings import crawler_config
+
+logger = logging.getLogger(__name__)
+
+class SessionCache:
+    # Cookies da sessão autenticada gravados criptografados em disco, para que
+    # execuções e navegadores diferentes reaproveitem o mesmo login
+    def __init__(self, path: Optional[str] = None, key: Optional[str] = None,
+                 ttl_minutes: Optional[int] = None):
+        self.path = path or crawler_config.SESSION_CACHE_PATH
+        self.ttl_seconds = 60 * (ttl_minutes or crawler_config.SESSION_CACHE_TTL_MINUTES)
+        self._fernet = Fernet(key or crawler_config.SESSION_CACHE_KEY or self._load_or_create_key())
+        self._lock = threading.Lock()
+
+    def _load_or_create_key(self) -> bytes:
+        key_path = f"{self.path}.key"
+        if os.path.exists(key_path):
+            return self._read_key(key_path)
+
+        key = Fernet.generate_key()
+        try:
+            fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            # Outro processo criou a chave ao mesmo tempo; usa a dele
+            return self._read_key(key_path)
+        with os.fdopen(fd, 'wb') as key_file:
+            key_file.write(key)
+        logger.info(f"Chave do cache de sessão criada em {key_path}")
+        return key
+
+    def _read_key(self, key_path: str) -> bytes:
+        # O arquivo existe assim que o outro processo o cria, mas a chave pode ainda não
+        # ter sido escrita: espera um pouco antes de desistir
+        for _ in range(50):
+            with open(key_path, 'rb') as key_file:
+                key = key_file.read().strip()
+            if key:
+                return key
+            time.sleep(0.1)
+        raise ValueError(f"Chave do cache de sessão vazia em {key_path}")
+
+    def load(self) -> Optional[List[Dict]]:
+        with self._lock:
+            try:
+                with open(self.path, 'rb') as cache_file:
+                    data = json.loads(self._fernet.decrypt(cache_file.read()))
+            except FileNotFoundError:
+                return None
+            except (InvalidToken, ValueError) as e:
+                logger.warning(f"Cache de sessão ilegível, ignorando: {e}")
+                return None
+
+        if data.get('expires_at', 0) <= time.time():
+            logger.info("Sessão em cache expirada")
+            return None
+        return data.get('cookies')
+
+    def save(self, cookies: List[Dict]):
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        for cookie in cookies:
+            if cookie.get('expiry'):
+                expires_at = min(expires_at, cookie['expiry'])
+
+        token = self._fernet.encrypt(json.dumps({
+            'saved_at': now,
+            'expires_at': expires_at,
+            'cookies': cookies
+        }).encode('utf-8'))
+
+        # Grava em arquivo temporário e substitui para nunca deixar um cache parcial
+        with self._lock:
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as cache_file:
+                cache_file.write(token)
+            os.replace(temp_path, self.path)
+
+    def clear(self):
+        with self._lock:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+_shared_cache: Optional[SessionCache] = None
+_shared_lock = threading.Lock()
+
+# Serializa logins entre navegadores do mesmo processo: o primeiro autentica e
+# os demais reaproveitam a sessão que ele gravou
+login_lock = threading.Lock()
+
+def get_session_cache() -> SessionCache:
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = SessionCache()
+        return _shared_cache
\ No newline at end of file
@@ -0,0 +1,124 @@
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config.settings import web_config
+from models.data_models import Client, Service
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Campo do modelo -> chave em WebConfig.SELECTORS
+CLIENT_FIELD_SELECTORS = {
+    'client_id': 'client_id',
+    'name': 'client_name',
+    'email': 'client_email',
+    'phone': 'client_phone',
+    'service_count': 'client_service_count'
+}
+
+SERVICE_FIELD_SELECTORS = {
+    'service_date': 'service_date',
+    'service_type': 'service_type',
+    'description': 'service_description',
+    'status': 'service_status'
+}
+
+# Lê todas as linhas e células da tabela em uma única chamada ao navegador.
+# Células ausentes retornam null.
+EXTRACT_TABLE_SCRIPT = """
+const rows = document.querySelectorAll(arguments[0]);
+const fields = arguments[1];
+const result = [];
+for (const row of rows) {
+    const item = {};
+    for (const [name, selector] of Object.entries(fields)) {
+        const cell = row.querySelector(selector);
+        if (cell === null) {
+            item[name] = null;
+        } else {
+            const text = cell.innerText !== undefined ? cell.innerText : cell.textContent;
+            item[name] = (text || '').trim();
+        }
+    }
+    result.push(item);
+}
+return result;
+"""
+
+def resolve_selectors(field_selectors: Dict[str, str]) -> Dict[str, str]:
+    return {field: web_config.SELECTORS[key] for field, key in field_selectors.items()}
+
+def _parse_count(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    digits = ''.join(char for char in value if char.isdigit())
+    return int(digits) if digits else None
+
+def build_client(row: Dict[str, Optional[str]], extraction_date: Optional[datetime] = None) -> Optional[Client]:
+    if row.get('client_id') is None or row.get('name') is None:
+        logger.warning(f"Linha de cliente sem campos obrigatórios: {row}")
+        return None
+
+    return Client(
+        client_id=row['client_id'],
+        name=row['name'],
+        email=row.get('email'),
+        phone=row.get('phone'),
+        extraction_date=extraction_date or datetime.now(),
+        service_count=_parse_count(row.get('service_count'))
+    )
+
+def build_service(row: Dict[str, Optional[str]], client_id: str,
+                  extraction_date: Optional[datetime] = None) -> Optional[Service]:
+    if row.get('service_date') is None or row.get('service_type') is None:
+        logger.warning(f"Linha de serviço sem campos obrigatórios: {row}")
+        return None
+
+    description = row.get('description')
+    status = row.get('status')
+
+    return Service(
+        client_id=client_id,
+        service_date=row['service_date'],
+        service_type=row['service_type'],
+        description=description if description is not None else "",
+        status=status if status is not None else "Desconhecido",
+        extraction_date=extraction_date or datetime.now()
+    )
+
+class TableExtractor:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def extract_rows(self, rows_selector: str, fields: Dict[str, str]) -> List[Dict[str, Optional[str]]]:
+        rows = self.driver.execute_script(EXTRACT_TABLE_SCRIPT, rows_selector, fields)
+        return rows or []
+
+    def extract_clients(self) -> List[Client]:
+        with metrics.timer('extraction', table='clientes', source='dom'):
+            rows = self.extract_rows(web_config.SELECTORS['client_rows'],
+                                     resolve_selectors(CLIENT_FIELD_SELECTORS))
+        metrics.inc('rows_extracted_total', len(rows), table='clientes', source='dom')
+        extraction_date = datetime.now()
+
+        clients = []
+        for row in rows:
+            client = build_client(row, extraction_date)
+            if client:
+                clients.append(client)
+        return clients
+
+    def extract_services(self, client_id: str) -> List[Service]:
+        with metrics.timer('extraction', table='servicos', source='dom'):
+            rows = self.extract_rows(web_config.SELECTORS['service_rows'],
+                                     resolve_selectors(SERVICE_FIELD_SELECTORS))
+        metrics.inc('rows_extracted_total', len(rows), table='servicos', source='dom')
+        extraction_date = datetime.now()
+
+        services = []
+        for row in rows:
+            service = build_service(row, client_id, extraction_date)
+            if service:
+                services.append(service)
+        return services
\ No newline at end of file
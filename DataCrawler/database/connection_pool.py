@@ -0,0 +1,125 @@
+import pyodbc
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from config.settings import db_config
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATEs do ODBC que indicam conexão perdida ou inválida
+DISCONNECT_SQLSTATES = {'08S01', '08001', '08003', '08004', '08007', 'HYT00', 'HYT01'}
+
+class ConnectionPool:
+    def __init__(self, connection_string: str, max_size: Optional[int] = None,
+                 health_check_seconds: Optional[float] = None, connect_retries: Optional[int] = None):
+        self.connection_string = connection_string
+        self.max_size = max(1, max_size or db_config.POOL_SIZE)
+        self.health_check_seconds = (health_check_seconds if health_check_seconds is not None
+                                     else db_config.POOL_HEALTH_CHECK_SECONDS)
+        self.connect_retries = max(1, connect_retries or db_config.POOL_CONNECT_RETRIES)
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._closed = False
+
+    @contextmanager
+    def acquire(self):
+        if self._closed:
+            raise pyodbc.InterfaceError('08003', 'Pool de conexões fechado')
+
+        self._slots.acquire()
+        connection = None
+        broken = False
+        try:
+            connection = self._checkout()
+            yield connection
+        except pyodbc.Error as e:
+            broken = self.is_disconnect(e)
+            raise
+        finally:
+            if connection is not None:
+                self._checkin(connection, broken)
+            self._slots.release()
+
+    def close(self):
+        self._closed = True
+        closed = 0
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close_connection(connection)
+            closed += 1
+
+        if closed:
+            logger.info(f"Pool de conexões fechado ({closed} conexões)")
+
+    @staticmethod
+    def is_disconnect(error: pyodbc.Error) -> bool:
+        if isinstance(error, (pyodbc.OperationalError, pyodbc.InterfaceError)):
+            return True
+        return bool(error.args) and error.args[0] in DISCONNECT_SQLSTATES
+
+    def _checkout(self):
+        while True:
+            try:
+                connection, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open()
+
+            if time.monotonic() - last_used < self.health_check_seconds or self._is_healthy(connection):
+                return connection
+
+            logger.warning("Conexão ociosa inválida descartada do pool")
+            self._close_connection(connection)
+
+    def _checkin(self, connection, broken: bool):
+        if not broken and not self._closed:
+            try:
+                # Descarta qualquer transação deixada aberta pelo chamador
+                connection.rollback()
+                self._idle.put((connection, time.monotonic()))
+                return
+            except pyodbc.Error:
+                pass
+
+        self._close_connection(connection)
+
+    def _open(self):
+        last_error = None
+        for attempt in range(1, self.connect_retries + 1):
+            try:
+                with metrics.timer('db_connect'):
+                    connection = pyodbc.connect(self.connection_string)
+                logger.info("Conexão com SQL Server estabelecida com sucesso")
+                return connection
+            except pyodbc.Error as e:
+                last_error = e
+                logger.warning(f"Tentativa {attempt} de conexão com SQL Server falhou: {e}")
+                if attempt < self.connect_retries:
+                    time.sleep(min(2 ** (attempt - 1), 10))
+
+        logger.error(f"Erro ao conectar com SQL Server: {last_error}")
+        raise last_error
+
+    def _is_healthy(self, connection) -> bool:
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except pyodbc.Error:
+            return False
+
+    def _close_connection(self, connection):
+        try:
+            connection.close()
+        except pyodbc.Error:
+            pass
\ No newline at end of file
@@ -1,191 +1,1031 @@
+import json
 import pyodbc
 import logging
-from typing import List, Optional
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 from datetime import datetime, timedelta
 
 from config.settings import db_config, crawler_config
-from models.data_models import Client, Service
+from database.connection_pool import ConnectionPool
+from models.data_models import ChangeLogEntry, Client, ClientFingerprint, Service, ServiceBatch
+from utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# Carga em massa: staging temporária + MERGE na tabela final.
+# O MERGE casa linhas pela chave natural no mesmo dia de extração, então
+# reexecutar o crawler no mesmo dia atualiza em vez de duplicar.
+CLIENT_BULK_SPEC = {
+    'table': 'clientes',
+    'staging': '#clientes_staging',
+    'columns': [
+        ('client_id', 'NVARCHAR(100) NOT NULL'),
+        ('name', 'NVARCHAR(255) NOT NULL'),
+        ('email', 'NVARCHAR(255)'),
+        ('phone', 'NVARCHAR(50)'),
+        ('extraction_date', 'DATETIME2 NOT NULL')
+    ],
+    'key': ['client_id'],
+    'compare': ['name', 'email', 'phone'],
+    'versions': 'clientes_versoes',
+    # Estado corrente usado pelo log de alterações (DB_CHANGE_LOG)
+    'state': 'log_estado_clientes'
+}
+
+SERVICE_BULK_SPEC = {
+    'table': 'servicos',
+    'staging': '#servicos_staging',
+    'columns': [
+        ('client_id', 'NVARCHAR(100) NOT NULL'),
+        ('service_date', 'NVARCHAR(50) NOT NULL'),
+        ('service_date_value', 'DATE'),
+        ('service_type', 'NVARCHAR(255) NOT NULL'),
+        ('description', 'NVARCHAR(MAX)'),
+        ('status', 'NVARCHAR(100)'),
+        ('extraction_date', 'DATETIME2 NOT NULL')
+    ],
+    'key': ['client_id', 'service_date', 'service_type'],
+    'compare': ['description', 'status'],
+    # Derivada de service_date: atualizada junto, mas não gera nova versão
+    'derived': ['service_date_value'],
+    'versions': 'servicos_versoes',
+    'state': 'log_estado_servicos',
+    # Serviços ausentes de um cliente recrawleado têm a versão corrente encerrada
+    'scope': 'client_id'
+}
+
+@dataclass
+class BulkWriteResult:
+    staged: int = 0
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    closed: int = 0
+    logged: int = 0
+
+@dataclass
+class RetentionResult:
+    cutoff_date: datetime
+    clients_deleted: int = 0
+    services_deleted: int = 0
+    changes_deleted: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    completed: bool = True
+
 class SQLServerHandler:
-    def __init__(self):
+    def __init__(self, pool: Optional[ConnectionPool] = None):
         self.connection_string = db_config.connection_string
-        self.connection = None
+        self.pool = pool or ConnectionPool(self.connection_string)
+        self._local = threading.local()
+        self._cleanup_thread: Optional[threading.Thread] = None
+        self._cleanup_stop = threading.Event()
         self._create_tables()
     
-    def connect(self) -> bool:
-        try:
-            self.connection = pyodbc.connect(self.connection_string)
-            logger.info("Conexão com SQL Server estabelecida com sucesso")
-            return True
-        except pyodbc.Error as e:
-            logger.error(f"Erro ao conectar com SQL Server: {e}")
-            return False
+    def __enter__(self):
+        return self
     
-    def disconnect(self):
-        if self.connection:
-            self.connection.close()
-            logger.info("Conexão com SQL Server fechada")
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
-    def _create_tables(self):
-        if not self.connect():
+    def close(self):
+        if self._cleanup_thread and self._cleanup_thread.is_alive():
+            # Interrompe na fronteira do lote atual; a próxima limpeza continua de onde parou
+            logger.info("Aguardando limpeza em segundo plano encerrar o lote atual...")
+            self._cleanup_stop.set()
+            self._cleanup_thread.join()
+        self.pool.close()
+        logger.info("Conexões com SQL Server fechadas")
+    
+    @contextmanager
+    def transaction(self):
+        # Operações chamadas dentro do bloco compartilham a mesma conexão e
+        # são confirmadas juntas ao final (ou revertidas se alguma falhar)
+        if getattr(self._local, 'connection', None) is not None:
+            yield self
+            return
+        
+        with self.pool.acquire() as connection:
+            self._local.connection = connection
+            self._local.rollback_only = False
+            try:
+                yield self
+                if self._local.rollback_only:
+                    connection.rollback()
+                    logger.warning("Transação revertida devido a erro em uma das operações")
+                else:
+                    with metrics.timer('db_commit'):
+                        connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                self._local.connection = None
+    
+    @contextmanager
+    def _session(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            try:
+                yield connection
+            except Exception:
+                self._local.rollback_only = True
+                raise
             return
         
+        with self.pool.acquire() as connection:
+            try:
+                yield connection
+                with metrics.timer('db_commit'):
+                    connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+    
+    def _create_tables(self):
         try:
-            cursor = self.connection.cursor()
+            with self._session() as connection:
+                cursor = connection.cursor()
+                
+                if db_config.STORAGE_MODEL == 'scd2':
+                    self._create_version_tables(cursor)
+                else:
+                    self._create_snapshot_tables(cursor)
+                
+                # Impressões digitais por cliente para o modo incremental
+                cursor.execute("""
+                    IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='fingerprints_clientes' AND xtype='U')
+                    CREATE TABLE fingerprints_clientes (
+                        client_id NVARCHAR(100) NOT NULL PRIMARY KEY,
+                        client_hash CHAR(64) NOT NULL,
+                        services_hash CHAR(64),
+                        checked_at DATETIME2 NOT NULL
+                    )
+                """)
+                
+                # Último serviço e retorno esperado por cliente, recalculados a cada execução
+                cursor.execute("""
+                    IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='retornos_clientes' AND xtype='U')
+                    CREATE TABLE retornos_clientes (
+                        client_id NVARCHAR(100) NOT NULL PRIMARY KEY,
+                        name NVARCHAR(255) NULL,
+                        email NVARCHAR(255) NULL,
+                        phone NVARCHAR(50) NULL,
+                        last_service_date DATE NOT NULL,
+                        expected_return_date DATE NOT NULL,
+                        updated_at DATETIME2 NOT NULL
+                    )
+                """)
+                
+                # Nome e contato copiados do cliente (tabelas criadas antes ganham as colunas)
+                cursor.execute("""
+                    IF COL_LENGTH('retornos_clientes', 'name') IS NULL
+                    BEGIN
+                        ALTER TABLE retornos_clientes ADD name NVARCHAR(255) NULL,
+                                                          email NVARCHAR(255) NULL,
+                                                          phone NVARCHAR(50) NULL;
+                        EXEC('UPDATE target
+                              SET name = client.name, email = client.email, phone = client.phone
+                              FROM retornos_clientes AS target
+                              CROSS APPLY (SELECT TOP 1 name, email, phone FROM clientes
+                                           WHERE clientes.client_id = target.client_id
+                                           ORDER BY extraction_date DESC) AS client');
+                    END
+                """)
+                
+                cursor.execute("""
+                    IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='idx_retornos_expected_return')
+                    CREATE INDEX idx_retornos_expected_return ON retornos_clientes(expected_return_date)
+                """)
+                
+                self._create_change_log_tables(cursor)
+                
+            logger.info("Tabelas verificadas/criadas com sucesso")
             
-            # Tabela de clientes
-            cursor.execute("""
-                IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='clientes' AND xtype='U')
-                CREATE TABLE clientes (
-                    id INT IDENTITY(1,1) PRIMARY KEY,
-                    client_id NVARCHAR(100) NOT NULL,
-                    name NVARCHAR(255) NOT NULL,
-                    email NVARCHAR(255),
-                    phone NVARCHAR(50),
-                    extraction_date DATETIME2 NOT NULL,
-                    created_at DATETIME2 DEFAULT GETDATE(),
-                    UNIQUE(client_id, extraction_date)
-                )
+        except pyodbc.Error as e:
+            logger.error(f"Erro ao criar tabelas: {e}")
+    
+    def _create_change_log_tables(self, cursor):
+        # Feed de alterações para a sincronização. Com vários nós gravando, seq (IDENTITY)
+        # não segue a ordem de commit; os leitores avançam por row_version e só até
+        # MIN_ACTIVE_ROWVERSION(), abaixo do qual nenhuma transação aberta ainda pode gravar
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='log_alteracoes' AND xtype='U')
+            CREATE TABLE log_alteracoes (
+                seq BIGINT IDENTITY(1,1) PRIMARY KEY,
+                entity NVARCHAR(50) NOT NULL,
+                operation CHAR(1) NOT NULL,
+                client_id NVARCHAR(100) NOT NULL,
+                payload NVARCHAR(MAX) NOT NULL,
+                changed_at DATETIME2 NOT NULL DEFAULT SYSDATETIME()
+            )
+        """)
+        
+        cursor.execute("""
+            IF COL_LENGTH('log_alteracoes', 'row_version') IS NULL
+            ALTER TABLE log_alteracoes ADD row_version ROWVERSION
+        """)
+        
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='idx_log_alteracoes_row_version')
+            CREATE UNIQUE INDEX idx_log_alteracoes_row_version ON log_alteracoes(row_version)
+        """)
+        
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='idx_log_alteracoes_changed_at')
+            CREATE INDEX idx_log_alteracoes_changed_at ON log_alteracoes(changed_at)
+        """)
+        
+        if not db_config.CHANGE_LOG:
+            return
+        
+        # Estado corrente de cada chave, atualizado na mesma transação que grava o log.
+        # A última extração de cada cliente não serve de base: no modo incremental os
+        # serviços sem alteração não são regravados e a comparação geraria D/I falsos.
+        for spec in (CLIENT_BULK_SPEC, SERVICE_BULK_SPEC):
+            state = spec['state']
+            names = [name for name, _ in spec['columns']]
+            if db_config.STORAGE_MODEL == 'scd2':
+                seed = f"""
+                    SELECT {', '.join(name for name in names if name != 'extraction_date')}, valid_from
+                    FROM {spec['versions']} WHERE valid_to IS NULL
+                """
+            else:
+                seed = f"""
+                    SELECT {', '.join(names)} FROM (
+                        SELECT *, ROW_NUMBER() OVER (
+                            PARTITION BY {', '.join(spec['key'])} ORDER BY extraction_date DESC
+                        ) AS version_rank
+                        FROM {spec['table']}
+                    ) AS latest
+                    WHERE version_rank = 1
+                """
+            
+            # Criada já preenchida com o que está gravado, para o primeiro lote não ser todo 'I'
+            cursor.execute(f"""
+                IF OBJECT_ID('{state}', 'U') IS NULL
+                BEGIN
+                    CREATE TABLE {state} (
+                        {', '.join(f'{name} {sql_type}' for name, sql_type in spec['columns'])},
+                        PRIMARY KEY ({', '.join(spec['key'])})
+                    );
+                    INSERT INTO {state} ({', '.join(names)}) {seed};
+                END
             """)
+    
+    def _create_snapshot_tables(self, cursor):
+        # Tabela de clientes
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='clientes' AND xtype='U')
+            CREATE TABLE clientes (
+                id INT IDENTITY(1,1) PRIMARY KEY,
+                client_id NVARCHAR(100) NOT NULL,
+                name NVARCHAR(255) NOT NULL,
+                email NVARCHAR(255),
+                phone NVARCHAR(50),
+                extraction_date DATETIME2 NOT NULL,
+                created_at DATETIME2 DEFAULT GETDATE(),
+                UNIQUE(client_id, extraction_date)
+            )
+        """)
+        
+        # Tabela de serviços
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='servicos' AND xtype='U')
+            CREATE TABLE servicos (
+                id INT IDENTITY(1,1) PRIMARY KEY,
+                client_id NVARCHAR(100) NOT NULL,
+                service_date NVARCHAR(50) NOT NULL,
+                service_date_value DATE,
+                service_type NVARCHAR(255) NOT NULL,
+                description NVARCHAR(MAX),
+                status NVARCHAR(100),
+                extraction_date DATETIME2 NOT NULL,
+                created_at DATETIME2 DEFAULT GETDATE(),
+                UNIQUE(client_id, service_date, service_type, extraction_date)
+            )
+        """)
+        self._add_service_date_column(cursor, 'servicos')
+        
+        # Índices para melhor performance
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='idx_clientes_client_id')
+            CREATE INDEX idx_clientes_client_id ON clientes(client_id)
+        """)
+        
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='idx_servicos_client_id')
+            CREATE INDEX idx_servicos_client_id ON servicos(client_id)
+        """)
+        
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='idx_servicos_service_date')
+            CREATE INDEX idx_servicos_service_date ON servicos(service_date)
+        """)
+        
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='idx_servicos_client_service_date_value')
+            CREATE INDEX idx_servicos_client_service_date_value ON servicos(client_id, service_date_value)
+        """)
+        
+        # Usados pela limpeza por lotes e pelo filtro de sincronização
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='idx_clientes_extraction_date')
+            CREATE INDEX idx_clientes_extraction_date ON clientes(extraction_date)
+        """)
+        
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='idx_servicos_extraction_date')
+            CREATE INDEX idx_servicos_extraction_date ON servicos(extraction_date)
+        """)
+    
+    def _create_version_tables(self, cursor):
+        # Modelo SCD2: cada linha é uma versão com vigência [valid_from, valid_to);
+        # as views clientes/servicos expõem só as versões correntes para as consultas existentes
+        for spec in (CLIENT_BULK_SPEC, SERVICE_BULK_SPEC):
+            table = spec['table']
+            versions = spec['versions']
+            columns = [(name, sql_type) for name, sql_type in spec['columns'] if name != 'extraction_date']
+            names = [name for name, _ in columns]
             
-            # Tabela de serviços
-            cursor.execute("""
-                IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='servicos' AND xtype='U')
-                CREATE TABLE servicos (
+            cursor.execute(f"""
+                IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='{versions}' AND xtype='U')
+                CREATE TABLE {versions} (
                     id INT IDENTITY(1,1) PRIMARY KEY,
-                    client_id NVARCHAR(100) NOT NULL,
-                    service_date NVARCHAR(50) NOT NULL,
-                    service_type NVARCHAR(255) NOT NULL,
-                    description NVARCHAR(MAX),
-                    status NVARCHAR(100),
-                    extraction_date DATETIME2 NOT NULL,
-                    created_at DATETIME2 DEFAULT GETDATE(),
-                    UNIQUE(client_id, service_date, service_type, extraction_date)
+                    {', '.join(f'{name} {sql_type}' for name, sql_type in columns)},
+                    valid_from DATETIME2 NOT NULL,
+                    valid_to DATETIME2 NULL,
+                    created_at DATETIME2 DEFAULT GETDATE()
                 )
             """)
             
-            # Índices para melhor performance
-            cursor.execute("""
-                IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='idx_clientes_client_id')
-                CREATE INDEX idx_clientes_client_id ON clientes(client_id)
+            cursor.execute(f"""
+                IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='idx_{versions}_current')
+                CREATE UNIQUE INDEX idx_{versions}_current ON {versions}({', '.join(spec['key'])})
+                WHERE valid_to IS NULL
             """)
             
-            cursor.execute("""
-                IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='idx_servicos_client_id')
-                CREATE INDEX idx_servicos_client_id ON servicos(client_id)
+            cursor.execute(f"""
+                IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='idx_{versions}_valid_to')
+                CREATE INDEX idx_{versions}_valid_to ON {versions}(valid_to)
+                WHERE valid_to IS NOT NULL
             """)
             
-            cursor.execute("""
-                IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='idx_servicos_service_date')
-                CREATE INDEX idx_servicos_service_date ON servicos(service_date)
-            """)
+            if spec is SERVICE_BULK_SPEC:
+                # Tabelas criadas antes da coluna de data tipada (inclusive a de snapshots a migrar)
+                self._add_service_date_column(cursor, versions)
+                self._add_service_date_column(cursor, table)
+                
+                cursor.execute(f"""
+                    IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='idx_{versions}_client_service_date_value')
+                    CREATE INDEX idx_{versions}_client_service_date_value
+                    ON {versions}(client_id, service_date_value)
+                    WHERE valid_to IS NULL
+                """)
             
-            self.connection.commit()
-            logger.info("Tabelas verificadas/criadas com sucesso")
+            # Migração: a última cópia de cada chave na tabela de snapshots vira a versão
+            # corrente e a tabela antiga é renomeada para dar lugar à view
+            cursor.execute(f"""
+                IF OBJECT_ID('{table}', 'U') IS NOT NULL
+                BEGIN
+                    IF NOT EXISTS (SELECT 1 FROM {versions})
+                        INSERT INTO {versions} ({', '.join(names)}, valid_from)
+                        SELECT {', '.join(names)}, extraction_date
+                        FROM (
+                            SELECT *, ROW_NUMBER() OVER (
+                                PARTITION BY {', '.join(spec['key'])} ORDER BY extraction_date DESC
+                            ) AS version_rank
+                            FROM {table}
+                        ) AS latest
+                        WHERE version_rank = 1;
+                    
+                    EXEC sp_rename '{table}', '{table}_snapshot';
+                END
+            """)
             
-        except pyodbc.Error as e:
-            logger.error(f"Erro ao criar tabelas: {e}")
-        finally:
-            self.disconnect()
+            cursor.execute(f"""
+                IF OBJECT_ID('{table}', 'U') IS NULL
+                EXEC('CREATE OR ALTER VIEW {table} AS
+                      SELECT id, {', '.join(names)}, valid_from AS extraction_date, created_at
+                      FROM {versions}
+                      WHERE valid_to IS NULL')
+            """)
+    
+    def _add_service_date_column(self, cursor, table: str):
+        # Preenche as linhas existentes com os formatos que o SQL Server converte sozinho
+        # (dd/mm/aaaa e aaaa-mm-dd); as novas chegam já convertidas pelo crawler
+        cursor.execute(f"""
+            IF OBJECT_ID('{table}', 'U') IS NOT NULL AND COL_LENGTH('{table}', 'service_date_value') IS NULL
+            BEGIN
+                ALTER TABLE {table} ADD service_date_value DATE NULL;
+                EXEC('UPDATE {table}
+                      SET service_date_value = COALESCE(TRY_CONVERT(DATE, service_date, 103),
+                                                        TRY_CONVERT(DATE, service_date, 23))');
+            END
+        """)
+    
+    def _uses_staging(self) -> bool:
+        return db_config.BULK_WRITE or db_config.STORAGE_MODEL == 'scd2' or db_config.CHANGE_LOG
     
     def save_clients(self, clients: List[Client]) -> bool:
-        if not self.connect():
-            return False
+        if self._uses_staging():
+            return self.bulk_save_clients(clients) is not None
         
         try:
-            cursor = self.connection.cursor()
+            with self._session() as connection:
+                cursor = connection.cursor()
+                
+                for client in clients:
+                    with metrics.timer('db_execute', operation='insert_clientes'):
+                        cursor.execute("""
+                            INSERT INTO clientes (client_id, name, email, phone, extraction_date)
+                            VALUES (?, ?, ?, ?, ?)
+                        """, client.client_id, client.name, client.email, client.phone, 
+                           client.extraction_date or datetime.now())
             
-            for client in clients:
-                cursor.execute("""
-                    INSERT INTO clientes (client_id, name, email, phone, extraction_date)
-                    VALUES (?, ?, ?, ?, ?)
-                """, client.client_id, client.name, client.email, client.phone, 
-                   client.extraction_date or datetime.now())
-            
-            self.connection.commit()
             logger.info(f"{len(clients)} clientes salvos no banco de dados")
             return True
             
         except pyodbc.Error as e:
             logger.error(f"Erro ao salvar clientes: {e}")
-            self.connection.rollback()
             return False
-        finally:
-            self.disconnect()
     
-    def save_services(self, services: List[Service]) -> bool:
-        if not self.connect():
+    def save_services(self, services: Union[List[Service], ServiceBatch]) -> bool:
+        if self._uses_staging():
+            return self.bulk_save_services(services) is not None
+        
+        rows = self._service_rows(services)
+        
+        try:
+            with self._session() as connection:
+                cursor = connection.cursor()
+                
+                for row in rows:
+                    with metrics.timer('db_execute', operation='insert_servicos'):
+                        cursor.execute("""
+                            INSERT INTO servicos (client_id, service_date, service_date_value, service_type, description, status, extraction_date)
+                            VALUES (?, ?, ?, ?, ?, ?, ?)
+                        """, *row)
+            
+            logger.info(f"{len(rows)} serviços salvos no banco de dados")
+            return True
+            
+        except pyodbc.Error as e:
+            logger.error(f"Erro ao salvar serviços: {e}")
             return False
+    
+    def bulk_save_clients(self, clients: List[Client], batch_size: Optional[int] = None) -> Optional[BulkWriteResult]:
+        now = datetime.now()
+        rows = [
+            (client.client_id, client.name, client.email, client.phone, client.extraction_date or now)
+            for client in clients
+        ]
+        return self._bulk_write(CLIENT_BULK_SPEC, rows, batch_size, "clientes")
+    
+    def bulk_save_services(self, services: Union[List[Service], ServiceBatch],
+                           batch_size: Optional[int] = None) -> Optional[BulkWriteResult]:
+        return self._bulk_write(SERVICE_BULK_SPEC, self._service_rows(services), batch_size, "serviços")
+    
+    def _service_rows(self, services: Union[List[Service], ServiceBatch]) -> List[Tuple]:
+        # O lote colunar já sai na ordem das colunas de SERVICE_BULK_SPEC
+        if not isinstance(services, ServiceBatch):
+            services = ServiceBatch.from_services(services)
+        return services.to_params([name for name, _ in SERVICE_BULK_SPEC['columns']])
+    
+    def _bulk_write(self, spec: Dict[str, Any], rows: Sequence[Tuple], batch_size: Optional[int],
+                    label: str) -> Optional[BulkWriteResult]:
+        if db_config.STORAGE_MODEL == 'scd2':
+            return self._versioned_merge(spec, rows, batch_size, label)
+        return self._bulk_merge(spec, rows, batch_size, label)
+    
+    def _bulk_merge(self, spec: Dict[str, Any], rows: Sequence[Tuple], batch_size: Optional[int],
+                    label: str) -> Optional[BulkWriteResult]:
+        if not rows:
+            return BulkWriteResult()
+        
+        batch_size = batch_size or db_config.BULK_BATCH_SIZE
         
         try:
-            cursor = self.connection.cursor()
+            with self._session() as connection:
+                cursor = connection.cursor()
+                self._create_staging(cursor, spec)
+                self._load_staging(cursor, spec, rows, batch_size)
+                logged = self._record_changes(cursor, spec) if db_config.CHANGE_LOG else 0
+                
+                with metrics.timer('db_execute', operation=f"merge_{spec['table']}"):
+                    cursor.execute(self._merge_sql(spec))
+                    actions = [row[0] for row in cursor.fetchall()]
+                cursor.execute(f"DROP TABLE {spec['staging']}")
             
-            for service in services:
+            result = BulkWriteResult(staged=len(rows), logged=logged)
+            result.inserted = actions.count('INSERT')
+            result.updated = actions.count('UPDATE')
+            result.skipped = result.staged - result.inserted - result.updated
+            
+            logger.info(f"Carga em massa de {label}: {result.inserted} inseridos, "
+                        f"{result.updated} atualizados, {result.skipped} ignorados")
+            return result
+            
+        except pyodbc.Error as e:
+            logger.error(f"Erro na carga em massa de {label}: {e}")
+            return None
+    
+    def _versioned_merge(self, spec: Dict[str, Any], rows: Sequence[Tuple], batch_size: Optional[int],
+                         label: str) -> Optional[BulkWriteResult]:
+        if not rows:
+            return BulkWriteResult()
+        
+        batch_size = batch_size or db_config.BULK_BATCH_SIZE
+        names = [name for name, _ in spec['columns'] if name != 'extraction_date']
+        versions = spec['versions']
+        staging = spec['staging']
+        match = " AND ".join(f"target.{column} = source.{column}" for column in spec['key'])
+        
+        try:
+            with self._session() as connection:
+                cursor = connection.cursor()
+                self._create_staging(cursor, spec)
+                self._load_staging(cursor, spec, rows, batch_size)
+                
+                with metrics.timer('db_execute', operation=f"version_{spec['table']}"):
+                    cursor.execute(f"""
+                        WITH ranked AS (
+                            SELECT ROW_NUMBER() OVER (
+                                PARTITION BY {', '.join(spec['key'])} ORDER BY extraction_date DESC
+                            ) AS duplicate_rank
+                            FROM {staging}
+                        )
+                        DELETE FROM ranked WHERE duplicate_rank > 1
+                    """)
+                    logged = self._record_changes(cursor, spec) if db_config.CHANGE_LOG else 0
+                    
+                    # Encerra a versão corrente das chaves cujo conteúdo mudou
+                    cursor.execute(f"""
+                        UPDATE target SET valid_to = source.extraction_date
+                        FROM {versions} AS target
+                        JOIN {staging} AS source ON {match}
+                        WHERE target.valid_to IS NULL
+                          AND EXISTS (
+                              SELECT {', '.join(f'source.{column}' for column in spec['compare'])}
+                              EXCEPT
+                              SELECT {', '.join(f'target.{column}' for column in spec['compare'])}
+                          )
+                    """)
+                    changed = cursor.rowcount
+                    
+                    # Chaves novas e alteradas (que ficaram sem versão corrente) ganham uma versão
+                    cursor.execute(f"""
+                        INSERT INTO {versions} ({', '.join(names)}, valid_from)
+                        SELECT {', '.join(f'source.{column}' for column in names)}, source.extraction_date
+                        FROM {staging} AS source
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM {versions} AS target
+                            WHERE {match} AND target.valid_to IS NULL
+                        )
+                    """)
+                    written = cursor.rowcount
+                    
+                    # Colunas derivadas (service_date_value) das versões que seguem correntes:
+                    # mudam sem gerar versão nova, mas precisam acompanhar o último parse
+                    refreshed = 0
+                    if spec.get('derived'):
+                        cursor.execute(f"""
+                            UPDATE target
+                            SET {', '.join(f'{column} = source.{column}' for column in spec['derived'])}
+                            FROM {versions} AS target
+                            JOIN {staging} AS source ON {match}
+                            WHERE target.valid_to IS NULL
+                              AND EXISTS (
+                                  SELECT {', '.join(f'source.{column}' for column in spec['derived'])}
+                                  EXCEPT
+                                  SELECT {', '.join(f'target.{column}' for column in spec['derived'])}
+                              )
+                        """)
+                        refreshed = cursor.rowcount
+                    
+                    closed = 0
+                    if spec.get('scope'):
+                        scope = spec['scope']
+                        cursor.execute(f"""
+                            UPDATE target SET valid_to = (SELECT MAX(extraction_date) FROM {staging})
+                            OUTPUT inserted.{scope}
+                            FROM {versions} AS target
+                            WHERE target.valid_to IS NULL
+                              AND target.{scope} IN (SELECT {scope} FROM {staging})
+                              AND NOT EXISTS (SELECT 1 FROM {staging} AS source WHERE {match})
+                        """)
+                        closed_scopes = [row[0] for row in cursor.fetchall()]
+                        closed = len(closed_scopes)
+                        if closed:
+                            # Registros que sumiram do site: vale conferir se não é falha de extração
+                            scopes = sorted(set(closed_scopes))
+                            metrics.inc('versions_closed_total', closed, table=spec['table'])
+                            logger.info(f"{closed} {label} ausentes do lote tiveram a versão encerrada "
+                                        f"({scope}: {', '.join(scopes[:10])}{' ...' if len(scopes) > 10 else ''})")
+                
+                cursor.execute(f"DROP TABLE {staging}")
+            
+            result = BulkWriteResult(staged=len(rows), inserted=written - changed,
+                                     updated=changed, skipped=len(rows) - written, closed=closed,
+                                     logged=logged)
+            
+            logger.info(f"Versionamento de {label}: {result.inserted} novos, {result.updated} alterados, "
+                        f"{result.closed} encerrados, {result.skipped} sem alteração"
+                        f"{f', {refreshed} com colunas derivadas atualizadas' if refreshed else ''}")
+            return result
+            
+        except pyodbc.Error as e:
+            logger.error(f"Erro no versionamento de {label}: {e}")
+            return None
+    
+    def _record_changes(self, cursor, spec: Dict[str, Any]) -> int:
+        # Compara a staging com o estado corrente (tabela 'state' da spec) e aplica as
+        # diferenças nele na mesma transação; só diferenças viram registro
+        table = spec['table']
+        staging = spec['staging']
+        state = spec['state']
+        names = [name for name, _ in spec['columns']]
+        key = spec['key']
+        match = " AND ".join(f"target.{column} = source.{column}" for column in key)
+        source = f"""
+            SELECT * FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY {', '.join(key)} ORDER BY extraction_date DESC
+                ) AS duplicate_rank
+                FROM {staging}
+            ) AS ranked
+            WHERE duplicate_rank = 1
+        """
+        
+        cursor.execute(f"""
+            WITH source AS ({source})
+            INSERT INTO log_alteracoes (entity, operation, client_id, payload)
+            SELECT '{table}', CASE WHEN target.client_id IS NULL THEN 'I' ELSE 'U' END, source.client_id,
+                   (SELECT {', '.join(f'source.{column} AS {column}' for column in names)}
+                    FOR JSON PATH, WITHOUT_ARRAY_WRAPPER, INCLUDE_NULL_VALUES)
+            FROM source
+            LEFT JOIN {state} AS target WITH (UPDLOCK, HOLDLOCK) ON {match}
+            WHERE target.client_id IS NULL
+               OR EXISTS (
+                   SELECT {', '.join(f'source.{column}' for column in spec['compare'])}
+                   EXCEPT
+                   SELECT {', '.join(f'target.{column}' for column in spec['compare'])}
+               )
+        """)
+        logged = cursor.rowcount
+        
+        if spec.get('scope'):
+            scope = spec['scope']
+            missing = f"""
+                FROM {state} AS target WITH (UPDLOCK, HOLDLOCK)
+                WHERE target.{scope} IN (SELECT {scope} FROM {staging})
+                  AND NOT EXISTS (SELECT 1 FROM {staging} AS source WHERE {match})
+            """
+            cursor.execute(f"""
+                INSERT INTO log_alteracoes (entity, operation, client_id, payload)
+                SELECT '{table}', 'D', target.client_id,
+                       (SELECT {', '.join(f'target.{column} AS {column}' for column in key)}
+                        FOR JSON PATH, WITHOUT_ARRAY_WRAPPER)
+                {missing}
+            """)
+            logged += cursor.rowcount
+            cursor.execute(f"DELETE target {missing}")
+        
+        cursor.execute(f"""
+            MERGE {state} WITH (HOLDLOCK) AS target
+            USING ({source}) AS source
+            ON {match}
+            WHEN MATCHED THEN
+                UPDATE SET {', '.join(f'{name} = source.{name}' for name in names if name not in key)}
+            WHEN NOT MATCHED BY TARGET THEN
+                INSERT ({', '.join(names)})
+                VALUES ({', '.join(f'source.{name}' for name in names)});
+        """)
+        
+        return logged
+    
+    def record_client_deletions(self, client_ids: List[str]) -> int:
+        # Recebe a listagem completa de clientes: quem está no estado corrente e não veio
+        # nela foi excluído no site. O cliente e seus serviços ganham registro 'D' uma vez.
+        if not db_config.CHANGE_LOG or not client_ids:
+            return 0
+        
+        try:
+            with self._session() as connection:
+                cursor = connection.cursor()
                 cursor.execute("""
-                    INSERT INTO servicos (client_id, service_date, service_type, description, status, extraction_date)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, service.client_id, service.service_date, service.service_type, 
-                   service.description, service.status, service.extraction_date or datetime.now())
+                    IF OBJECT_ID('tempdb..#clientes_listados') IS NOT NULL DROP TABLE #clientes_listados;
+                    CREATE TABLE #clientes_listados (client_id NVARCHAR(100) NOT NULL PRIMARY KEY)
+                """)
+                cursor.fast_executemany = True
+                cursor.executemany("INSERT INTO #clientes_listados (client_id) VALUES (?)",
+                                   [(client_id,) for client_id in set(client_ids)])
+                cursor.fast_executemany = False
+                
+                logged = 0
+                for spec in (SERVICE_BULK_SPEC, CLIENT_BULK_SPEC):
+                    missing = f"""
+                        FROM {spec['state']} AS target WITH (UPDLOCK, HOLDLOCK)
+                        WHERE NOT EXISTS (SELECT 1 FROM #clientes_listados AS listed
+                                          WHERE listed.client_id = target.client_id)
+                    """
+                    cursor.execute(f"""
+                        INSERT INTO log_alteracoes (entity, operation, client_id, payload)
+                        SELECT '{spec['table']}', 'D', target.client_id,
+                               (SELECT {', '.join(f'target.{column} AS {column}' for column in spec['key'])}
+                                FOR JSON PATH, WITHOUT_ARRAY_WRAPPER)
+                        {missing}
+                    """)
+                    logged += cursor.rowcount
+                    cursor.execute(f"DELETE target {missing}")
+                
+                cursor.execute("DROP TABLE #clientes_listados")
+            
+            if logged:
+                logger.info(f"Log de alterações: {logged} exclusões de clientes e serviços registradas")
+            return logged
+            
+        except pyodbc.Error as e:
+            logger.error(f"Erro ao registrar clientes excluídos: {e}")
+            return 0
+    
+    def get_changes_since(self, version: int = 0, limit: int = 1000) -> List[ChangeLogEntry]:
+        # version é o row_version do último registro recebido (0 na primeira leitura)
+        try:
+            with self._session() as connection:
+                cursor = connection.cursor()
+                cursor.execute("""
+                    SELECT TOP (?) CAST(row_version AS BIGINT), seq, entity, operation, client_id,
+                           payload, changed_at
+                    FROM log_alteracoes
+                    WHERE row_version > CAST(CAST(? AS BIGINT) AS BINARY(8))
+                      AND row_version < MIN_ACTIVE_ROWVERSION()
+                    ORDER BY row_version
+                """, limit, version)
+                return [
+                    ChangeLogEntry(version=row[0], seq=row[1], entity=row[2], operation=row[3],
+                                   client_id=row[4], payload=json.loads(row[5]), changed_at=row[6])
+                    for row in cursor.fetchall()
+                ]
+        except pyodbc.Error as e:
+            logger.error(f"Erro ao ler log de alterações: {e}")
+            return []
+    
+    def _create_staging(self, cursor, spec: Dict[str, Any]):
+        columns = ", ".join(f"{name} {sql_type}" for name, sql_type in spec['columns'])
+        cursor.execute(f"""
+            IF OBJECT_ID('tempdb..{spec['staging']}') IS NOT NULL DROP TABLE {spec['staging']};
+            CREATE TABLE {spec['staging']} ({columns})
+        """)
+    
+    def _load_staging(self, cursor, spec: Dict[str, Any], rows: Sequence[Tuple], batch_size: int):
+        names = [name for name, _ in spec['columns']]
+        insert_sql = (f"INSERT INTO {spec['staging']} ({', '.join(names)}) "
+                      f"VALUES ({', '.join('?' for _ in names)})")
+        
+        cursor.fast_executemany = True
+        with metrics.timer('db_execute', operation=f"load_{spec['table']}"):
+            for start in range(0, len(rows), batch_size):
+                cursor.executemany(insert_sql, rows[start:start + batch_size])
+        cursor.fast_executemany = False
+    
+    def _merge_sql(self, spec: Dict[str, Any]) -> str:
+        names = [name for name, _ in spec['columns']]
+        key = spec['key']
+        compare = spec['compare']
+        
+        match = " AND ".join(f"target.{column} = source.{column}" for column in key)
+        partition = ", ".join(key + ["CAST(extraction_date AS DATE)"])
+        
+        return f"""
+            MERGE {spec['table']} AS target
+            USING (
+                SELECT {', '.join(names)}
+                FROM (
+                    SELECT *, ROW_NUMBER() OVER (
+                        PARTITION BY {partition} ORDER BY extraction_date DESC
+                    ) AS duplicate_rank
+                    FROM {spec['staging']}
+                ) AS deduplicated
+                WHERE duplicate_rank = 1
+            ) AS source
+            ON {match}
+               AND CAST(target.extraction_date AS DATE) = CAST(source.extraction_date AS DATE)
+            WHEN MATCHED AND EXISTS (
+                SELECT {', '.join(f'source.{column}' for column in compare)}
+                EXCEPT
+                SELECT {', '.join(f'target.{column}' for column in compare)}
+            ) THEN
+                UPDATE SET {', '.join(f'{column} = source.{column}' for column in compare + spec.get('derived', []) + ['extraction_date'])}
+            WHEN NOT MATCHED BY TARGET THEN
+                INSERT ({', '.join(names)})
+                VALUES ({', '.join(f'source.{column}' for column in names)})
+            OUTPUT $action;
+        """
+    
+    def get_fingerprints(self) -> Dict[str, ClientFingerprint]:
+        try:
+            with self._session() as connection:
+                cursor = connection.cursor()
+                cursor.execute("SELECT client_id, client_hash, services_hash, checked_at FROM fingerprints_clientes")
+                return {
+                    row[0]: ClientFingerprint(client_id=row[0], client_hash=row[1],
+                                              services_hash=row[2], checked_at=row[3])
+                    for row in cursor.fetchall()
+                }
+        except pyodbc.Error as e:
+            logger.error(f"Erro ao carregar fingerprints de clientes: {e}")
+            return {}
+    
+    def save_fingerprints(self, fingerprints: List[ClientFingerprint]) -> bool:
+        if not fingerprints:
+            return True
+        
+        now = datetime.now()
+        rows = [
+            (fingerprint.client_id, fingerprint.client_hash, fingerprint.services_hash,
+             fingerprint.checked_at or now)
+            for fingerprint in fingerprints
+        ]
+        
+        try:
+            with self._session() as connection:
+                cursor = connection.cursor()
+                cursor.fast_executemany = True
+                cursor.executemany("""
+                    MERGE fingerprints_clientes AS target
+                    USING (SELECT ? AS client_id, ? AS client_hash, ? AS services_hash, ? AS checked_at) AS source
+                    ON target.client_id = source.client_id
+                    WHEN MATCHED THEN
+                        UPDATE SET client_hash = source.client_hash,
+                                   services_hash = source.services_hash,
+                                   checked_at = source.checked_at
+                    WHEN NOT MATCHED THEN
+                        INSERT (client_id, client_hash, services_hash, checked_at)
+                        VALUES (source.client_id, source.client_hash, source.services_hash, source.checked_at);
+                """, rows)
             
-            self.connection.commit()
-            logger.info(f"{len(services)} serviços salvos no banco de dados")
             return True
             
         except pyodbc.Error as e:
-            logger.error(f"Erro ao salvar serviços: {e}")
-            self.connection.rollback()
+            logger.error(f"Erro ao salvar fingerprints de clientes: {e}")
             return False
-        finally:
-            self.disconnect()
     
-    def cleanup_old_data(self):
-        if not self.connect():
-            return
+    def cleanup_old_data(self, batch_size: Optional[int] = None,
+                         pause_seconds: Optional[float] = None) -> RetentionResult:
+        # Remove em lotes pequenos, cada um na sua transação, para não escalar locks,
+        # não inflar o log de transações e não bloquear a API de sincronização
+        batch_size = batch_size or crawler_config.RETENTION_BATCH_SIZE
+        pause_seconds = crawler_config.RETENTION_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+        result = RetentionResult(cutoff_date=datetime.now() - timedelta(days=crawler_config.DATA_RETENTION_DAYS))
+        started = time.monotonic()
+        
+        if db_config.STORAGE_MODEL == 'scd2':
+            # Só versões já substituídas expiram; a versão corrente nunca é removida
+            targets = [('clientes_versoes', 'valid_to', 'clients_deleted'),
+                       ('servicos_versoes', 'valid_to', 'services_deleted')]
+        else:
+            targets = [('clientes', 'extraction_date', 'clients_deleted'),
+                       ('servicos', 'extraction_date', 'services_deleted')]
+        targets.append(('log_alteracoes', 'changed_at', 'changes_deleted'))
         
         try:
-            cursor = self.connection.cursor()
-            cutoff_date = datetime.now() - timedelta(days=crawler_config.DATA_RETENTION_DAYS)
+            for table, column, counter in targets:
+                while not self._cleanup_stop.is_set():
+                    with self._session() as connection:
+                        cursor = connection.cursor()
+                        with metrics.timer('db_execute', operation=f"retention_{table}"):
+                            cursor.execute(f"DELETE TOP (?) FROM {table} WHERE {column} < ?",
+                                           batch_size, result.cutoff_date)
+                        deleted = cursor.rowcount
+                    
+                    setattr(result, counter, getattr(result, counter) + deleted)
+                    metrics.inc('rows_deleted_total', deleted, table=table)
+                    result.batches += 1
+                    if deleted < batch_size:
+                        break
+                    
+                    if result.batches % 10 == 0:
+                        logger.info(f"Limpeza em andamento: {result.clients_deleted} clientes e "
+                                    f"{result.services_deleted} serviços removidos em {result.batches} lotes")
+                    time.sleep(pause_seconds)
             
-            cursor.execute("DELETE FROM clientes WHERE extraction_date < ?", cutoff_date)
-            client_deleted = cursor.rowcount
+            result.completed = not self._cleanup_stop.is_set()
             
-            cursor.execute("DELETE FROM servicos WHERE extraction_date < ?", cutoff_date)
-            service_deleted = cursor.rowcount
+        except pyodbc.Error as e:
+            logger.error(f"Erro na limpeza de dados: {e}")
+            result.completed = False
+        
+        result.seconds = round(time.monotonic() - started, 1)
+        logger.info(f"Limpeza {'concluída' if result.completed else 'interrompida'}: "
+                    f"{result.clients_deleted} clientes, {result.services_deleted} serviços e "
+                    f"{result.changes_deleted} registros de alteração removidos "
+                    f"em {result.batches} lotes ({result.seconds}s)")
+        return result
+    
+    def cleanup_old_data_in_background(self) -> bool:
+        if self._cleanup_thread and self._cleanup_thread.is_alive():
+            logger.info("Limpeza anterior ainda em andamento; nada a iniciar")
+            return False
+        
+        self._cleanup_stop.clear()
+        self._cleanup_thread = threading.Thread(target=self.cleanup_old_data, name="retention-cleanup",
+                                                daemon=True)
+        self._cleanup_thread.start()
+        return True
+    
+    def refresh_return_dates(self, client_ids: Optional[List[str]] = None,
+                             interval_days: Optional[int] = None) -> bool:
+        # Com client_ids recalcula só os clientes gravados na execução; sem eles, todos
+        interval_days = interval_days or crawler_config.RETURN_INTERVAL_DAYS
+        if client_ids is not None and not client_ids:
+            return True
+        
+        scope = "IN (SELECT client_id FROM #retornos_alvo)" if client_ids is not None else "IS NOT NULL"
+        
+        try:
+            with self._session() as connection:
+                cursor = connection.cursor()
+                if client_ids is not None:
+                    cursor.execute("""
+                        IF OBJECT_ID('tempdb..#retornos_alvo') IS NOT NULL DROP TABLE #retornos_alvo;
+                        CREATE TABLE #retornos_alvo (client_id NVARCHAR(100) NOT NULL PRIMARY KEY)
+                    """)
+                    cursor.fast_executemany = True
+                    cursor.executemany("INSERT INTO #retornos_alvo (client_id) VALUES (?)",
+                                       [(client_id,) for client_id in set(client_ids)])
+                    cursor.fast_executemany = False
+                
+                # Agregação lida do índice (client_id, service_date_value); nome e contato vão
+                # junto para a API não precisar ler a tabela de clientes. Só as linhas que
+                # mudaram são reescritas
+                with metrics.timer('db_execute', operation='refresh_retornos'):
+                    cursor.execute(f"""
+                        MERGE retornos_clientes AS target
+                        USING (
+                            SELECT returns.client_id, returns.last_service_date,
+                                   client.name, client.email, client.phone
+                            FROM (
+                                SELECT client_id, MAX(service_date_value) AS last_service_date
+                                FROM servicos
+                                WHERE service_date_value IS NOT NULL AND client_id {scope}
+                                GROUP BY client_id
+                            ) AS returns
+                            OUTER APPLY (
+                                SELECT TOP 1 name, email, phone
+                                FROM clientes
+                                WHERE clientes.client_id = returns.client_id
+                                ORDER BY extraction_date DESC
+                            ) AS client
+                        ) AS source
+                        ON target.client_id = source.client_id
+                        WHEN MATCHED AND (target.last_service_date <> source.last_service_date
+                                          OR target.expected_return_date <> DATEADD(DAY, ?, source.last_service_date)
+                                          OR EXISTS (SELECT source.name, source.email, source.phone
+                                                     EXCEPT
+                                                     SELECT target.name, target.email, target.phone)) THEN
+                            UPDATE SET last_service_date = source.last_service_date,
+                                       expected_return_date = DATEADD(DAY, ?, source.last_service_date),
+                                       name = source.name, email = source.email, phone = source.phone,
+                                       updated_at = SYSDATETIME()
+                        WHEN NOT MATCHED BY TARGET THEN
+                            INSERT (client_id, name, email, phone, last_service_date, expected_return_date, updated_at)
+                            VALUES (source.client_id, source.name, source.email, source.phone, source.last_service_date,
+                                    DATEADD(DAY, ?, source.last_service_date), SYSDATETIME())
+                        WHEN NOT MATCHED BY SOURCE AND target.client_id {scope} THEN
+                            DELETE;
+                    """, interval_days, interval_days, interval_days)
+                    changed = cursor.rowcount
+                
+                if client_ids is not None:
+                    cursor.execute("DROP TABLE #retornos_alvo")
             
-            self.connection.commit()
-            logger.info(f"Limpeza concluída: {client_deleted} clientes e {service_deleted} serviços removidos")
+            logger.info(f"Tabela de retornos atualizada: {changed} clientes alterados")
+            return True
             
         except pyodbc.Error as e:
-            logger.error(f"Erro na limpeza de dados: {e}")
-        finally:
-            self.disconnect()
+            logger.error(f"Erro ao atualizar tabela de retornos: {e}")
+            return False
     
     def get_client_count(self) -> int:
-        if not self.connect():
-            return 0
-        
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT COUNT(DISTINCT client_id) FROM clientes")
-            return cursor.fetchone()[0]
+            with self._session() as connection:
+                cursor = connection.cursor()
+                cursor.execute("SELECT COUNT(DISTINCT client_id) FROM clientes")
+                return cursor.fetchone()[0]
         except pyodbc.Error as e:
             logger.error(f"Erro ao contar clientes: {e}")
             return 0
-        finally:
-            self.disconnect()
     
     def get_service_count(self) -> int:
-        if not self.connect():
-            return 0
-        
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT COUNT(*) FROM servicos")
-            return cursor.fetchone()[0]
+            with self._session() as connection:
+                cursor = connection.cursor()
+                cursor.execute("SELECT COUNT(*) FROM servicos")
+                return cursor.fetchone()[0]
         except pyodbc.Error as e:
             logger.error(f"Erro ao contar serviços: {e}")
-            return 0
-        finally:
-            self.disconnect()
\ No newline at end of file
+            return 0
\ No newline at end of file
@@ -0,0 +1,329 @@
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config.settings import crawler_config
+from database.connection_pool import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# Fila de clientes compartilhada entre máquinas. Cada nó reserva um lote com
+# prazo (lease); se o nó morrer, o prazo vence e outro nó assume o lote.
+# Estados: pending -> leased -> done | failed (após MAX_ATTEMPTS reservas)
+
+@dataclass
+class NodeProgress:
+    node_id: str
+    leased: int = 0
+    done: int = 0
+    failed: int = 0
+    last_seen: Optional[datetime] = None
+
+class SQLServerWorkQueue:
+    def __init__(self, pool: ConnectionPool, queue_name: Optional[str] = None,
+                 lease_seconds: Optional[int] = None, max_attempts: Optional[int] = None):
+        self.pool = pool
+        self.queue_name = queue_name or crawler_config.WORK_QUEUE_NAME
+        self.lease_seconds = lease_seconds or crawler_config.WORK_QUEUE_LEASE_SECONDS
+        self.max_attempts = max_attempts or crawler_config.WORK_QUEUE_MAX_ATTEMPTS
+        self._create_tables()
+
+    @contextmanager
+    def _transaction(self):
+        with self.pool.acquire() as connection:
+            try:
+                yield connection.cursor()
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+
+    def _create_tables(self):
+        with self._transaction() as cursor:
+            cursor.execute("""
+                IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='fila_clientes' AND xtype='U')
+                CREATE TABLE fila_clientes (
+                    id BIGINT IDENTITY(1,1) PRIMARY KEY,
+                    queue_name NVARCHAR(100) NOT NULL,
+                    client_id NVARCHAR(100) NOT NULL,
+                    status VARCHAR(10) NOT NULL,
+                    owner NVARCHAR(200),
+                    lease_until DATETIME2,
+                    attempts INT NOT NULL DEFAULT 0,
+                    updated_at DATETIME2 NOT NULL DEFAULT SYSDATETIME(),
+                    UNIQUE(queue_name, client_id)
+                )
+            """)
+            cursor.execute("""
+                IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='idx_fila_clientes_claim')
+                CREATE INDEX idx_fila_clientes_claim ON fila_clientes(queue_name, status, lease_until)
+            """)
+
+    def enqueue(self, client_ids: List[str]) -> int:
+        # Reenfileirar a mesma fila reinicia os clientes para uma nova rodada
+        with self._transaction() as cursor:
+            cursor.fast_executemany = True
+            cursor.executemany("""
+                MERGE fila_clientes AS target
+                USING (SELECT ? AS queue_name, ? AS client_id) AS source
+                ON target.queue_name = source.queue_name AND target.client_id = source.client_id
+                WHEN MATCHED THEN
+                    UPDATE SET status = 'pending', owner = NULL, lease_until = NULL,
+                               attempts = 0, updated_at = SYSDATETIME()
+                WHEN NOT MATCHED THEN
+                    INSERT (queue_name, client_id, status) VALUES (source.queue_name, source.client_id, 'pending');
+            """, [(self.queue_name, client_id) for client_id in client_ids])
+
+        logger.info(f"{len(client_ids)} clientes enfileirados em '{self.queue_name}'")
+        return len(client_ids)
+
+    def claim(self, node_id: str, batch_size: int) -> List[str]:
+        # READPAST pula linhas travadas por outro nó; UPDLOCK impede que duas
+        # transações reservem a mesma linha
+        with self._transaction() as cursor:
+            cursor.execute("""
+                UPDATE fila_clientes SET status = 'failed', updated_at = SYSDATETIME()
+                WHERE queue_name = ? AND status = 'leased' AND lease_until < SYSDATETIME()
+                  AND attempts >= ?
+            """, self.queue_name, self.max_attempts)
+
+            cursor.execute("""
+                WITH next_batch AS (
+                    SELECT TOP (?) *
+                    FROM fila_clientes WITH (UPDLOCK, READPAST, ROWLOCK)
+                    WHERE queue_name = ?
+                      AND (status = 'pending' OR (status = 'leased' AND lease_until < SYSDATETIME()))
+                    ORDER BY id
+                )
+                UPDATE next_batch
+                SET status = 'leased', owner = ?, attempts = attempts + 1,
+                    lease_until = DATEADD(SECOND, ?, SYSDATETIME()), updated_at = SYSDATETIME()
+                OUTPUT inserted.client_id
+            """, batch_size, self.queue_name, node_id, self.lease_seconds)
+            client_ids = [row[0] for row in cursor.fetchall()]
+        return client_ids
+
+    def renew(self, node_id: str, client_ids: List[str]):
+        self._update_owned(node_id, client_ids, """
+            UPDATE fila_clientes
+            SET lease_until = DATEADD(SECOND, ?, SYSDATETIME()), updated_at = SYSDATETIME()
+            WHERE queue_name = ? AND owner = ? AND client_id = ? AND status = 'leased'
+        """, (self.lease_seconds,))
+
+    def complete(self, node_id: str, client_ids: List[str]):
+        self._update_owned(node_id, client_ids, """
+            UPDATE fila_clientes
+            SET status = 'done', lease_until = NULL, updated_at = SYSDATETIME()
+            WHERE queue_name = ? AND owner = ? AND client_id = ? AND status = 'leased'
+        """)
+
+    def release(self, node_id: str, client_ids: List[str]):
+        # Devolve à fila sem esperar o prazo vencer (ex.: nó encerrando)
+        self._update_owned(node_id, client_ids, """
+            UPDATE fila_clientes
+            SET status = 'pending', owner = NULL, lease_until = NULL, updated_at = SYSDATETIME()
+            WHERE queue_name = ? AND owner = ? AND client_id = ? AND status = 'leased'
+        """)
+
+    def fail(self, node_id: str, client_ids: List[str]):
+        # Busca falhou neste nó: volta para a fila até esgotar as tentativas
+        self._update_owned(node_id, client_ids, """
+            UPDATE fila_clientes
+            SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                owner = CASE WHEN attempts >= ? THEN owner END,
+                lease_until = NULL, updated_at = SYSDATETIME()
+            WHERE queue_name = ? AND owner = ? AND client_id = ? AND status = 'leased'
+        """, (self.max_attempts, self.max_attempts))
+
+    def _update_owned(self, node_id: str, client_ids: List[str], sql: str, prefix: tuple = ()):
+        if not client_ids:
+            return
+        with self._transaction() as cursor:
+            cursor.fast_executemany = True
+            cursor.executemany(sql, [prefix + (self.queue_name, node_id, client_id) for client_id in client_ids])
+
+    def counts(self) -> Dict[str, int]:
+        with self._transaction() as cursor:
+            cursor.execute("""
+                SELECT CASE WHEN status = 'leased' AND lease_until < SYSDATETIME() THEN 'expired' ELSE status END,
+                       COUNT(*)
+                FROM fila_clientes WHERE queue_name = ?
+                GROUP BY CASE WHEN status = 'leased' AND lease_until < SYSDATETIME() THEN 'expired' ELSE status END
+            """, self.queue_name)
+            return {row[0]: row[1] for row in cursor.fetchall()}
+
+    def progress(self) -> List[NodeProgress]:
+        with self._transaction() as cursor:
+            cursor.execute("""
+                SELECT owner,
+                       SUM(CASE WHEN status = 'leased' THEN 1 ELSE 0 END),
+                       SUM(CASE WHEN status = 'done' THEN 1 ELSE 0 END),
+                       SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END),
+                       MAX(updated_at)
+                FROM fila_clientes
+                WHERE queue_name = ? AND owner IS NOT NULL
+                GROUP BY owner
+                ORDER BY owner
+            """, self.queue_name)
+            return [NodeProgress(node_id=row[0], leased=row[1], done=row[2], failed=row[3], last_seen=row[4])
+                    for row in cursor.fetchall()]
+
+    def close(self):
+        # O pool pertence ao SQLServerHandler, que o fecha
+        pass
+
+class SQLiteWorkQueue:
+    # Substituto local da fila do SQL Server, com a mesma interface, para testes
+    # com vários processos na mesma máquina
+    def __init__(self, path: Optional[str] = None, queue_name: Optional[str] = None,
+                 lease_seconds: Optional[int] = None, max_attempts: Optional[int] = None):
+        self.path = path or crawler_config.WORK_QUEUE_SQLITE_PATH
+        self.queue_name = queue_name or crawler_config.WORK_QUEUE_NAME
+        self.lease_seconds = lease_seconds or crawler_config.WORK_QUEUE_LEASE_SECONDS
+        self.max_attempts = max_attempts or crawler_config.WORK_QUEUE_MAX_ATTEMPTS
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None,
+                                           timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._create_tables()
+
+    @contextmanager
+    def _transaction(self, begin: str = "BEGIN IMMEDIATE"):
+        # Desfaz a transação em caso de erro para a conexão não ficar presa nela
+        self._connection.execute(begin)
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def _create_tables(self):
+        with self._lock:
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS fila_clientes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    queue_name TEXT NOT NULL,
+                    client_id TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    owner TEXT,
+                    lease_until REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL,
+                    UNIQUE(queue_name, client_id)
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_fila_clientes_claim
+                    ON fila_clientes(queue_name, status, lease_until);
+            """)
+
+    def enqueue(self, client_ids: List[str]) -> int:
+        now = time.time()
+        with self._lock, self._transaction():
+            self._connection.executemany("""
+                INSERT INTO fila_clientes (queue_name, client_id, status, updated_at)
+                VALUES (?, ?, 'pending', ?)
+                ON CONFLICT(queue_name, client_id) DO UPDATE SET
+                    status = 'pending', owner = NULL, lease_until = NULL, attempts = 0,
+                    updated_at = excluded.updated_at
+            """, [(self.queue_name, client_id, now) for client_id in client_ids])
+
+        logger.info(f"{len(client_ids)} clientes enfileirados em '{self.queue_name}'")
+        return len(client_ids)
+
+    def claim(self, node_id: str, batch_size: int) -> List[str]:
+        # BEGIN IMMEDIATE trava o banco para escrita: só um processo reserva por vez
+        now = time.time()
+        with self._lock, self._transaction():
+            self._connection.execute("""
+                UPDATE fila_clientes SET status = 'failed', updated_at = ?
+                WHERE queue_name = ? AND status = 'leased' AND lease_until < ? AND attempts >= ?
+            """, (now, self.queue_name, now, self.max_attempts))
+
+            rows = self._connection.execute("""
+                SELECT id, client_id FROM fila_clientes
+                WHERE queue_name = ?
+                  AND (status = 'pending' OR (status = 'leased' AND lease_until < ?))
+                ORDER BY id LIMIT ?
+            """, (self.queue_name, now, batch_size)).fetchall()
+
+            self._connection.executemany("""
+                UPDATE fila_clientes
+                SET status = 'leased', owner = ?, attempts = attempts + 1, lease_until = ?, updated_at = ?
+                WHERE id = ?
+            """, [(node_id, now + self.lease_seconds, now, row[0]) for row in rows])
+        return [row[1] for row in rows]
+
+    def renew(self, node_id: str, client_ids: List[str]):
+        now = time.time()
+        self._update_owned(node_id, client_ids, """
+            UPDATE fila_clientes SET lease_until = ?, updated_at = ?
+            WHERE queue_name = ? AND owner = ? AND client_id = ? AND status = 'leased'
+        """, (now + self.lease_seconds, now))
+
+    def complete(self, node_id: str, client_ids: List[str]):
+        self._update_owned(node_id, client_ids, """
+            UPDATE fila_clientes SET status = 'done', lease_until = NULL, updated_at = ?
+            WHERE queue_name = ? AND owner = ? AND client_id = ? AND status = 'leased'
+        """, (time.time(),))
+
+    def release(self, node_id: str, client_ids: List[str]):
+        self._update_owned(node_id, client_ids, """
+            UPDATE fila_clientes SET status = 'pending', owner = NULL, lease_until = NULL, updated_at = ?
+            WHERE queue_name = ? AND owner = ? AND client_id = ? AND status = 'leased'
+        """, (time.time(),))
+
+    def fail(self, node_id: str, client_ids: List[str]):
+        self._update_owned(node_id, client_ids, """
+            UPDATE fila_clientes
+            SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                owner = CASE WHEN attempts >= ? THEN owner END,
+                lease_until = NULL, updated_at = ?
+            WHERE queue_name = ? AND owner = ? AND client_id = ? AND status = 'leased'
+        """, (self.max_attempts, self.max_attempts, time.time()))
+
+    def _update_owned(self, node_id: str, client_ids: List[str], sql: str, prefix: tuple):
+        if not client_ids:
+            return
+        with self._lock, self._transaction():
+            self._connection.executemany(sql, [prefix + (self.queue_name, node_id, client_id)
+                                               for client_id in client_ids])
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connection.execute("""
+                SELECT CASE WHEN status = 'leased' AND lease_until < ? THEN 'expired' ELSE status END AS state,
+                       COUNT(*)
+                FROM fila_clientes WHERE queue_name = ?
+                GROUP BY state
+            """, (time.time(), self.queue_name)).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def progress(self) -> List[NodeProgress]:
+        with self._lock:
+            rows = self._connection.execute("""
+                SELECT owner,
+                       SUM(status = 'leased'), SUM(status = 'done'), SUM(status = 'failed'),
+                       MAX(updated_at)
+                FROM fila_clientes
+                WHERE queue_name = ? AND owner IS NOT NULL
+                GROUP BY owner
+                ORDER BY owner
+            """, (self.queue_name,)).fetchall()
+        return [NodeProgress(node_id=row[0], leased=row[1], done=row[2], failed=row[3],
+                             last_seen=datetime.fromtimestamp(row[4]))
+                for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+def create_work_queue(db_handler=None):
+    if crawler_config.WORK_QUEUE_BACKEND == 'sqlite':
+        return SQLiteWorkQueue()
+    return SQLServerWorkQueue(db_handler.pool)
\ No newline at end of file
@@ -1,10 +1,16 @@
+import argparse
 import logging
-import time
+import signal
+import threading
 from datetime import datetime
 
 from crawlers.selenium_crawler import SeleniumCrawler
 from database.db_handler import SQLServerHandler
-from config.settings import crawler_config
+from database.work_queue import create_work_queue
+from pipeline.crawl_run import run_crawl
+from pipeline.distributed import enqueue_clients, work_queue_loop
+from pipeline.run_journal import RunJournal
+from service.daemon import CrawlerDaemon
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,60 +23,81 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-def main():
-    logger.info("Iniciando crawler de clientes e serviços")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Crawler de clientes e serviços")
+    parser.add_argument('--resume', action='store_true',
+                        help="retoma a última execução interrompida a partir do journal")
+    parser.add_argument('--daemon', action='store_true',
+                        help="mantém navegador e banco abertos e executa no intervalo configurado")
+    parser.add_argument('--enqueue', action='store_true',
+                        help="lista e salva os clientes e os coloca na fila distribuída")
+    parser.add_argument('--work', action='store_true',
+                        help="consome a fila distribuída buscando serviços (um processo por nó)")
+    return parser.parse_args()
+
+def run_daemon():
+    daemon = CrawlerDaemon()
     
+    def handle_signal(signum, frame):
+        logger.info("Sinal de parada recebido")
+        daemon.stop()
+    
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+    daemon.run_forever()
+
+def run_distributed(enqueue: bool, work: bool):
     crawler = SeleniumCrawler()
     db_handler = SQLServerHandler()
+    work_queue = create_work_queue(db_handler)
+    stop_event = threading.Event()
+    
+    def handle_signal(signum, frame):
+        logger.info("Sinal de parada recebido; devolvendo reservas à fila")
+        stop_event.set()
+    
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
     
     try:
-        if not crawler.login():
-            logger.error("Falha no login. Encerrando execução.")
-            return
-        
-        logger.info("Buscando clientes...")
-        clients = crawler.search_clients()
-        
-        if not clients:
-            logger.warning("Nenhum cliente encontrado")
-            return
-        
-        all_services = []
-        for i, client in enumerate(clients, 1):
-            logger.info(f"Buscando serviços do cliente {i}/{len(clients)}: {client.name}")
-            
-            services = crawler.get_client_services(client.client_id)
-            all_services.extend(services)
-            
-            if i < len(clients):
-                time.sleep(crawler_config.DELAY_BETWEEN_REQUESTS)
-        
-        logger.info("Salvando dados no SQL Server...")
-        
-        if clients:
-            db_handler.save_clients(clients)
-        
-        if all_services:
-            db_handler.save_services(all_services)
-        
-        logger.info("Executando limpeza de dados antigos...")
-        db_handler.cleanup_old_data()
+        if enqueue:
+            enqueue_clients(crawler, db_handler, work_queue)
+        if work:
+            work_queue_loop(crawler, db_handler, work_queue, stop_event=stop_event)
         
-        total_clients = db_handler.get_client_count()
-        total_services = db_handler.get_service_count()
-        
-        logger.info(f"Extracção concluída com sucesso!")
-        logger.info(f"Clientes no banco: {total_clients}")
-        logger.info(f"Serviços no banco: {total_services}")
-        logger.info(f"Novos clientes extraídos: {len(clients)}")
-        logger.info(f"Novos serviços extraídos: {len(all_services)}")
+    except Exception as e:
+        logger.error(f"Erro durante execução distribuída: {e}")
+    
+    finally:
+        crawler.close()
+        work_queue.close()
+        db_handler.close()
+        logger.info("Crawler finalizado")
+
+def main(resume: bool = False):
+    logger.info("Iniciando crawler de clientes e serviços")
+    
+    crawler = SeleniumCrawler()
+    db_handler = SQLServerHandler()
+    journal = RunJournal()
+    
+    try:
+        run_crawl(crawler, db_handler, journal, resume)
         
     except Exception as e:
         logger.error(f"Erro durante execução do crawler: {e}")
     
     finally:
         crawler.close()
+        db_handler.close()
+        journal.close()
         logger.info("Crawler finalizado")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.daemon:
+        run_daemon()
+    elif args.enqueue or args.work:
+        run_distributed(args.enqueue, args.work)
+    else:
+        main(resume=args.resume)
\ No newline at end of file
@@ -1,25 +1,46 @@
+from array import array
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
-@dataclass
+from utils.date_parser import parse_service_date
+
+@dataclass(slots=True)
 class Client:
     client_id: str
     name: str
     email: Optional[str] = None
     phone: Optional[str] = None
     extraction_date: Optional[datetime] = None
+    service_count: Optional[int] = None
     
-    def to_dict(self) -> dict:
+    def to_dict(self, now: Optional[datetime] = None) -> dict:
         return {
             'client_id': self.client_id,
             'name': self.name,
             'email': self.email,
             'phone': self.phone,
-            'extraction_date': self.extraction_date or datetime.now()
+            'extraction_date': self.extraction_date or now or datetime.now()
         }
 
 @dataclass
+class ClientFingerprint:
+    client_id: str
+    client_hash: str
+    services_hash: Optional[str] = None
+    checked_at: Optional[datetime] = None
+
+@dataclass
+class ChangeLogEntry:
+    version: int
+    seq: int
+    entity: str
+    operation: str
+    client_id: str
+    payload: Dict[str, Any]
+    changed_at: datetime
+
+@dataclass(slots=True)
 class Service:
     client_id: str
     service_date: str
@@ -27,13 +48,143 @@ class Service:
     description: str
     status: str
     extraction_date: Optional[datetime] = None
+    service_date_value: Optional[date] = None
     
-    def to_dict(self) -> dict:
+    def to_dict(self, now: Optional[datetime] = None) -> dict:
         return {
             'client_id': self.client_id,
             'service_date': self.service_date,
             'service_type': self.service_type,
             'description': self.description,
             'status': self.status,
-            'extraction_date': self.extraction_date or datetime.now()
-        }
\ No newline at end of file
+            'extraction_date': self.extraction_date or now or datetime.now()
+        }
+
+class CategoricalColumn:
+    # Coluna codificada por dicionário: cada valor distinto é guardado uma vez
+    # e as linhas guardam só o código (4 bytes) apontando para ele
+    __slots__ = ('categories', 'codes', '_index')
+    
+    def __init__(self):
+        self.categories: List[Optional[str]] = []
+        self.codes = array('I')
+        self._index: Dict[Optional[str], int] = {}
+    
+    def append(self, value: Optional[str]):
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.categories)
+            self.categories.append(value)
+        self.codes.append(code)
+    
+    def __len__(self) -> int:
+        return len(self.codes)
+    
+    def __getitem__(self, position: int) -> Optional[str]:
+        return self.categories[self.codes[position]]
+    
+    def values(self) -> List[Optional[str]]:
+        categories = self.categories
+        return [categories[code] for code in self.codes]
+
+class ServiceBatch:
+    # Lote colunar de serviços: campos repetitivos (cliente, data, tipo, status)
+    # ficam codificados por dicionário e a conversão para parâmetros do banco
+    # ou DataFrame é feita coluna a coluna, sem criar um objeto por linha
+    CATEGORICAL = ('client_id', 'service_date', 'service_type', 'status')
+    COLUMNS = ('client_id', 'service_date', 'service_date_value', 'service_type',
+               'description', 'status', 'extraction_date')
+    
+    __slots__ = ('client_id', 'service_date', 'service_type', 'status', 'description',
+                 'extraction_date', 'service_date_value')
+    
+    def __init__(self):
+        self.client_id = CategoricalColumn()
+        self.service_date = CategoricalColumn()
+        self.service_type = CategoricalColumn()
+        self.status = CategoricalColumn()
+        self.description: List[str] = []
+        self.extraction_date: List[Optional[datetime]] = []
+        self.service_date_value: List[Optional[date]] = []
+    
+    @classmethod
+    def from_services(cls, services: Iterable[Service]) -> 'ServiceBatch':
+        batch = cls()
+        batch.extend(services)
+        return batch
+    
+    def append(self, client_id: str, service_date: str, service_type: str, description: str, status: str,
+               extraction_date: Optional[datetime] = None, service_date_value: Optional[date] = None):
+        self.client_id.append(client_id)
+        self.service_date.append(service_date)
+        self.service_type.append(service_type)
+        self.status.append(status)
+        self.description.append(description)
+        self.extraction_date.append(extraction_date)
+        self.service_date_value.append(service_date_value)
+    
+    def add(self, service: Service):
+        self.append(service.client_id, service.service_date, service.service_type, service.description,
+                    service.status, service.extraction_date, service.service_date_value)
+    
+    def extend(self, services: Union['ServiceBatch', Iterable[Service]]):
+        for service in services:
+            self.add(service)
+    
+    def __len__(self) -> int:
+        return len(self.description)
+    
+    def __iter__(self) -> Iterator[Service]:
+        # Compatibilidade com código que ainda espera objetos Service
+        for position in range(len(self)):
+            yield Service(
+                client_id=self.client_id[position],
+                service_date=self.service_date[position],
+                service_type=self.service_type[position],
+                description=self.description[position],
+                status=self.status[position],
+                extraction_date=self.extraction_date[position],
+                service_date_value=self.service_date_value[position]
+            )
+    
+    def client_ids(self) -> List[str]:
+        return list(self.client_id.categories)
+    
+    def resolve_service_dates(self) -> List[Optional[date]]:
+        # Converte cada data distinta uma vez e preenche só as linhas sem valor
+        parsed = [parse_service_date(value) for value in self.service_date.categories]
+        codes = self.service_date.codes
+        self.service_date_value = [value if value is not None else parsed[code]
+                                   for value, code in zip(self.service_date_value, codes)]
+        return self.service_date_value
+    
+    def column(self, name: str, now: Optional[datetime] = None) -> list:
+        if name in self.CATEGORICAL:
+            return getattr(self, name).values()
+        if name == 'extraction_date':
+            now = now or datetime.now()
+            return [value or now for value in self.extraction_date]
+        if name == 'service_date_value':
+            return self.resolve_service_dates()
+        return getattr(self, name)
+    
+    def to_params(self, columns: Sequence[str] = COLUMNS, now: Optional[datetime] = None) -> List[Tuple]:
+        # Linhas prontas para cursor.executemany na ordem de colunas pedida
+        now = now or datetime.now()
+        return list(zip(*(self.column(name, now) for name in columns)))
+    
+    def to_dataframe(self, now: Optional[datetime] = None):
+        import pandas as pd
+        
+        now = now or datetime.now()
+        data = {}
+        for name in self.COLUMNS:
+            if name in self.CATEGORICAL:
+                column = getattr(self, name)
+                if None in column.categories:
+                    data[name] = pd.Categorical(column.values())
+                else:
+                    data[name] = pd.Categorical.from_codes(column.codes, column.categories)
+            else:
+                data[name] = self.column(name, now)
+        return pd.DataFrame(data, columns=list(self.COLUMNS))
\ No newline at end of file
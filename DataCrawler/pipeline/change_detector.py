@@ -0,0 +1,97 @@
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from config.settings import crawler_config
+from database.db_handler import SQLServerHandler
+from models.data_models import Client, ClientFingerprint, Service
+
+logger = logging.getLogger(__name__)
+
+def _digest(values: Iterable[Optional[str]]) -> str:
+    hasher = hashlib.sha256()
+    for value in values:
+        hasher.update(b'\x00' if value is None else value.encode('utf-8'))
+        hasher.update(b'\x1f')
+    return hasher.hexdigest()
+
+def client_fingerprint(client: Client) -> str:
+    service_count = None if client.service_count is None else str(client.service_count)
+    return _digest([client.client_id, client.name, client.email, client.phone, service_count])
+
+def services_fingerprint(services: List[Service]) -> str:
+    rows = sorted(
+        (service.service_date, service.service_type, service.description or "", service.status or "")
+        for service in services
+    )
+    return _digest(value for row in rows for value in row)
+
+class ChangeDetector:
+    def __init__(self, db_handler: SQLServerHandler, max_age_days: Optional[int] = None):
+        self.db_handler = db_handler
+        self.max_age = timedelta(days=max_age_days if max_age_days is not None
+                                 else crawler_config.INCREMENTAL_MAX_AGE_DAYS)
+        self._known: Dict[str, ClientFingerprint] = {}
+        self._pending: Dict[str, ClientFingerprint] = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        self._known = self.db_handler.get_fingerprints()
+        logger.info(f"{len(self._known)} fingerprints de clientes carregados")
+
+    def client_changed(self, client: Client) -> bool:
+        known = self._known.get(client.client_id)
+        return known is None or known.client_hash != client_fingerprint(client)
+
+    def needs_services_crawl(self, client: Client) -> bool:
+        if self.client_changed(client):
+            return True
+
+        # Sem contagem de serviços na listagem, o único sinal de mudança é o tempo
+        known = self._known[client.client_id]
+        return (known.services_hash is None or known.checked_at is None
+                or datetime.now() - known.checked_at > self.max_age)
+
+    def split(self, clients: List[Client]):
+        to_crawl = []
+        unchanged = []
+        for client in clients:
+            if self.needs_services_crawl(client):
+                to_crawl.append(client)
+            else:
+                unchanged.append(client)
+        return to_crawl, unchanged
+
+    def services_changed(self, client: Client, services: List[Service]) -> bool:
+        fingerprint = ClientFingerprint(
+            client_id=client.client_id,
+            client_hash=client_fingerprint(client),
+            services_hash=services_fingerprint(services),
+            checked_at=datetime.now()
+        )
+        with self._lock:
+            self._pending[client.client_id] = fingerprint
+
+        known = self._known.get(client.client_id)
+        return known is None or known.services_hash != fingerprint.services_hash
+
+    def discard(self, client_ids: Iterable[str]):
+        # Lote não gravado: o fingerprint calculado não pode virar referência
+        with self._lock:
+            for client_id in client_ids:
+                self._pending.pop(client_id, None)
+
+    def confirm(self, client_ids: List[str]) -> bool:
+        # Só registra o fingerprint depois que os dados do cliente foram gravados
+        with self._lock:
+            fingerprints = [self._pending.pop(client_id) for client_id in client_ids
+                            if client_id in self._pending]
+
+        if not self.db_handler.save_fingerprints(fingerprints):
+            return False
+
+        for fingerprint in fingerprints:
+            self._known[fingerprint.client_id] = fingerprint
+        return True
\ No newline at end of file
@@ -0,0 +1,277 @@
+import logging
+import os
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from config.settings import crawler_config
+from crawlers.crawler_pool import CrawlerPool
+from crawlers.http_fetcher import HttpFastPath
+from crawlers.selenium_crawler import SeleniumCrawler, ServiceFetchError
+from database.db_handler import SQLServerHandler
+from pipeline.change_detector import ChangeDetector
+from pipeline.export_writer import ExportWriter
+from pipeline.run_journal import RunJournal
+from pipeline.streaming_writer import StreamingWriter
+from utils.metrics import SamplingProfiler, metrics
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CrawlSummary:
+    run_id: Optional[int] = None
+    clients: int = 0
+    services_received: int = 0
+    services_written: int = 0
+    services_failed: int = 0
+    pending_clients: int = 0
+    failed_clients: int = 0
+    listing_complete: bool = True
+    completed: bool = False
+
+def fetch_client_services(crawler: SeleniumCrawler, client_id: str) -> Optional[List]:
+    # Falha de navegação não vira "0 serviços": tenta de novo com o navegador reiniciado
+    # e devolve None se o cliente continuar falhando, para ele ficar pendente
+    for attempt in range(1, crawler_config.MAX_RETRIES + 1):
+        try:
+            return crawler.get_client_services(client_id)
+        except ServiceFetchError as e:
+            logger.error(f"Falha no cliente {client_id} (tentativa {attempt}): {e}")
+        
+        if attempt < crawler_config.MAX_RETRIES:
+            try:
+                crawler.restart()
+            except Exception as e:
+                logger.error(f"Erro ao reiniciar navegador: {e}")
+                return None
+    return None
+
+def check_browser(crawler, maintenance, handled: int):
+    # Chamado após cada cliente; a cada BROWSER_CHECK_INTERVAL repassa o navegador
+    # ao callback (o daemon o recicla se passou dos limites de páginas ou memória)
+    if maintenance and handled % max(1, crawler_config.BROWSER_CHECK_INTERVAL) == 0:
+        maintenance(crawler)
+
+def crawl_services_http(crawler, fast_path, clients, handle_services, maintenance=None) -> List[str]:
+    client_ids = [client.client_id for client in clients]
+    fallbacks = 0
+    fetched = 0
+    failed = []
+    
+    for chunk, results in fast_path.iter_services(client_ids, crawler_config.HTTP_CHUNK_SIZE):
+        logger.info(f"Serviços via HTTP recebidos dos clientes {fetched + 1}-{fetched + len(chunk)}/{len(client_ids)}")
+        fetched += len(chunk)
+        
+        for client_id in chunk:
+            services = results.get(client_id)
+            if services is None:
+                # Página sem linhas no HTML: confirma pelo navegador
+                fallbacks += 1
+                renewals = crawler.session_renewals
+                services = fetch_client_services(crawler, client_id)
+                check_browser(crawler, maintenance, fallbacks)
+                if crawler.session_renewals != renewals and crawler.logged_in:
+                    fast_path.update_cookies(crawler.driver.get_cookies())
+                if services is None:
+                    failed.append(client_id)
+                    continue
+            handle_services(client_id, services)
+    
+    logger.info(f"Caminho HTTP concluído: {fallbacks} páginas precisaram do navegador")
+    return failed
+
+def crawl_services(crawler, clients, handle_services, fast_path=None, maintenance=None) -> List[str]:
+    # Devolve os clientes cuja busca falhou; eles não são repassados a handle_services
+    if fast_path:
+        return crawl_services_http(crawler, fast_path, clients, handle_services, maintenance)
+    
+    if crawler_config.MAX_WORKERS > 1:
+        logger.info(f"Buscando serviços com {crawler_config.MAX_WORKERS} sessões paralelas...")
+        pool = CrawlerPool(crawler_config.MAX_WORKERS)
+        pool_result = pool.crawl_services([client.client_id for client in clients],
+                                          on_services=handle_services, maintenance=maintenance)
+        
+        if pool_result.failed_clients:
+            logger.warning(f"Clientes com falha na busca de serviços: {len(pool_result.failed_clients)}")
+        return pool_result.failed_clients
+    
+    failed = []
+    for i, client in enumerate(clients, 1):
+        logger.info(f"Buscando serviços do cliente {i}/{len(clients)}: {client.name}")
+        
+        services = fetch_client_services(crawler, client.client_id)
+        check_browser(crawler, maintenance, i)
+        if services is None:
+            failed.append(client.client_id)
+            continue
+        handle_services(client.client_id, services)
+    
+    if failed:
+        logger.warning(f"Clientes com falha na busca de serviços: {len(failed)}")
+    return failed
+
+def run_crawl(crawler: SeleniumCrawler, db_handler: SQLServerHandler, journal: RunJournal,
+              resume: bool = False, maintenance=None) -> CrawlSummary:
+    # Uma execução completa sobre recursos já abertos; usada pelo main e pelo daemon.
+    # Métricas são zeradas por execução e gravadas em relatório ao final, mesmo em falha.
+    metrics.reset()
+    profiler = SamplingProfiler() if crawler_config.PROFILER_ENABLED else None
+    if profiler:
+        profiler.start()
+    
+    summary = CrawlSummary()
+    try:
+        with metrics.timer('run'):
+            _run_crawl(crawler, db_handler, journal, resume, summary, maintenance)
+    finally:
+        profile = None
+        if profiler:
+            profiler.stop()
+            os.makedirs(crawler_config.METRICS_REPORT_DIR, exist_ok=True)
+            profile_path = os.path.join(crawler_config.METRICS_REPORT_DIR, 'profile.collapsed')
+            profiler.write_collapsed(profile_path)
+            profile = {'samples': profiler.samples, 'collapsed_stacks': profile_path, 'top': profiler.top()}
+        metrics.write_reports(asdict(summary), profile=profile)
+    
+    return summary
+
+def _run_crawl(crawler: SeleniumCrawler, db_handler: SQLServerHandler, journal: RunJournal,
+               resume: bool, summary: CrawlSummary, maintenance=None):
+    if not crawler.logged_in and not crawler.ensure_session():
+        logger.error("Falha no login. Encerrando execução.")
+        return
+    
+    crawler.measure_lean_baseline()
+    fast_path = HttpFastPath.from_driver(crawler.driver) if crawler_config.HTTP_FAST_PATH else None
+    
+    run_id = journal.latest_unfinished_run() if resume else None
+    
+    if run_id is not None:
+        clients = journal.load_clients(run_id)
+        listing_complete = journal.listing_complete(run_id)
+        logger.info(f"Retomando execução {run_id} com {len(clients)} clientes")
+    else:
+        if resume:
+            logger.info("Nenhuma execução interrompida encontrada; iniciando nova execução")
+        
+        logger.info("Buscando clientes...")
+        clients = fast_path.fetch_clients() if fast_path else None
+        listing_complete = bool(clients)
+        if not clients:
+            clients = list(crawler.iter_clients(crawler_config.CLIENT_SEARCH_TERMS))
+            listing_complete = crawler.listing_complete
+            logger.info(f"Encontrados {len(clients)} clientes")
+        
+        if not clients:
+            logger.warning("Nenhum cliente encontrado")
+            return
+        
+        run_id = journal.start_run(clients, listing_complete)
+        
+        # Só uma listagem completa (sem termos de busca) revela clientes excluídos
+        if not listing_complete:
+            logger.warning("Listagem de clientes parcial; exclusões não serão registradas")
+        elif not crawler_config.CLIENT_SEARCH_TERMS:
+            db_handler.record_client_deletions([client.client_id for client in clients])
+    
+    summary.run_id = run_id
+    summary.clients = len(clients)
+    summary.listing_complete = listing_complete
+    
+    detector = None
+    clients_to_save = clients
+    clients_to_crawl = clients
+    
+    if crawler_config.INCREMENTAL_MODE:
+        detector = ChangeDetector(db_handler)
+        detector.load()
+        clients_to_save = [client for client in clients if detector.client_changed(client)]
+        clients_to_crawl, unchanged = detector.split(clients)
+        logger.info(f"Modo incremental: {len(clients_to_crawl)} clientes a verificar, "
+                    f"{len(unchanged)} sem alterações")
+    
+    # Clientes cujo registro não foi gravado: o fingerprint deles inclui o hash do
+    # cliente, então não pode ser confirmado (senão o registro nunca seria regravado)
+    unsaved_ids = set()
+    
+    # Exporta o que for gravado nesta execução (ou retomada) em arquivos próprios
+    with ExportWriter(tag=f"run_{run_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}") as exporter:
+        if journal.clients_saved(run_id):
+            logger.info("Clientes desta execução já foram salvos")
+        elif clients_to_save:
+            logger.info("Salvando clientes no SQL Server...")
+            if db_handler.save_clients(clients_to_save):
+                journal.mark_clients_saved(run_id)
+                exporter.write_clients(clients_to_save)
+            else:
+                logger.error("Falha ao salvar clientes; fingerprints deles não serão atualizados")
+                unsaved_ids = {client.client_id for client in clients_to_save}
+        else:
+            journal.mark_clients_saved(run_id)
+        
+        done_ids = journal.done_client_ids(run_id)
+        if done_ids:
+            clients_to_crawl = [client for client in clients_to_crawl if client.client_id not in done_ids]
+            logger.info(f"{len(done_ids)} clientes já concluídos; restam {len(clients_to_crawl)}")
+        
+        clients_by_id = {client.client_id: client for client in clients_to_crawl}
+        
+        def on_flush(client_ids, services, saved):
+            if not saved:
+                if detector:
+                    detector.discard(client_ids)
+                return
+            if detector:
+                detector.confirm([client_id for client_id in client_ids if client_id not in unsaved_ids])
+                detector.discard(unsaved_ids.intersection(client_ids))
+            journal.record_batch(run_id, client_ids, len(services))
+        
+        # Serviços são gravados em lotes enquanto o crawl continua
+        with StreamingWriter(db_handler, on_flush=on_flush, sinks=[exporter]) as writer:
+            def handle_services(client_id, services):
+                if detector and not detector.services_changed(clients_by_id[client_id], services):
+                    services = []
+                writer.put(client_id, services)
+            
+            failed = crawl_services(crawler, clients_to_crawl, handle_services, fast_path, maintenance)
+    
+    summary.failed_clients = len(failed)
+    
+    writer_stats = writer.stats
+    if writer_stats.rows_failed:
+        logger.warning(f"Serviços não gravados por falha no banco: {writer_stats.rows_failed}")
+    
+    summary.services_received = writer_stats.rows_received
+    summary.services_written = writer_stats.rows_written
+    summary.services_failed = writer_stats.rows_failed
+    
+    done_ids = journal.done_client_ids(run_id)
+    pending = [client for client in clients_to_crawl if client.client_id not in done_ids]
+    summary.pending_clients = len(pending)
+    if pending:
+        logger.warning(f"{len(pending)} clientes pendentes; execute com --resume para concluir")
+    elif not listing_complete:
+        # Encerrada para não ser retomada; a próxima execução lista os clientes de novo
+        journal.finish_run(run_id, status='partial')
+    else:
+        journal.finish_run(run_id)
+        summary.completed = True
+    
+    # Só os clientes gravados nesta execução (inclusive em tentativas anteriores dela)
+    db_handler.refresh_return_dates(list(done_ids | {client.client_id for client in clients_to_save}))
+    
+    if crawler_config.RETENTION_BACKGROUND:
+        logger.info("Limpeza de dados antigos iniciada em segundo plano")
+        db_handler.cleanup_old_data_in_background()
+    else:
+        logger.info("Executando limpeza de dados antigos...")
+        db_handler.cleanup_old_data()
+    
+    total_clients = db_handler.get_client_count()
+    total_services = db_handler.get_service_count()
+    
+    logger.info(f"Extracção concluída com sucesso!")
+    logger.info(f"Clientes no banco: {total_clients}")
+    logger.info(f"Serviços no banco: {total_services}")
+    logger.info(f"Novos clientes extraídos: {len(clients)}")
+    logger.info(f"Novos serviços extraídos: {writer_stats.rows_received}")
\ No newline at end of file
@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from config.settings import crawler_config
+from crawlers.http_fetcher import HttpFastPath
+from crawlers.selenium_crawler import SeleniumCrawler
+from database.db_handler import SQLServerHandler
+from pipeline.crawl_run import fetch_client_services
+from pipeline.export_writer import ExportWriter
+from pipeline.streaming_writer import StreamingWriter
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class WorkSummary:
+    node_id: str
+    batches: int = 0
+    clients: int = 0
+    services_written: int = 0
+    services_failed: int = 0
+    failed_clients: int = 0
+
+def enqueue_clients(crawler: SeleniumCrawler, db_handler: SQLServerHandler, work_queue) -> int:
+    # Lista e salva os clientes uma vez; os nós só buscam os serviços
+    if not crawler.logged_in and not crawler.ensure_session():
+        logger.error("Falha no login. Nada enfileirado.")
+        return 0
+
+    logger.info("Buscando clientes para enfileirar...")
+    clients = None
+    if crawler_config.HTTP_FAST_PATH:
+        clients = HttpFastPath.from_driver(crawler.driver).fetch_clients()
+    listing_complete = bool(clients)
+    if not clients:
+        clients = list(crawler.iter_clients(crawler_config.CLIENT_SEARCH_TERMS))
+        listing_complete = crawler.listing_complete
+
+    if not clients:
+        logger.warning("Nenhum cliente encontrado")
+        return 0
+
+    if not db_handler.save_clients(clients):
+        logger.error("Falha ao salvar clientes; fila não atualizada")
+        return 0
+
+    # Só uma listagem completa (sem termos de busca) revela clientes excluídos
+    if not listing_complete:
+        logger.warning("Listagem de clientes parcial; exclusões não serão registradas")
+    elif not crawler_config.CLIENT_SEARCH_TERMS:
+        db_handler.record_client_deletions([client.client_id for client in clients])
+
+    with ExportWriter(tag=f"enqueue_{datetime.now().strftime('%Y%m%d_%H%M%S')}") as exporter:
+        exporter.write_clients(clients)
+
+    return work_queue.enqueue([client.client_id for client in clients])
+
+def work_queue_loop(crawler: SeleniumCrawler, db_handler: SQLServerHandler, work_queue,
+                    node_id: Optional[str] = None, stop_event: Optional[threading.Event] = None) -> WorkSummary:
+    node_id = node_id or crawler_config.NODE_ID
+    stop_event = stop_event or threading.Event()
+    summary = WorkSummary(node_id=node_id)
+    metrics.reset()
+
+    if not crawler.logged_in and not crawler.ensure_session():
+        logger.error("Falha no login. Nó encerrado.")
+        return summary
+
+    written_ids = set()
+    # Reservados e ainda não gravados, inclusive os que esperam no buffer do writer
+    # depois que o lote deles terminou: todos precisam ter o prazo renovado
+    leased = set()
+    leased_lock = threading.Lock()
+
+    def on_flush(client_ids, services, saved):
+        # Só marca como concluído o que chegou ao banco; o resto volta para a fila
+        if saved:
+            work_queue.complete(node_id, client_ids)
+            written_ids.update(client_ids)
+        else:
+            work_queue.release(node_id, client_ids)
+        with leased_lock:
+            leased.difference_update(client_ids)
+
+    def unflushed() -> List[str]:
+        with leased_lock:
+            return list(leased)
+
+    last_renewal = time.monotonic()
+
+    def renew_if_due():
+        nonlocal last_renewal
+        if time.monotonic() - last_renewal > crawler_config.WORK_QUEUE_LEASE_SECONDS / 3:
+            work_queue.renew(node_id, unflushed())
+            last_renewal = time.monotonic()
+
+    logger.info(f"Nó {node_id} consumindo a fila '{work_queue.queue_name}'")
+
+    try:
+        # Cada nó exporta os serviços que gravou em arquivos próprios
+        with ExportWriter(tag=f"{node_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}") as exporter, \
+                StreamingWriter(db_handler, on_flush=on_flush, sinks=[exporter]) as writer:
+            while not stop_event.is_set():
+                batch = work_queue.claim(node_id, crawler_config.WORK_QUEUE_BATCH_SIZE)
+                with leased_lock:
+                    leased.update(batch)
+                if not batch:
+                    counts = work_queue.counts()
+                    if not counts.get('leased'):
+                        break
+                    # Outros nós (ou o buffer deste) ainda têm reservas ativas; se algum nó
+                    # morrer, o prazo vence e assumimos
+                    logger.info(f"Fila sem itens livres, {counts['leased']} reservados")
+                    stop_event.wait(min(crawler_config.WORK_QUEUE_POLL_SECONDS,
+                                        crawler_config.WORK_QUEUE_LEASE_SECONDS / 3))
+                    renew_if_due()
+                    continue
+
+                summary.batches += 1
+                for client_id in batch:
+                    if stop_event.is_set():
+                        break
+                    renew_if_due()
+                    services = fetch_client_services(crawler, client_id)
+                    if services is None:
+                        # Não conta como concluído: volta para a fila ou fica como falha
+                        work_queue.fail(node_id, [client_id])
+                        with leased_lock:
+                            leased.discard(client_id)
+                        summary.failed_clients += 1
+                        continue
+                    writer.put(client_id, services)
+                    summary.clients += 1
+
+                log_progress(work_queue, node_id)
+
+        summary.services_written = writer.stats.rows_written
+        summary.services_failed = writer.stats.rows_failed
+        db_handler.refresh_return_dates(list(written_ids))
+    finally:
+        # Clientes reservados que não chegaram ao banco voltam para a fila sem esperar o prazo
+        work_queue.release(node_id, unflushed())
+        # Relatório gravado mesmo se o nó cair no meio, como em run_crawl
+        metrics.write_reports(asdict(summary))
+
+    logger.info(f"Nó {node_id} finalizado: {summary.clients} clientes em {summary.batches} lotes, "
+                f"{summary.services_written} serviços gravados")
+    return summary
+
+def log_progress(work_queue, node_id: str):
+    counts = work_queue.counts()
+    for progress in work_queue.progress():
+        marker = " (este nó)" if progress.node_id == node_id else ""
+        logger.info(f"Nó {progress.node_id}{marker}: {progress.done} concluídos, {progress.leased} reservados, "
+                    f"{progress.failed} com falha")
+    logger.info(f"Fila: {counts.get('pending', 0)} pendentes, {counts.get('leased', 0)} reservados, "
+                f"{counts.get('expired', 0)} com prazo vencido, {counts.get('done', 0)} concluídos, "
+                f"{counts.get('failed', 0)} com falha")
\ No newline at end of file
@@ -0,0 +1,291 @@
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Dict, List, Optional, Union
+
+from config.settings import crawler_config
+from models.data_models import CategoricalColumn, Client, Service, ServiceBatch
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Exportação dos registros de cada execução para arquivos de análise, gravados em
+# lotes conforme o crawl avança: a memória usada depende do tamanho do lote, não do total.
+# pyarrow e openpyxl só são importados quando o formato correspondente é usado.
+
+CLIENT_COLUMNS = ('client_id', 'name', 'email', 'phone', 'service_count', 'extraction_date')
+SERVICE_COLUMNS = ('client_id', 'service_date', 'service_date_value', 'service_type',
+                   'description', 'status', 'extraction_date')
+
+# Limite de linhas de uma planilha do Excel; acima disso a aba continua em outra
+XLSX_MAX_ROWS = 1048576
+
+@dataclass
+class ExportSummary:
+    clients: int = 0
+    services: int = 0
+    files: List[str] = field(default_factory=list)
+    failed_formats: List[str] = field(default_factory=list)
+
+def _parquet_schemas():
+    import pyarrow as pa
+
+    category = pa.dictionary(pa.int32(), pa.string())
+    client_schema = pa.schema([
+        ('client_id', pa.string()),
+        ('name', pa.string()),
+        ('email', pa.string()),
+        ('phone', pa.string()),
+        ('service_count', pa.int32()),
+        ('extraction_date', pa.timestamp('us'))
+    ])
+    service_schema = pa.schema([
+        ('client_id', category),
+        ('service_date', category),
+        ('service_date_value', pa.date32()),
+        ('service_type', category),
+        ('description', pa.string()),
+        ('status', category),
+        ('extraction_date', pa.timestamp('us'))
+    ])
+    return client_schema, service_schema
+
+def _category_array(column: CategoricalColumn):
+    import pyarrow as pa
+
+    # Reaproveita a codificação do ServiceBatch sem decodificar linha a linha
+    codes = pa.Array.from_buffers(pa.uint32(), len(column.codes), [None, pa.py_buffer(column.codes)])
+    indices = codes.cast(pa.int32())
+    return pa.DictionaryArray.from_arrays(indices, pa.array(column.categories, type=pa.string()))
+
+class ParquetSink:
+    # Um arquivo por tabela e data de extração, no layout particionado
+    # <tabela>/extraction_day=AAAA-MM-DD/<tag>.parquet; cada lote vira um row group
+    def __init__(self, directory: str, tag: str, compression: str):
+        import pyarrow as pa
+
+        self.directory = directory
+        self.tag = tag
+        self.compression = compression
+        self.files: List[str] = []
+        # Erros que desativam o formato sem interromper o crawl
+        self.errors = (OSError, ValueError, pa.ArrowException)
+        self._client_schema, self._service_schema = _parquet_schemas()
+        self._writers: Dict[tuple, object] = {}
+
+    def _writer(self, table: str, schema, partition: date):
+        import pyarrow.parquet as pq
+
+        key = (table, partition)
+        writer = self._writers.get(key)
+        if writer is None:
+            partition_dir = os.path.join(self.directory, table, f"extraction_day={partition.isoformat()}")
+            os.makedirs(partition_dir, exist_ok=True)
+            path = os.path.join(partition_dir, f"{self.tag}.parquet")
+            # Grava em .tmp e renomeia no fechamento para leitores nunca verem arquivo pela metade
+            writer = self._writers[key] = pq.ParquetWriter(f"{path}.tmp", schema, compression=self.compression)
+            self.files.append(path)
+        return writer
+
+    def _write(self, table_name: str, table, extraction_dates: List[datetime]):
+        import pyarrow as pa
+
+        partitions: Dict[date, List[int]] = {}
+        for position, extraction_date in enumerate(extraction_dates):
+            partitions.setdefault(extraction_date.date(), []).append(position)
+
+        for partition, positions in partitions.items():
+            rows = table if len(partitions) == 1 else table.take(pa.array(positions))
+            self._writer(table_name, table.schema, partition).write_table(rows)
+
+    def write_clients(self, clients: List[Client], now: datetime):
+        import pyarrow as pa
+
+        extraction_dates = [client.extraction_date or now for client in clients]
+        table = pa.table({
+            'client_id': [client.client_id for client in clients],
+            'name': [client.name for client in clients],
+            'email': [client.email for client in clients],
+            'phone': [client.phone for client in clients],
+            'service_count': [client.service_count for client in clients],
+            'extraction_date': extraction_dates
+        }, schema=self._client_schema)
+        self._write('clientes', table, extraction_dates)
+
+    def write_services(self, batch: ServiceBatch, now: datetime):
+        import pyarrow as pa
+
+        extraction_dates = batch.column('extraction_date', now)
+        table = pa.table({
+            'client_id': _category_array(batch.client_id),
+            'service_date': _category_array(batch.service_date),
+            'service_date_value': batch.column('service_date_value'),
+            'service_type': _category_array(batch.service_type),
+            'description': batch.description,
+            'status': _category_array(batch.status),
+            'extraction_date': extraction_dates
+        }, schema=self._service_schema)
+        self._write('servicos', table, extraction_dates)
+
+    def close(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+        for path in self.files:
+            os.replace(f"{path}.tmp", path)
+
+    def discard(self):
+        # Formato desativado: fecha os arquivos abertos e apaga os .tmp incompletos
+        for writer in self._writers.values():
+            try:
+                writer.close()
+            except self.errors as e:
+                logger.warning(f"Erro ao fechar arquivo Parquet descartado: {e}")
+        self._writers.clear()
+        for path in self.files:
+            _remove_tmp(path)
+        self.files = []
+
+class XlsxSink:
+    # Workbook em modo write-only: as linhas vão para disco ao serem adicionadas
+    errors = (OSError, ValueError)
+
+    def __init__(self, directory: str, tag: str):
+        from openpyxl import Workbook
+
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{tag}.xlsx")
+        self.files = [self.path]
+        self._workbook = Workbook(write_only=True)
+        self._sheets: Dict[str, list] = {}
+
+    def _append(self, title: str, columns: tuple, rows):
+        state = self._sheets.get(title)
+        for row in rows:
+            if state is None or state[1] >= XLSX_MAX_ROWS:
+                part = 1 if state is None else state[2] + 1
+                sheet = self._workbook.create_sheet(title if part == 1 else f"{title} {part}")
+                sheet.append(columns)
+                state = self._sheets[title] = [sheet, 1, part]
+            state[0].append(row)
+            state[1] += 1
+
+    def write_clients(self, clients: List[Client], now: datetime):
+        self._append('Clientes', CLIENT_COLUMNS,
+                     ((client.client_id, client.name, client.email, client.phone, client.service_count,
+                       client.extraction_date or now) for client in clients))
+
+    def write_services(self, batch: ServiceBatch, now: datetime):
+        self._append('Serviços', SERVICE_COLUMNS, batch.to_params(SERVICE_COLUMNS, now))
+
+    def close(self):
+        if not self._sheets:
+            self._workbook.create_sheet('Clientes').append(CLIENT_COLUMNS)
+        self._workbook.save(f"{self.path}.tmp")
+        os.replace(f"{self.path}.tmp", self.path)
+
+    def discard(self):
+        # Modo write-only guarda cada aba em um arquivo temporário até o save; sem o
+        # cleanup eles só seriam apagados no fim do processo
+        for sheet in self._workbook.worksheets:
+            try:
+                if not sheet.closed:
+                    sheet.close()
+                sheet._writer.cleanup()
+            except self.errors as e:
+                logger.warning(f"Erro ao descartar aba {sheet.title}: {e}")
+        _remove_tmp(self.path)
+        self.files = []
+
+def _remove_tmp(path: str):
+    try:
+        os.remove(f"{path}.tmp")
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Não foi possível remover {path}.tmp: {e}")
+
+class ExportWriter:
+    # Sink do StreamingWriter: recebe os mesmos lotes gravados no banco. Sem formatos
+    # configurados (EXPORT_FORMATS vazio) não faz nada. Falha em um formato é registrada
+    # e desativa só aquele formato; o crawl continua.
+    def __init__(self, formats: Optional[List[str]] = None, directory: Optional[str] = None,
+                 tag: Optional[str] = None, compression: Optional[str] = None):
+        formats = formats if formats is not None else crawler_config.EXPORT_FORMATS
+        directory = directory or crawler_config.EXPORT_DIR
+        tag = tag or f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.summary = ExportSummary()
+        self._lock = threading.Lock()
+        self._sinks: Dict[str, Union[ParquetSink, XlsxSink]] = {}
+
+        for export_format in formats:
+            try:
+                if export_format == 'parquet':
+                    self._sinks[export_format] = ParquetSink(
+                        directory, tag, compression or crawler_config.EXPORT_PARQUET_COMPRESSION)
+                elif export_format == 'xlsx':
+                    self._sinks[export_format] = XlsxSink(directory, tag)
+                else:
+                    logger.warning(f"Formato de exportação desconhecido: {export_format}")
+            except ImportError as e:
+                logger.error(f"Dependência da exportação {export_format} não instalada: {e}")
+                self.summary.failed_formats.append(export_format)
+            except OSError as e:
+                logger.error(f"Erro ao preparar exportação {export_format}: {e}")
+                self.summary.failed_formats.append(export_format)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _dispatch(self, method: str, records, table: str):
+        now = datetime.now()
+        with self._lock:
+            for export_format, sink in list(self._sinks.items()):
+                try:
+                    with metrics.timer('export', format=export_format, table=table):
+                        getattr(sink, method)(records, now)
+                    metrics.inc('rows_exported_total', len(records), format=export_format, table=table)
+                except sink.errors as e:
+                    logger.error(f"Erro na exportação {export_format} de {table}: {e}; formato desativado")
+                    self._sinks.pop(export_format).discard()
+                    self.summary.failed_formats.append(export_format)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._sinks)
+
+    def write_clients(self, clients: List[Client]):
+        if self._sinks and clients:
+            self._dispatch('write_clients', clients, 'clientes')
+            self.summary.clients += len(clients)
+
+    def write_services(self, services: Union[List[Service], ServiceBatch]):
+        if not self._sinks:
+            return
+        if not isinstance(services, ServiceBatch):
+            services = ServiceBatch.from_services(services)
+        if services:
+            self._dispatch('write_services', services, 'servicos')
+            self.summary.services += len(services)
+
+    def close(self) -> ExportSummary:
+        with self._lock:
+            for export_format, sink in self._sinks.items():
+                try:
+                    sink.close()
+                    self.summary.files.extend(sink.files)
+                except sink.errors as e:
+                    logger.error(f"Erro ao finalizar exportação {export_format}: {e}")
+                    sink.discard()
+                    self.summary.failed_formats.append(export_format)
+            self._sinks.clear()
+
+        if self.summary.files:
+            logger.info(f"Exportação concluída: {self.summary.clients} clientes e {self.summary.services} "
+                        f"serviços em {len(self.summary.files)} arquivos")
+        return self.summary
\ No newline at end of file
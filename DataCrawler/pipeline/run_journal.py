@@ -0,0 +1,172 @@
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Optional, Set
+
+from config.settings import crawler_config
+from models.data_models import Client
+
+logger = logging.getLogger(__name__)
+
+class RunJournal:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or crawler_config.JOURNAL_PATH
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._create_tables()
+
+    @contextmanager
+    def _transaction(self, begin: str = "BEGIN"):
+        # Conexão em autocommit (isolation_level=None): transação aberta à mão precisa
+        # de ROLLBACK em caso de erro, senão a conexão segue com a transação pendurada
+        self._connection.execute(begin)
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def _create_tables(self):
+        with self._lock:
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    started_at TEXT NOT NULL,
+                    finished_at TEXT,
+                    status TEXT NOT NULL,
+                    clients_saved INTEGER NOT NULL DEFAULT 0,
+                    listing_complete INTEGER NOT NULL DEFAULT 1
+                );
+
+                CREATE TABLE IF NOT EXISTS run_clients (
+                    run_id INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    client_id TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    email TEXT,
+                    phone TEXT,
+                    service_count INTEGER,
+                    extraction_date TEXT,
+                    done INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (run_id, client_id)
+                );
+
+                CREATE TABLE IF NOT EXISTS run_batches (
+                    batch_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_id INTEGER NOT NULL,
+                    client_count INTEGER NOT NULL,
+                    service_count INTEGER NOT NULL,
+                    persisted_at TEXT NOT NULL
+                );
+            """)
+            # Journals criados antes da coluna: execuções antigas contam como listagem completa
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(runs)")}
+            if 'listing_complete' not in columns:
+                self._connection.execute(
+                    "ALTER TABLE runs ADD COLUMN listing_complete INTEGER NOT NULL DEFAULT 1"
+                )
+
+    def start_run(self, clients: List[Client], listing_complete: bool = True) -> int:
+        now = datetime.now().isoformat()
+        rows = [
+            (position, client.client_id, client.name, client.email, client.phone, client.service_count,
+             client.extraction_date.isoformat() if client.extraction_date else None)
+            for position, client in enumerate(clients)
+        ]
+
+        with self._lock, self._transaction():
+            self._connection.execute(
+                "UPDATE runs SET status = 'abandoned' WHERE status = 'running'"
+            )
+            cursor = self._connection.execute(
+                "INSERT INTO runs (started_at, status, listing_complete) VALUES (?, 'running', ?)",
+                (now, int(listing_complete))
+            )
+            run_id = cursor.lastrowid
+            self._connection.executemany("""
+                INSERT OR IGNORE INTO run_clients
+                    (run_id, position, client_id, name, email, phone, service_count, extraction_date)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(run_id,) + row for row in rows])
+
+        logger.info(f"Execução {run_id} registrada no journal com {len(clients)} clientes")
+        return run_id
+
+    def latest_unfinished_run(self) -> Optional[int]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT run_id FROM runs WHERE status = 'running' ORDER BY run_id DESC LIMIT 1"
+            ).fetchone()
+        return row[0] if row else None
+
+    def load_clients(self, run_id: int) -> List[Client]:
+        with self._lock:
+            rows = self._connection.execute("""
+                SELECT client_id, name, email, phone, service_count, extraction_date
+                FROM run_clients WHERE run_id = ? ORDER BY position
+            """, (run_id,)).fetchall()
+
+        return [
+            Client(
+                client_id=row[0],
+                name=row[1],
+                email=row[2],
+                phone=row[3],
+                service_count=row[4],
+                extraction_date=datetime.fromisoformat(row[5]) if row[5] else None
+            )
+            for row in rows
+        ]
+
+    def done_client_ids(self, run_id: int) -> Set[str]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT client_id FROM run_clients WHERE run_id = ? AND done = 1", (run_id,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def clients_saved(self, run_id: int) -> bool:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT clients_saved FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def listing_complete(self, run_id: int) -> bool:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT listing_complete FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def mark_clients_saved(self, run_id: int):
+        with self._lock:
+            self._connection.execute("UPDATE runs SET clients_saved = 1 WHERE run_id = ?", (run_id,))
+
+    def record_batch(self, run_id: int, client_ids: List[str], service_count: int):
+        # Lote e clientes concluídos são registrados na mesma transação
+        with self._lock, self._transaction():
+            self._connection.execute("""
+                INSERT INTO run_batches (run_id, client_count, service_count, persisted_at)
+                VALUES (?, ?, ?, ?)
+            """, (run_id, len(client_ids), service_count, datetime.now().isoformat()))
+            self._connection.executemany(
+                "UPDATE run_clients SET done = 1 WHERE run_id = ? AND client_id = ?",
+                [(run_id, client_id) for client_id in client_ids]
+            )
+
+    def finish_run(self, run_id: int, status: str = 'completed'):
+        with self._lock:
+            self._connection.execute(
+                "UPDATE runs SET status = ?, finished_at = ? WHERE run_id = ?",
+                (status, datetime.now().isoformat(), run_id)
+            )
+        logger.info(f"Execução {run_id} finalizada no journal ({status})")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
\ No newline at end of file
@@ -0,0 +1,132 @@
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Union
+
+from config.settings import crawler_config
+from database.db_handler import SQLServerHandler
+from models.data_models import Service, ServiceBatch
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+@dataclass
+class WriterStats:
+    clients_received: int = 0
+    rows_received: int = 0
+    rows_written: int = 0
+    rows_failed: int = 0
+    batches_written: int = 0
+    batches_failed: int = 0
+
+class StreamingWriter:
+    def __init__(self, db_handler: SQLServerHandler, batch_size: Optional[int] = None,
+                 queue_size: Optional[int] = None, flush_seconds: Optional[float] = None,
+                 on_flush: Optional[Callable[[List[str], ServiceBatch, bool], None]] = None,
+                 sinks: Optional[List] = None):
+        self.db_handler = db_handler
+        self.batch_size = max(1, batch_size or crawler_config.PIPELINE_BATCH_SIZE)
+        self.flush_seconds = (flush_seconds if flush_seconds is not None
+                              else crawler_config.PIPELINE_FLUSH_SECONDS)
+        self.on_flush = on_flush
+        # Destinos extras (ex.: ExportWriter) que recebem os lotes gravados com sucesso
+        self.sinks = [sink for sink in (sinks or []) if sink is not None]
+        self.stats = WriterStats()
+
+        # Fila limitada: quando o banco fica para trás, o crawler espera
+        self._queue = queue.Queue(maxsize=max(1, queue_size or crawler_config.PIPELINE_QUEUE_SIZE))
+        self._thread = threading.Thread(target=self._run, name="streaming-writer", daemon=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start(self):
+        self._thread.start()
+
+    def put(self, client_id: str, services: Union[List[Service], ServiceBatch]):
+        if not self._thread.is_alive():
+            raise RuntimeError("Writer de streaming não está em execução")
+        self._queue.put((client_id, services))
+
+    def close(self) -> WriterStats:
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        return self.stats
+
+    def _run(self):
+        # Serviços acumulados em formato colunar; os objetos Service são liberados ao entrar no lote
+        client_ids = []
+        pending = ServiceBatch()
+
+        # flush_seconds <= 0 grava cada cliente ao chegar; get() sem timeout evita laço ocioso
+        flush_each = self.flush_seconds <= 0
+        timeout = None if flush_each else self.flush_seconds
+
+        while True:
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                # Crawl lento: grava o que já foi coletado em vez de esperar o lote encher
+                if client_ids:
+                    self._flush(client_ids, pending)
+                    client_ids, pending = [], ServiceBatch()
+                continue
+
+            if item is _STOP:
+                break
+
+            client_id, services = item
+            client_ids.append(client_id)
+            pending.extend(services)
+            self.stats.clients_received += 1
+            self.stats.rows_received += len(services)
+
+            # Os serviços de um cliente nunca são divididos entre lotes
+            if flush_each or len(pending) >= self.batch_size:
+                self._flush(client_ids, pending)
+                client_ids, pending = [], ServiceBatch()
+
+        if client_ids:
+            self._flush(client_ids, pending)
+
+        logger.info(f"Writer finalizado: {self.stats.rows_written} serviços gravados em "
+                    f"{self.stats.batches_written} lotes, {self.stats.rows_failed} com falha")
+
+    def _flush(self, client_ids: List[str], services: ServiceBatch):
+        saved = True
+        if services:
+            try:
+                with metrics.timer('writer_flush'):
+                    saved = self.db_handler.save_services(services)
+            except Exception as e:
+                logger.error(f"Erro inesperado ao gravar lote de serviços: {e}")
+                saved = False
+
+        metrics.inc('rows_written_total' if saved else 'rows_failed_total', len(services), table='servicos')
+        if saved:
+            self.stats.rows_written += len(services)
+            self.stats.batches_written += 1
+            logger.info(f"Lote gravado: {len(services)} serviços de {len(client_ids)} clientes")
+            for sink in self.sinks:
+                try:
+                    sink.write_services(services)
+                except Exception as e:
+                    logger.error(f"Erro inesperado ao repassar lote para {type(sink).__name__}: {e}")
+        else:
+            self.stats.rows_failed += len(services)
+            self.stats.batches_failed += 1
+            logger.error(f"Falha ao gravar lote com {len(services)} serviços de {len(client_ids)} clientes")
+
+        if self.on_flush:
+            try:
+                self.on_flush(client_ids, services, saved)
+            except Exception as e:
+                logger.error(f"Erro no callback de gravação do lote: {e}")
\ No newline at end of file
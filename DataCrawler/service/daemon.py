@@ -0,0 +1,229 @@
+import json
+import logging
+import threading
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+import psutil
+
+from config.settings import crawler_config
+from crawlers.selenium_crawler import SeleniumCrawler
+from database.db_handler import SQLServerHandler
+from pipeline.crawl_run import run_crawl
+from pipeline.run_journal import RunJournal
+
+logger = logging.getLogger(__name__)
+
+def browser_memory_mb(crawler: SeleniumCrawler) -> float:
+    # Soma o RSS do chromedriver e de todos os processos do Chrome abaixo dele
+    try:
+        process = psutil.Process(crawler.driver.service.process.pid)
+        processes = [process] + process.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return 0.0
+
+    total = 0
+    for child in processes:
+        try:
+            total += child.memory_info().rss
+        except psutil.Error:
+            continue
+    return total / (1024 * 1024)
+
+class CrawlerDaemon:
+    # Mantém navegador e pool do SQL Server abertos entre execuções agendadas
+    def __init__(self, interval_minutes: Optional[float] = None, recycle_pages: Optional[int] = None,
+                 max_memory_mb: Optional[int] = None, status_host: Optional[str] = None,
+                 status_port: Optional[int] = None):
+        self.interval = timedelta(minutes=interval_minutes or crawler_config.DAEMON_INTERVAL_MINUTES)
+        self.recycle_pages = recycle_pages or crawler_config.BROWSER_RECYCLE_PAGES
+        self.max_memory_mb = max_memory_mb or crawler_config.BROWSER_MAX_MEMORY_MB
+        self.status_address = (status_host or crawler_config.DAEMON_STATUS_HOST,
+                               status_port or crawler_config.DAEMON_STATUS_PORT)
+
+        self.crawler: Optional[SeleniumCrawler] = None
+        self.db_handler: Optional[SQLServerHandler] = None
+        self.journal: Optional[RunJournal] = None
+
+        self._trigger = threading.Event()
+        self._stop = threading.Event()
+        self._status_lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._status: Dict[str, Any] = {
+            'started_at': datetime.now().isoformat(),
+            'running': False,
+            'runs': 0,
+            'failed_runs': 0,
+            'browser_recycles': 0,
+            'last_run': None,
+            'last_error': None,
+            'next_run_at': None
+        }
+
+    def status(self) -> Dict[str, Any]:
+        with self._status_lock:
+            status = dict(self._status)
+
+        crawler = self.crawler
+        status['browser_pages'] = crawler.pages_loaded if crawler else 0
+        status['browser_memory_mb'] = round(browser_memory_mb(crawler), 1) if crawler else 0.0
+        return status
+
+    def healthy(self) -> bool:
+        with self._status_lock:
+            last_run = self._status['last_run']
+        return last_run is None or last_run.get('ok', False)
+
+    def trigger(self) -> bool:
+        with self._status_lock:
+            if self._status['running']:
+                return False
+        self._trigger.set()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        self._trigger.set()
+
+    def run_forever(self):
+        logger.info("Iniciando crawler em modo daemon")
+
+        try:
+            # Dentro do try: se a porta de status estiver ocupada, o que já foi aberto é fechado
+            self.db_handler = SQLServerHandler()
+            self.journal = RunJournal()
+            self._start_status_server()
+
+            while not self._stop.is_set():
+                self._run_once()
+
+                next_run = datetime.now() + self.interval
+                self._update_status(next_run_at=next_run.isoformat())
+                self._trigger.wait(timeout=self.interval.total_seconds())
+                self._trigger.clear()
+        finally:
+            self._shutdown()
+
+    def _run_once(self):
+        self._update_status(running=True, next_run_at=None)
+        started = datetime.now()
+        run_info = {'started_at': started.isoformat(), 'ok': False}
+
+        try:
+            crawler = self._warm_crawler()
+            # Retoma automaticamente uma execução que ficou pela metade
+            summary = run_crawl(crawler, self.db_handler, self.journal, resume=True,
+                                maintenance=self._recycle_during_run)
+            run_info.update(asdict(summary))
+            run_info['ok'] = (summary.run_id is not None and summary.services_failed == 0
+                              and summary.failed_clients == 0 and summary.listing_complete)
+        except Exception as e:
+            logger.error(f"Erro durante execução agendada: {e}")
+            run_info['error'] = str(e)
+            # Navegador em estado desconhecido: descarta para recriar na próxima execução
+            self._close_crawler()
+
+        run_info['finished_at'] = datetime.now().isoformat()
+        run_info['duration_seconds'] = round((datetime.now() - started).total_seconds(), 1)
+
+        with self._status_lock:
+            self._status['running'] = False
+            self._status['runs'] += 1
+            self._status['last_run'] = run_info
+            if not run_info['ok']:
+                self._status['failed_runs'] += 1
+                self._status['last_error'] = run_info.get('error')
+
+    def _warm_crawler(self) -> SeleniumCrawler:
+        if self.crawler and self._needs_recycle(self.crawler):
+            self._close_crawler()
+            with self._status_lock:
+                self._status['browser_recycles'] += 1
+
+        if not self.crawler:
+            self.crawler = SeleniumCrawler()
+        return self.crawler
+
+    def _recycle_during_run(self, crawler: SeleniumCrawler):
+        # Chamado pelo crawl (ou por cada worker do pool) a cada BROWSER_CHECK_INTERVAL
+        # clientes: reinicia o navegador no lugar e restaura a sessão
+        if not self._needs_recycle(crawler):
+            return
+        try:
+            if not crawler.restart():
+                logger.warning("Navegador reciclado, mas a sessão não foi restaurada")
+        except Exception as e:
+            logger.error(f"Erro ao reciclar navegador durante a execução: {e}")
+        with self._status_lock:
+            self._status['browser_recycles'] += 1
+
+    def _needs_recycle(self, crawler: SeleniumCrawler) -> bool:
+        if crawler.pages_loaded >= self.recycle_pages:
+            logger.info(f"Reciclando navegador após {crawler.pages_loaded} páginas")
+            return True
+
+        memory = browser_memory_mb(crawler)
+        if memory > self.max_memory_mb:
+            logger.info(f"Reciclando navegador com {memory:.0f} MB em uso")
+            return True
+        return False
+
+    def _close_crawler(self):
+        if self.crawler:
+            try:
+                self.crawler.close()
+            except Exception as e:
+                logger.warning(f"Erro ao fechar navegador: {e}")
+            self.crawler = None
+
+    def _update_status(self, **values):
+        with self._status_lock:
+            self._status.update(values)
+
+    def _start_status_server(self):
+        daemon = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/health':
+                    healthy = daemon.healthy()
+                    self._reply(200 if healthy else 503, {'status': 'ok' if healthy else 'degraded'})
+                elif self.path == '/status':
+                    self._reply(200, daemon.status())
+                else:
+                    self._reply(404, {'error': 'not found'})
+
+            def do_POST(self):
+                if self.path == '/trigger':
+                    accepted = daemon.trigger()
+                    self._reply(202 if accepted else 409,
+                                {'triggered': accepted})
+                else:
+                    self._reply(404, {'error': 'not found'})
+
+            def _reply(self, code: int, payload: Dict[str, Any]):
+                body = json.dumps(payload, default=str).encode('utf-8')
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(f"Status HTTP: {format % args}")
+
+        self._server = ThreadingHTTPServer(self.status_address, StatusHandler)
+        threading.Thread(target=self._server.serve_forever, name="daemon-status", daemon=True).start()
+        logger.info(f"Endpoint de status em http://{self.status_address[0]}:{self.status_address[1]}")
+
+    def _shutdown(self):
+        if self._server:
+            self._server.shutdown()
+        self._close_crawler()
+        if self.db_handler:
+            self.db_handler.close()
+        if self.journal:
+            self.journal.close()
+        logger.info("Daemon finalizado")
\ No newline at end of file
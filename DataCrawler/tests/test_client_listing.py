@@ -0,0 +1,68 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import crawler_config
+from crawlers.selenium_crawler import SeleniumCrawler
+from models.data_models import Client
+
+# Uso (a partir de DataCrawler/): python -m unittest discover tests
+
+class StubListingCrawler(SeleniumCrawler):
+    # Sem navegador: cada termo devolve as páginas de `pages`; uma exceção na lista
+    # simula erro de navegação ao tentar abrir aquela página
+    def __init__(self, pages, next_page=False):
+        self.pages = pages
+        self.next_page = next_page
+        super().__init__()
+        self.logged_in = True
+
+    def setup_driver(self):
+        pass
+
+    def _navigate(self, url, ready_selectors, capture_pattern=None):
+        return ready_selectors[0]
+
+    def _extract_client_page(self, use_capture):
+        page = self.pages.pop(0)
+        if isinstance(page, Exception):
+            raise page
+        return [Client(client_id=client_id, name=client_id) for client_id in page]
+
+    def _go_to_next_page(self):
+        return self.next_page or bool(self.pages)
+
+class ClientListingTest(unittest.TestCase):
+    def test_complete_listing(self):
+        crawler = StubListingCrawler([['C1', 'C2'], ['C3']])
+        clients = list(crawler.iter_clients([""], prefetch=False))
+
+        self.assertEqual([client.client_id for client in clients], ['C1', 'C2', 'C3'])
+        self.assertTrue(crawler.listing_complete)
+
+    def test_error_on_later_page_marks_listing_partial(self):
+        crawler = StubListingCrawler([['C1', 'C2'], TimeoutError("página 2 não carregou")])
+        clients = list(crawler.iter_clients([""], prefetch=False))
+
+        self.assertEqual([client.client_id for client in clients], ['C1', 'C2'])
+        self.assertFalse(crawler.listing_complete)
+
+    @mock.patch.object(crawler_config, 'CLIENT_MAX_PAGES', 2)
+    def test_page_cap_marks_listing_partial(self):
+        crawler = StubListingCrawler([['C1'], ['C2'], ['C3']], next_page=True)
+        clients = list(crawler.iter_clients([""], prefetch=False))
+
+        self.assertEqual(len(clients), 2)
+        self.assertFalse(crawler.listing_complete)
+
+    def test_interrupted_iteration_is_not_complete(self):
+        crawler = StubListingCrawler([['C1', 'C2'], ['C3']])
+        next(crawler.iter_clients([""], prefetch=False))
+
+        self.assertFalse(crawler.listing_complete)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
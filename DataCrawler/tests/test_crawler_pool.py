@@ -0,0 +1,77 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import crawler_config
+from crawlers.crawler_pool import CrawlerPool
+from crawlers.selenium_crawler import ServiceFetchError
+
+# Uso (a partir de DataCrawler/): python -m unittest discover tests
+
+class StubCrawler:
+    # Substitui o SeleniumCrawler: falha nos clientes de `failures` enquanto houver falhas restantes
+    instances = []
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.closed = False
+        self.calls = []
+        StubCrawler.instances.append(self)
+
+    def ensure_session(self):
+        return True
+
+    def get_client_services(self, client_id):
+        self.calls.append(client_id)
+        if self.failures.get(client_id, 0) > 0:
+            self.failures[client_id] -= 1
+            raise ServiceFetchError(f"navegador travado em {client_id}")
+        return [f"servico-{client_id}"]
+
+    def close(self):
+        self.closed = True
+
+class CrawlerPoolRetryTest(unittest.TestCase):
+    def setUp(self):
+        StubCrawler.instances = []
+
+    def _pool(self, failures):
+        return CrawlerPool(max_workers=1, crawler_factory=lambda: StubCrawler(failures))
+
+    @mock.patch.object(crawler_config, 'MAX_RETRIES', 3)
+    def test_failed_client_is_retried_on_restarted_browser(self):
+        result = self._pool({'C2': 1}).crawl_services(['C1', 'C2', 'C3'])
+
+        self.assertEqual(result.failed_clients, [])
+        self.assertEqual(result.processed, 3)
+        self.assertEqual(result.services['C2'], ['servico-C2'])
+        # Primeiro navegador descartado após a falha, segundo concluiu o trabalho
+        self.assertEqual(len(StubCrawler.instances), 2)
+        self.assertTrue(StubCrawler.instances[0].closed)
+        self.assertIn('C2', StubCrawler.instances[1].calls)
+
+    @mock.patch.object(crawler_config, 'MAX_RETRIES', 2)
+    def test_client_failing_every_attempt_is_not_reported_as_processed(self):
+        delivered = []
+        result = self._pool({'C1': 5}).crawl_services(
+            ['C1', 'C2'], on_services=lambda client_id, services: delivered.append(client_id))
+
+        self.assertEqual(result.failed_clients, ['C1'])
+        self.assertEqual(delivered, ['C2'])
+        self.assertEqual(result.processed, 1)
+
+    @mock.patch.object(crawler_config, 'BROWSER_CHECK_INTERVAL', 2)
+    def test_maintenance_runs_during_the_crawl(self):
+        checked = []
+        self._pool({}).crawl_services(['C1', 'C2', 'C3', 'C4', 'C5'],
+                                      on_services=lambda client_id, services: None,
+                                      maintenance=lambda crawler: checked.append(list(crawler.calls)))
+
+        # Consultado a cada 2 clientes, com o navegador ainda em uso
+        self.assertEqual(checked, [['C1', 'C2'], ['C1', 'C2', 'C3', 'C4']])
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.data_models import Service
+from pipeline.streaming_writer import StreamingWriter
+
+# Uso (a partir de DataCrawler/): python -m unittest discover tests
+
+class StubHandler:
+    # Substitui o SQLServerHandler: só registra os lotes recebidos
+    def __init__(self):
+        self.batches = []
+
+    def save_services(self, services):
+        self.batches.append(len(services))
+        return True
+
+def make_services(client_id, count):
+    return [Service(client_id=client_id, service_date="01/01/2024", service_type="Revisão",
+                    description="", status="Concluído") for _ in range(count)]
+
+class StreamingWriterFlushTest(unittest.TestCase):
+    def test_zero_flush_seconds_writes_each_client(self):
+        flushed = []
+        handler = StubHandler()
+        with StreamingWriter(handler, batch_size=100, flush_seconds=0,
+                             on_flush=lambda client_ids, services, saved: flushed.append(client_ids)) as writer:
+            writer.put('C1', make_services('C1', 2))
+            writer.put('C2', make_services('C2', 1))
+
+        self.assertEqual(flushed, [['C1'], ['C2']])
+        self.assertEqual(handler.batches, [2, 1])
+
+    def test_idle_writer_does_not_spin(self):
+        writer = StreamingWriter(StubHandler(), flush_seconds=0)
+        writer.start()
+        try:
+            started = time.process_time()
+            time.sleep(0.5)
+            busy = time.process_time() - started
+        finally:
+            writer.close()
+
+        self.assertLess(busy, 0.1)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,62 @@
+import re
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+# Dia primeiro (formato brasileiro): 15/03/2024, 15-03-24, 15.03.2024 10:30
+DAY_FIRST_PATTERN = re.compile(r'^(\d{1,2})[/.-](\d{1,2})[/.-](\d{2}|\d{4})(?:[ t].*)?$')
+# Ano primeiro (ISO): 2024-03-15, 2024/03/15, 2024-03-15T10:30:00
+YEAR_FIRST_PATTERN = re.compile(r'^(\d{4})[/.-](\d{1,2})[/.-](\d{1,2})(?:[ t].*)?$')
+# Por extenso: 15 de março de 2024, 15 mar 2024
+WRITTEN_PATTERN = re.compile(r'^(\d{1,2})(?:\s+de)?\s+([a-zç]+)\.?(?:\s+de)?\s+(\d{4})$')
+
+MONTHS = {
+    'jan': 1, 'janeiro': 1, 'fev': 2, 'fevereiro': 2, 'mar': 3, 'março': 3, 'marco': 3,
+    'abr': 4, 'abril': 4, 'mai': 5, 'maio': 5, 'jun': 6, 'junho': 6,
+    'jul': 7, 'julho': 7, 'ago': 8, 'agosto': 8, 'set': 9, 'setembro': 9,
+    'out': 10, 'outubro': 10, 'nov': 11, 'novembro': 11, 'dez': 12, 'dezembro': 12
+}
+
+def _build_date(year: int, month: int, day: int) -> Optional[date]:
+    if year < 100:
+        year += 2000 if year < 70 else 1900
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+# As tabelas repetem as mesmas poucas datas milhares de vezes, então o cache
+# evita reprocessar a maior parte dos valores
+@lru_cache(maxsize=65536)
+def parse_service_date(value: Optional[str]) -> Optional[date]:
+    if not value:
+        return None
+    text = value.strip().lower()
+
+    match = DAY_FIRST_PATTERN.match(text)
+    if match:
+        day, month, year = match.groups()
+        return _build_date(int(year), int(month), int(day))
+
+    match = YEAR_FIRST_PATTERN.match(text)
+    if match:
+        year, month, day = match.groups()
+        return _build_date(int(year), int(month), int(day))
+
+    match = WRITTEN_PATTERN.match(text)
+    if match:
+        day, month_name, year = match.groups()
+        month = MONTHS.get(month_name)
+        return _build_date(int(year), month, int(day)) if month else None
+
+    return None
+
+def parse_service_dates(values: Iterable[Optional[str]]) -> List[Optional[date]]:
+    # Cada valor distinto é convertido uma única vez por lote
+    parsed: Dict[Optional[str], Optional[date]] = {}
+    result = []
+    for value in values:
+        if value not in parsed:
+            parsed[value] = parse_service_date(value)
+        result.append(parsed[value])
+    return result
\ No newline at end of file
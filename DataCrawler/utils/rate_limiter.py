@@ -0,0 +1,65 @@
+import logging
+import threading
+import time
+from typing import Optional
+
+from config.settings import crawler_config
+
+logger = logging.getLogger(__name__)
+
+class AdaptiveRateLimiter:
+    # Token bucket com taxa ajustada por AIMD: sobe devagar enquanto as páginas
+    # respondem dentro da latência alvo e cai pela metade em erros.
+    def __init__(self, initial_rate: Optional[float] = None, min_rate: Optional[float] = None,
+                 max_rate: Optional[float] = None, target_latency: Optional[float] = None,
+                 burst: Optional[float] = None):
+        self.min_rate = min_rate or crawler_config.RATE_LIMIT_MIN_RPS
+        self.max_rate = max_rate or crawler_config.RATE_LIMIT_MAX_RPS
+        self.target_latency = target_latency or crawler_config.RATE_LIMIT_TARGET_LATENCY
+        self.burst = max(1.0, burst or crawler_config.RATE_LIMIT_BURST)
+
+        self._rate = self._clamp(initial_rate or crawler_config.RATE_LIMIT_INITIAL_RPS)
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self._rate
+            time.sleep(wait)
+
+    def record(self, latency: float, success: bool = True):
+        with self._lock:
+            self._refill()
+            previous = self._rate
+
+            if not success:
+                self._rate = self._clamp(self._rate * 0.5)
+            elif latency > self.target_latency:
+                self._rate = self._clamp(self._rate * 0.75)
+            else:
+                self._rate = self._clamp(self._rate + 0.1)
+
+            if self._rate < previous:
+                logger.debug(f"Reduzindo taxa de requisições para {self._rate:.2f}/s "
+                             f"(latência {latency:.2f}s, sucesso={success})")
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def _clamp(self, rate: float) -> float:
+        return min(self.max_rate, max(self.min_rate, rate))
+
+# Compartilhado por todas as sessões do processo para respeitar o teto global
+rate_limiter = AdaptiveRateLimiter()
\ No newline at end of file